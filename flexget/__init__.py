@@ -1,5 +1,9 @@
 #!/usr/bin/python
 
+import time
+# Startup profile includes the time spent importing the core
+_import_started = time.time()
+
 import os
 import sys
 import logging
@@ -7,6 +11,7 @@ from flexget import logger
 from flexget.options import CoreArgumentParser
 from flexget import plugin
 from flexget.manager import Manager
+from flexget.utils.startup_profile import startup_profiler
 
 __version__ = '{subversion}'
 
@@ -18,13 +23,19 @@ def main():
 
     logger.initialize()
 
+    # Plugins are loaded before options can be parsed
+    if '--profile-startup' in sys.argv:
+        startup_profiler.enable(_import_started)
+        startup_profiler.add('core imports', time.time() - _import_started)
+
     parser = CoreArgumentParser()
-    plugin.load_plugins(parser)
+    plugin.load_plugins(parser, manifest=plugin.get_manifest_path())
 
     options = parser.parse_args()
 
     try:
-        manager = Manager(options)
+        with startup_profiler.section('manager'):
+            manager = Manager(options)
     except IOError, e:
         # failed to load config, TODO: why should it be handled here? So sys.exit isn't called in webui?
         log.critical(e)
@@ -38,6 +49,8 @@ def main():
         log_file = os.path.join(manager.config_base, log_file)
     logger.start(log_file, log_level)
 
+    startup_profiler.finish(os.path.join(manager.config_base, 'startup-profile.json'))
+
     if options.profile:
         try:
             import cProfile as profile
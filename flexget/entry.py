@@ -1,12 +1,19 @@
 from exceptions import Exception, UnicodeDecodeError, TypeError, KeyError
 import logging
 import copy
+from flexget.logger import TRACE
 from flexget.plugin import PluginError
 from flexget.utils.imdb import extract_id, make_url
 from flexget.utils.template import render_from_entry
 
 log = logging.getLogger('entry')
 
+# Fields which are validated or normalized when set, see Entry.__setitem__
+SPECIAL_FIELDS = frozenset(['url', 'title', 'imdb_url'])
+
+# Lazy field callbacks mapped to functions which can populate the fields for many entries at once
+batch_loaders = {}
+
 
 class EntryUnicodeError(Exception):
     """This exception is thrown when trying to set non-unicode compatible field value to entry."""
@@ -51,6 +58,29 @@ class LazyField(object):
         return unicode(self())
 
 
+def resolve_lazy_fields(entries, fields):
+    """
+    Evaluates lazy `fields` of all `entries` at once, before they are accessed one entry at a time.
+
+    Entries are grouped by the first callback of the lazy field, and the batch function registered for the callback
+    (see :meth:`Entry.register_lazy_fields`) is called once for each group. Fields of callbacks without batch
+    function, or which the batch function did not populate, are evaluated as usual when accessed.
+
+    :param entries: Iterable of :class:`Entry` instances
+    :param fields: List of field names
+    """
+    entries = list(entries)
+    for field in fields:
+        pending = {}
+        for entry in entries:
+            lazy = dict.get(entry, field)
+            if isinstance(lazy, LazyField) and lazy.funcs[0] in batch_loaders:
+                pending.setdefault(lazy.funcs[0], []).append(entry)
+        for func, func_entries in pending.iteritems():
+            log.debug('resolving lazy field %s of %s entries at once' % (field, len(func_entries)))
+            batch_loaders[func](func_entries, field)
+
+
 class Entry(dict):
     """
     Represents one item in task. Must have `url` and *title* fields.
@@ -65,9 +95,13 @@ class Entry(dict):
     and trigger :meth:`~flexget.task.Task.abort`.
     """
 
+    #: Incremented whenever state of any entry changes, see :class:`~flexget.task.EntryContainer`
+    state_revision = 0
+
     def __init__(self, *args, **kwargs):
-        self.trace = []
-        self.snapshots = {}
+        # trace and snapshots are created when first used
+        self._trace = None
+        self._snapshots = None
         self._state = 'undecided'
         self.task = None
 
@@ -79,11 +113,25 @@ class Entry(dict):
         # Make sure constructor does not escape our __setitem__ enforcement
         self.update(*args, **kwargs)
 
+    @property
+    def trace(self):
+        """List of (plugin, message) tuples about what has happened to the entry."""
+        if self._trace is None:
+            self._trace = []
+        return self._trace
+
+    @property
+    def snapshots(self):
+        """Dict of snapshots taken with :meth:`take_snapshot`."""
+        if self._snapshots is None:
+            self._snapshots = {}
+        return self._snapshots
+
     def accept(self, reason=None, **kwargs):
         if self.rejected:
             log.debug('tried to accept rejected %r' % self)
         elif not self.accepted:
-            self._state = 'accepted'
+            self._set_state('accepted')
             # Run on_entry_accept phase
             self.task._run_entry_phase('accept', self, reason=reason, **kwargs)
 
@@ -95,18 +143,26 @@ class Entry(dict):
             self.task.trace(self, 'Tried to reject immortal %s' % reason_str)
             return
         if not self.rejected:
-            self._state = 'rejected'
+            self._set_state('rejected')
             # Run on_entry_reject phase
             self.task._run_entry_phase('reject', self, reason=reason, **kwargs)
 
     def fail(self, reason=None, **kwargs):
         log.debug('Marking entry \'%s\' as failed' % self['title'])
         if not self.failed:
-            self._state = 'failed'
+            self._set_state('failed')
             log.error('Failed %s (%s)' % (self['title'], reason))
             # Run on_entry_fail phase
             self.task._run_entry_phase('fail', self, reason=reason, **kwargs)
 
+    def _set_state(self, state):
+        old_state = self._state
+        self._state = state
+        Entry.state_revision += 1
+        if self.task is not None:
+            # Let the task keep its index of entries by state up to date
+            self.task.all_entries.state_changed(self, old_state)
+
     @property
     def accepted(self):
         return self._state == 'accepted'
@@ -125,50 +181,72 @@ class Entry(dict):
 
     def __setitem__(self, key, value):
         # Enforce unicode compatibility. Check for all subclasses of basestring, so that NavigableStrings are also cast
-        if isinstance(value, basestring) and not type(value) == unicode:
+        if type(value) is not unicode and isinstance(value, basestring):
             try:
                 value = unicode(value)
             except UnicodeDecodeError:
                 raise EntryUnicodeError(key, value)
 
-        # url and original_url handling
-        if key == 'url':
-            if not isinstance(value, basestring):
-                raise PluginError('Tried to set %r url to %r' % (self.get('title'), value))
-            self.setdefault('original_url', value)
-
-        # title handling
-        if key == 'title':
-            if not isinstance(value, basestring):
-                raise PluginError('Tried to set title to %r' % value)
-
-        # TODO: HACK! Implement via plugin once #348 (entry events) is implemented
-        # enforces imdb_url in same format
-        if key == 'imdb_url' and isinstance(value, basestring):
-            imdb_id = extract_id(value)
-            if imdb_id:
-                value = make_url(imdb_id)
-            else:
-                log.debug('Tried to set imdb_id to invalid imdb url: %s' % value)
-                value = None
-
-        try:
-            log.trace('ENTRY SET: %s = %r' % (key, value))
-        except Exception, e:
-            log.debug('trying to debug key `%s` value threw exception: %s' % (key, e))
+        if key in SPECIAL_FIELDS:
+            # url and original_url handling
+            if key == 'url':
+                if not isinstance(value, basestring):
+                    raise PluginError('Tried to set %r url to %r' % (self.get('title'), value))
+                self.setdefault('original_url', value)
+
+            # title handling
+            if key == 'title':
+                if not isinstance(value, basestring):
+                    raise PluginError('Tried to set title to %r' % value)
+
+            # TODO: HACK! Implement via plugin once #348 (entry events) is implemented
+            # enforces imdb_url in same format
+            if key == 'imdb_url' and isinstance(value, basestring):
+                imdb_id = extract_id(value)
+                if imdb_id:
+                    value = make_url(imdb_id)
+                else:
+                    log.debug('Tried to set imdb_id to invalid imdb url: %s' % value)
+                    value = None
+
+        if log.isEnabledFor(TRACE):
+            try:
+                log.trace('ENTRY SET: %s = %r' % (key, value))
+            except Exception, e:
+                log.debug('trying to debug key `%s` value threw exception: %s' % (key, e))
 
         dict.__setitem__(self, key, value)
 
+    def _set_fields(self, items):
+        """Sets fields from iterable of (key, value) pairs, with the same rules as __setitem__."""
+        if log.isEnabledFor(TRACE):
+            for key, value in items:
+                self[key] = value
+            return
+        for key, value in items:
+            if key in SPECIAL_FIELDS:
+                self[key] = value
+                continue
+            if type(value) is not unicode and isinstance(value, basestring):
+                try:
+                    value = unicode(value)
+                except UnicodeDecodeError:
+                    raise EntryUnicodeError(key, value)
+            dict.__setitem__(self, key, value)
+
     def update(self, *args, **kwargs):
         """Overridden so our __setitem__ is not avoided."""
         if args:
             if len(args) > 1:
                 raise TypeError("update expected at most 1 arguments, got %d" % len(args))
-            other = dict(args[0])
-            for key in other:
-                self[key] = other[key]
-        for key in kwargs:
-            self[key] = kwargs[key]
+            other = args[0]
+            if isinstance(other, dict):
+                # dict.iteritems returns stored values, LazyFields are not evaluated
+                self._set_fields(dict.iteritems(other))
+            else:
+                self._set_fields(dict(other).iteritems())
+        if kwargs:
+            self._set_fields(kwargs.iteritems())
 
     def setdefault(self, key, value=None):
         """Overridden so our __setitem__ is not avoided."""
@@ -209,7 +287,7 @@ class Entry(dict):
         """Will cause lazy field lookup to occur and will return false if a field exists but is None."""
         return self.get(key) is not None
 
-    def register_lazy_fields(self, fields, func):
+    def register_lazy_fields(self, fields, func, batch_func=None):
         """Register a list of fields to be lazily loaded by callback func.
 
         :param fields:
@@ -218,7 +296,12 @@ class Entry(dict):
           Callback function which is called when lazy field needs to be evaluated.
           Function call will get params (entry, field).
           See :class:`LazyField` class for more details.
+        :param batch_func:
+          Optional function which populates the fields for many entries at once, used by
+          :func:`resolve_lazy_fields`. Function call will get params (entries, field).
         """
+        if batch_func is not None:
+            batch_loaders[func] = batch_func
         for field in fields:
             if self.is_lazy(field):
                 # If the field is already a lazy field, append this function to it's list of functions
@@ -301,11 +384,13 @@ class Entry(dict):
           Source of information to be used by the map
         """
         func = dict.get if isinstance(source_item, dict) else getattr
+        fields = []
         for field, value in field_map.iteritems():
             if isinstance(value, basestring):
-                self[field] = reduce(func, value.split('.'), source_item)
+                fields.append((field, reduce(func, value.split('.'), source_item)))
             else:
-                self[field] = value(source_item)
+                fields.append((field, value(source_item)))
+        self._set_fields(fields)
 
     def render(self, template):
         """
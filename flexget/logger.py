@@ -67,6 +67,10 @@ def set_execution(execution):
     FlexGetLogger.local.execution = execution
 
 
+def get_execution():
+    return getattr(FlexGetLogger.local, 'execution', '')
+
+
 def set_task(task):
     FlexGetLogger.local.task = task
 
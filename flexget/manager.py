@@ -4,12 +4,15 @@ import shutil
 import logging
 import yaml
 import atexit
+import threading
+import itertools
 from datetime import datetime, timedelta
 import sqlalchemy
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import SingletonThreadPool
 from flexget.event import fire_event
+from flexget.utils.startup_profile import startup_profiler
 from flexget import validator
 
 log = logging.getLogger('manager')
@@ -103,7 +106,11 @@ class Manager(object):
         self.config = {}
         self.tasks = {}
 
-        self.initialize()
+        # Held by a task for all phases except input, so that only inputs of concurrent tasks overlap
+        self.task_lock = threading.RLock()
+
+        with startup_profiler.section('initialize'):
+            self.initialize()
 
         # cannot be imported at module level because of circular references
         from flexget.utils.simple_persistence import SimplePersistence
@@ -113,11 +120,14 @@ class Manager(object):
         log.debug('sys.getfilesystemencoding: %s' % sys.getfilesystemencoding())
         log.debug('os.path.supports_unicode_filenames: %s' % os.path.supports_unicode_filenames)
 
-        fire_event('manager.upgrade', self)
-        if manager.db_upgraded:
-            fire_event('manager.db_upgraded', self)
-        fire_event('manager.startup', self)
-        self.db_cleanup()
+        with startup_profiler.section('manager.upgrade'):
+            fire_event('manager.upgrade', self)
+            if manager.db_upgraded:
+                fire_event('manager.db_upgraded', self)
+        with startup_profiler.section('manager.startup'):
+            fire_event('manager.startup', self)
+        with startup_profiler.section('db_cleanup'):
+            self.db_cleanup()
 
     def __del__(self):
         global manager
@@ -126,15 +136,19 @@ class Manager(object):
     def initialize(self):
         """Separated from __init__ so that unit tests can modify options before loading config."""
         self.setup_yaml()
-        self.find_config()
+        with startup_profiler.section('load_config'):
+            self.find_config()
         self.acquire_lock()
-        self.init_sqlalchemy()
-        errors = self.validate_config()
+        with startup_profiler.section('init_sqlalchemy'):
+            self.init_sqlalchemy()
+        with startup_profiler.section('validate_config'):
+            errors = self.validate_config()
         if errors:
             for error in errors:
                 log.critical(error)
             return
-        self.create_tasks()
+        with startup_profiler.section('create_tasks'):
+            self.create_tasks()
 
     def setup_yaml(self):
         """ Set up the yaml loader to return unicode objects for strings by default
@@ -217,9 +231,11 @@ class Manager(object):
         """
         if not self.options.quiet:
             # pre-check only when running without --cron
-            self.pre_check_config(config)
+            with startup_profiler.section('pre_check_config'):
+                self.pre_check_config(config)
         try:
-            self.config = yaml.safe_load(file(config)) or {}
+            with startup_profiler.section('yaml'):
+                self.config = yaml.safe_load(file(config)) or {}
         except Exception, e:
             log.critical(e)
             print ''
@@ -430,7 +446,8 @@ class Manager(object):
         try:
             if self.options.reset or self.options.del_db:
                 Base.metadata.drop_all(bind=self.engine)
-            Base.metadata.create_all(bind=self.engine)
+            with startup_profiler.section('create_all'):
+                Base.metadata.create_all(bind=self.engine)
         except OperationalError, e:
             if os.path.exists(self.db_filename):
                 print >> sys.stderr, '%s - make sure you have write permissions to file %s' % (e.message, self.db_filename)
@@ -589,23 +606,126 @@ class Manager(object):
         fire_event('manager.execute.started', self)
         self.process_start(tasks=run_tasks)
 
-        for task in sorted(run_tasks):
+        try:
+            prefetch_workers = self._workers('prefetch_inputs', entries)
+            if prefetch_workers > 1:
+                self.prefetch_inputs(run_tasks, prefetch_workers, disable_phases)
+            max_workers = self._workers('max_workers', entries)
+            if max_workers > 1:
+                self.execute_concurrently(run_tasks, max_workers, disable_phases)
+            else:
+                for task in sorted(run_tasks):
+                    self._execute_task(task, disable_phases, entries)
+        except KeyboardInterrupt:
+            # show real stack trace in debug mode
+            if self.options.debug:
+                raise
+            print '**** Keyboard Interrupt ****'
+            return
+
+        self.process_end(tasks=run_tasks)
+        fire_event('manager.execute.completed', self)
+
+    def _execute_task(self, task, disable_phases=None, entries=None):
+        if not task.enabled or task._abort:
+            return
+        try:
+            task.execute(disable_phases=disable_phases, entries=entries)
+        except Exception, e:
+            task.enabled = False
+            log.exception('Task %s: %s' % (task.name, e))
+
+    def _workers(self, option, entries=None):
+        """Returns number of worker threads given with `option`, or 1 if tasks cannot be executed concurrently."""
+        workers = getattr(self.options, option, 1) or 1
+        if workers > 1 and entries:
+            log.debug('Entries given, executing tasks one at a time')
+            return 1
+        if workers > 1 and ':memory:' in self.database_uri:
+            log.warning('Cannot execute tasks concurrently with in-memory database, executing one at a time')
+            return 1
+        return workers
+
+    def _run_in_pool(self, groups, max_workers, func):
+        """Calls `func` for each task using a pool of worker threads, each group is completed before the next one."""
+        from multiprocessing.pool import ThreadPool
+        from flexget import logger
+
+        execution = logger.get_execution()
+
+        def worker(task):
+            logger.set_execution(execution)
+            try:
+                func(task)
+            finally:
+                logger.set_execution('')
+
+        pool = ThreadPool(max_workers)
+        try:
+            for group in groups:
+                # timeout allows KeyboardInterrupt to be received while waiting
+                pool.map_async(worker, group).get(timeout=60 * 60 * 24)
+        except KeyboardInterrupt:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        pool.join()
+
+    def execute_concurrently(self, tasks, max_workers, disable_phases=None):
+        """
+        Execute tasks using a pool of worker threads.
+
+        Tasks with the same priority are executed concurrently, each priority is completed before starting the next
+        one. Each task uses its own database session. Only input phases overlap, other phases of the tasks are
+        executed one at a time while holding :attr:`task_lock`. Tasks which are :attr:`~flexget.task.Task.exclusive`
+        are executed alone.
+
+        :param list tasks: List of :class:`~flexget.task.Task` instances to execute.
+        :param int max_workers: Maximum number of tasks executed at the same time.
+        :param list disable_phases: Optional list of phases to disable.
+        """
+        groups = []
+        for priority, group in itertools.groupby(sorted(tasks), key=lambda task: task.priority):
+            group = list(group)
+            exclusive = [task for task in group if task.exclusive]
+            group = [task for task in group if not task.exclusive]
+            if group:
+                log.debug('Executing %s tasks with priority %s using %s workers' %
+                          (len(group), priority, min(max_workers, len(group))))
+                groups.append(group)
+            # tasks which change process wide state are executed alone after the others
+            for task in exclusive:
+                log.debug('Executing task %s alone' % task.name)
+                groups.append([task])
+        self._run_in_pool(groups, max_workers, lambda task: self._execute_task(task, disable_phases))
+
+    def prefetch_inputs(self, tasks, max_workers, disable_phases=None):
+        """
+        Run phases up to input of all tasks using a pool of worker threads. The remaining phases are run when the
+        tasks are executed normally afterwards. Tasks which are :attr:`~flexget.task.Task.exclusive` are not
+        prefetched, they are executed normally and alone.
+
+        :param list tasks: List of :class:`~flexget.task.Task` instances to prefetch.
+        :param int max_workers: Maximum number of tasks prefetched at the same time.
+        :param list disable_phases: Optional list of phases to disable.
+        """
+
+        def prefetch(task):
             if not task.enabled or task._abort:
-                continue
+                return
             try:
-                task.execute(disable_phases=disable_phases, entries=entries)
+                task.prefetch(disable_phases=disable_phases)
             except Exception, e:
                 task.enabled = False
                 log.exception('Task %s: %s' % (task.name, e))
-            except KeyboardInterrupt:
-                # show real stack trace in debug mode
-                if self.options.debug:
-                    raise
-                print '**** Keyboard Interrupt ****'
-                return
 
-        self.process_end(tasks=run_tasks)
-        fire_event('manager.execute.completed', self)
+        exclusive = [task.name for task in tasks if task.exclusive]
+        if exclusive:
+            log.debug('Not prefetching inputs of %s' % ', '.join(exclusive))
+        tasks = [task for task in tasks if not task.exclusive]
+        log.debug('Prefetching inputs of %s tasks using %s workers' % (len(tasks), max_workers))
+        self._run_in_pool([tasks], max_workers, prefetch)
 
     def db_cleanup(self):
         """ Perform database cleanup if cleanup interval has been met.
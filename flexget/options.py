@@ -47,6 +47,9 @@ class ArgumentParser(ArgParser):
         self.add_argument('--del-db', action='store_true', dest='del_db', default=False,
                         help=SUPPRESS)
         self.add_argument('--profile', action='store_true', default=False, help=SUPPRESS)
+        self.add_argument('--profile-startup', action='store_true', dest='profile_startup', default=False,
+                        help='Write time and memory used by startup steps to startup-profile.json in the config '
+                             'directory.')
 
     def add_argument(self, *args, **kwargs):
         if isinstance(kwargs.get('nargs'), basestring) and '-' in kwargs['nargs']:
@@ -103,6 +106,12 @@ class CoreArgumentParser(ArgumentParser):
                         help='Disables stdout and stderr output, log file used. Reduces logging level slightly.')
         self.add_argument('--db-cleanup', action='store_true', dest='db_cleanup', default=False,
                         help='Forces the database cleanup event to run right now.')
+        self.add_argument('--max-workers', action='store', dest='max_workers', type=int, default=1, metavar='N',
+                        help='Run input phases of up to N tasks with the same priority at the same time. Default 1.')
+        self.add_argument('--prefetch-inputs', action='store', dest='prefetch_inputs', type=int, default=0,
+                        metavar='N', help='Before executing tasks, fetch inputs of all tasks using N threads. '
+                                          'Tasks are then executed one at a time in priority order. Not suitable '
+                                          'if a task reads the output of another task.')
 
         # Plugins should respect this flag and retry where appropriate
         self.add_argument('--retry', action='store_true', dest='retry', default=0, help=SUPPRESS)
@@ -7,14 +7,18 @@ import os
 import re
 import logging
 import time
+import json
+import itertools
+import threading
 from requests import RequestException
 from event import add_event_handler as add_phase_handler
+from flexget.utils.startup_profile import startup_profiler
 
 log = logging.getLogger('plugin')
 
 __all__ = ['PluginWarning', 'PluginError', 'register_plugin', 'register_parser_option', 'register_task_phase',
            'get_plugin_by_name', 'get_plugins_by_group', 'get_plugin_keywords', 'get_plugins_by_phase',
-           'get_phases_by_plugin', 'internet', 'priority']
+           'get_phases_by_plugin', 'get_loaded_plugins', 'get_validated_plugin_keywords', 'internet', 'priority']
 
 
 class DependencyError(Exception):
@@ -175,8 +179,48 @@ phase_methods.update((_phase, 'on_task_' + _phase) for _phase in task_phases) #
 # Plugin package naming
 PLUGIN_NAMESPACE = 'flexget.plugins'
 
+
+def _loads_pending(method):
+    def wrapper(self, *args):
+        load_pending_plugins()
+        return method(self, *args)
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class PluginDict(dict):
+    """
+    Mapping of plugin name to PluginInfo. Plugins known only from the plugin manifest are imported when looked up by
+    name, and all of them when the whole mapping is used.
+    """
+
+    def __contains__(self, name):
+        _load_pending(name)
+        return dict.__contains__(self, name)
+
+    def __getitem__(self, name):
+        _load_pending(name)
+        return dict.__getitem__(self, name)
+
+    def get(self, name, default=None):
+        _load_pending(name)
+        return dict.get(self, name, default)
+
+    has_key = __contains__
+
+    __iter__ = _loads_pending(dict.__iter__)
+    __len__ = _loads_pending(dict.__len__)
+    keys = _loads_pending(dict.keys)
+    values = _loads_pending(dict.values)
+    items = _loads_pending(dict.items)
+    iterkeys = _loads_pending(dict.iterkeys)
+    itervalues = _loads_pending(dict.itervalues)
+    iteritems = _loads_pending(dict.iteritems)
+
+
 # Mapping of plugin name to PluginInfo instance (logical singletons)
-plugins = {}
+plugins = PluginDict()
 
 # Loading done?
 plugins_loaded = False
@@ -186,6 +230,18 @@ _loaded_plugins = {}
 _plugin_options = []
 _new_phase_queue = {}
 
+# Bump when the format or meaning of the plugin manifest changes
+MANIFEST_VERSION = 1
+# What plugin modules registered when imported, module name -> info
+_module_info = {}
+# Plugin modules known from the manifest which have not been imported yet, module name -> info
+_pending_modules = {}
+# Names of plugins in pending modules, plugin name -> module name
+_pending_plugins = {}
+# Pending modules being imported
+_importing = []
+_pending_lock = threading.RLock()
+
 
 def register_parser_option(*args, **kwargs):
     """Adds a parser option to the global parser."""
@@ -219,9 +275,9 @@ def register_task_phase(name, before=None, after=None):
         if after is None:
             task_phases.insert(task_phases.index(before), phase_name)
 
-        # create possibly newly available phase handlers
-        for loaded_plugin in plugins:
-            plugins[loaded_plugin].build_phase_handlers()
+        # create possibly newly available phase handlers, plugins not imported yet build them when imported
+        for loaded_plugin in dict.itervalues(plugins):
+            loaded_plugin.build_phase_handlers()
 
         return True
 
@@ -276,6 +332,8 @@ class PluginInfo(dict):
     """
     # Counts duplicate registrations
     dupe_counter = 0
+    # Changes whenever plugins, their phase handlers or builtin status change, cached plugin lists depend on it
+    revision = 0
 
     @classmethod
     def name_from_class(cls, plugin_class):
@@ -331,6 +389,7 @@ class PluginInfo(dict):
         else:
             self.build_phase_handlers()
             plugins[self.name] = self
+            PluginInfo.revision += 1
 
     def reset_phase_handlers(self):
         """Temporary utility method"""
@@ -358,6 +417,7 @@ class PluginInfo(dict):
                 # provides backwards compatibility
                 event.plugin = self
                 self.phase_handlers[phase] = event
+                PluginInfo.revision += 1
 
     def __getattr__(self, attr):
         if attr in self:
@@ -365,6 +425,8 @@ class PluginInfo(dict):
         return dict.__getattribute__(self, attr)
 
     def __setattr__(self, attr, value):
+        if attr == 'builtin':
+            PluginInfo.revision += 1
         self[attr] = value
 
     def __str__(self):
@@ -443,9 +505,12 @@ def get_standard_plugins_path():
     return path
 
 
-def load_plugins_from_dirs(dirs):
+def load_plugins_from_dirs(dirs, manifest=None):
     """
     :param list dirs: Directories from where plugins are loaded from
+    :param string manifest: Optional path of the plugin manifest. When it is up to date with the plugin files only
+      modules which need to register something at import time are imported, rest are imported when their plugins are
+      first used. Otherwise all plugins are imported and the manifest is regenerated.
     """
 
     # add all dirs to plugins_pkg load path so that plugins are loaded from flexget and from ~/.flexget/plugins/
@@ -472,13 +537,14 @@ def load_plugins_from_dirs(dirs):
             log.debug('removing defunct plugin_package %s' % subpkg)
             plugin_packages.remove(subpkg)
 
-    # actually load plugins from directories
+    # find plugin modules from directories
+    found_modules = []
     for dir in dirs:
         if not dir:
             continue
         if os.path.isdir(dir):
             log.debug('Looking for plugins in %s', dir)
-            load_plugins_from_dir(dir)
+            found_modules.extend(find_plugins_from_dir(dir))
 
             # Also look in sub-packages named like the task phases, plus "generic"
             for subpkg in plugin_packages:
@@ -486,12 +552,38 @@ def load_plugins_from_dirs(dirs):
                 if os.path.isdir(subpath):
                     # Only log existing subdirs
                     log.debug("Looking for sub-plugins in '%s'", subpath)
-                    load_plugins_from_dir(dir, subpkg)
+                    found_modules.extend(find_plugins_from_dir(dir, subpkg))
         else:
             log.debug('Ignoring non-existing plugin directory %s', dir)
 
-
-def load_plugins_from_dir(basepath, subpkg=None):
+    modules = None
+    if manifest:
+        modules = read_plugin_manifest(manifest, found_modules)
+    if modules is None:
+        for modulename in found_modules:
+            _import_plugin_module(modulename)
+        if manifest:
+            write_plugin_manifest(manifest, found_modules)
+    else:
+        log.debug('Using plugin manifest %s' % manifest)
+        with _pending_lock:
+            for modulename in found_modules:
+                info = modules[modulename]
+                if not info['eager']:
+                    _pending_modules[modulename] = info
+                    for name in info['plugins']:
+                        _pending_plugins[name] = modulename
+        for modulename in found_modules:
+            if modules[modulename]['eager']:
+                _import_plugin_module(modulename)
+
+    _check_phase_queue()
+
+
+def find_plugins_from_dir(basepath, subpkg=None):
+    """
+    :return: Names of the plugin modules in directory, which were not already found from another directory.
+    """
     # Get the list of valid python suffixes for plugins
     # this includes .py, .pyc, and .pyo (depending on if we are running -O)
     # but it doesn't include compiled modules (.so, .dll, etc)
@@ -522,48 +614,194 @@ def load_plugins_from_dir(basepath, subpkg=None):
                 else:
                     _loaded_plugins[namespace + f_base] = path
                     found_plugins.add(namespace + f_base)
+    return list(found_plugins)
 
-    for modulename in found_plugins:
-        try:
-            __import__(modulename, level=0)
-        except DependencyError, e:
-            if e.has_message():
-                msg = e.message
-            else:
-                msg = 'Plugin `%s` requires `%s` to load.' % (e.issued_by or modulename, e.missing or 'N/A')
-            if not e.silent:
-                log.warning(msg)
-            else:
-                log.debug(msg)
-        except ImportError, e:
-            log.critical('Plugin `%s` failed to import dependencies' % modulename)
-            log.exception(e)
-        except Exception, e:
-            log.critical('Exception while loading plugin %s' % modulename)
-            log.exception(e)
-            raise
-        else:
-            log.trace('Loaded module %s from %s' % (modulename[len(PLUGIN_NAMESPACE) + 1:], dirpath))
-
-            # Auto-register plugins that inherit from plugin base classes,
-            # and weren't already registered manually
-            for obj in vars(sys.modules[modulename]).values():
-                try:
-                    if not issubclass(obj, Plugin):
-                        continue
-                except TypeError:
-                    continue # not a class
-                else:
-                    register(obj, auto=True)
 
+def load_plugins_from_dir(basepath, subpkg=None):
+    for modulename in find_plugins_from_dir(basepath, subpkg):
+        _import_plugin_module(modulename)
+    _check_phase_queue()
+
+
+def _check_phase_queue():
     if _new_phase_queue:
         for phase, args in _new_phase_queue.iteritems():
             log.error('Plugin %s requested new phase %s, but it could not be created at requested '
                       'point (before, after). Plugin is not working properly.' % (args[0], phase))
 
 
-def load_plugins(parser):
-    """Load plugins from the standard plugin paths."""
+def _import_side_effects():
+    """Returns counts of the things plugin modules may register at import time besides plugins."""
+    from flexget.event import _events
+    from flexget.manager import Base, _config_validator
+    return (len(_plugin_options), len(task_phases), len(_new_phase_queue), len(Base.metadata.tables),
+            sum(len(handlers) for handlers in _config_validator.valid.itervalues()),
+            sum(len(handlers) for name, handlers in _events.iteritems() if not name.startswith('plugin.')))
+
+
+def _import_plugin_module(modulename):
+    """Imports plugin module and records what it registered for the plugin manifest."""
+    side_effects = _import_side_effects()
+    options = len(_plugin_options)
+    known = set(dict.iterkeys(plugins))
+    failed = False
+    try:
+        with startup_profiler.section(modulename):
+            __import__(modulename, level=0)
+    except DependencyError, e:
+        failed = True
+        if e.has_message():
+            msg = e.message
+        else:
+            msg = 'Plugin `%s` requires `%s` to load.' % (e.issued_by or modulename, e.missing or 'N/A')
+        if not e.silent:
+            log.warning(msg)
+        else:
+            log.debug(msg)
+    except ImportError, e:
+        failed = True
+        log.critical('Plugin `%s` failed to import dependencies' % modulename)
+        log.exception(e)
+    except Exception, e:
+        log.critical('Exception while loading plugin %s' % modulename)
+        log.exception(e)
+        raise
+    else:
+        log.trace('Loaded module %s from %s' % (modulename[len(PLUGIN_NAMESPACE) + 1:],
+                                                os.path.dirname(_loaded_plugins.get(modulename, ''))))
+
+        # Auto-register plugins that inherit from plugin base classes,
+        # and weren't already registered manually
+        for obj in vars(sys.modules[modulename]).values():
+            try:
+                if not issubclass(obj, Plugin):
+                    continue
+            except TypeError:
+                continue # not a class
+            else:
+                register(obj, auto=True)
+
+    registered = [info for name, info in dict.iteritems(plugins) if name not in known]
+    _module_info[modulename] = {
+        # Modules failing to import are kept eager so that their warnings are shown on every run
+        'eager': failed or _import_side_effects() != side_effects or any(p.builtin for p in registered),
+        'options': [list(args) for args, kwargs in _plugin_options[options:]],
+        'plugins': dict((p.name, {
+            'phases': dict((phase, event.priority) for phase, event in p.phase_handlers.iteritems()),
+            'groups': list(p.groups),
+            'api_ver': p.api_ver,
+            'builtin': p.builtin,
+            'validator': hasattr(p.instance, 'validator')}) for p in registered)}
+
+
+def _manifest_files(modulenames):
+    files = {}
+    for modulename in modulenames:
+        path = _loaded_plugins[modulename]
+        stat = os.stat(path)
+        files[modulename] = [path, stat.st_mtime, stat.st_size]
+    return files
+
+
+def get_manifest_path():
+    """Return the default plugin manifest path, or None if there is no place for it."""
+    base = os.path.join(os.path.expanduser('~'), '.flexget')
+    if os.path.isdir(base):
+        return os.path.join(base, 'plugin_manifest.json')
+
+
+def read_plugin_manifest(path, modulenames):
+    """
+    :param string path: Path of the plugin manifest
+    :param list modulenames: Names of the found plugin modules
+    :return: Dict of module name -> module info from the manifest, or None if the manifest is missing or outdated.
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (IOError, ValueError), e:
+        log.debug('Cannot use plugin manifest %s: %s' % (path, e))
+        return None
+    try:
+        if manifest.get('version') != MANIFEST_VERSION or manifest['files'] != _manifest_files(modulenames):
+            log.debug('Plugin manifest %s is outdated' % path)
+            return None
+    except (OSError, KeyError, AttributeError), e:
+        log.debug('Cannot use plugin manifest %s: %s' % (path, e))
+        return None
+    return manifest['modules']
+
+
+def write_plugin_manifest(path, modulenames):
+    """Writes manifest of given plugin modules, all of them must have been imported."""
+    manifest = {'version': MANIFEST_VERSION,
+                'files': _manifest_files(modulenames),
+                'modules': dict((modulename, _module_info[modulename]) for modulename in modulenames)}
+    tmp_path = '%s.%s.tmp' % (path, os.getpid())
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        if sys.platform == 'win32' and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+    except (IOError, OSError, TypeError), e:
+        log.debug('Failed to write plugin manifest %s: %s' % (path, e))
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    else:
+        log.debug('Wrote plugin manifest %s' % path)
+
+
+def _load_pending(name):
+    """Imports the plugin module of plugin :name: if it is known only from the manifest."""
+    # Lock is held during the import, so plugins being imported by another thread are waited for
+    if _pending_plugins or _importing:
+        with _pending_lock:
+            modulename = _pending_plugins.get(name)
+            if modulename:
+                _load_pending_module(modulename)
+
+
+def _load_pending_module(modulename):
+    with _pending_lock:
+        info = _pending_modules.pop(modulename, None)
+        if info is None:
+            return
+        # Removed before importing since the module looks up its own plugins while registering them
+        for name in info['plugins']:
+            _pending_plugins.pop(name, None)
+        log.debug('Importing plugin module %s on demand' % modulename)
+        _importing.append(modulename)
+        try:
+            _import_plugin_module(modulename)
+        finally:
+            _importing.remove(modulename)
+
+
+def load_pending_plugins(phase=None, group=None):
+    """
+    Imports plugin modules known from the plugin manifest which have not been imported yet.
+
+    :param string phase: Import only modules with plugins hooking this phase
+    :param string group: Import only modules with plugins in this group
+    """
+    if not _pending_modules:
+        return
+    for modulename, info in _pending_modules.items():
+        if phase and not any(phase in p['phases'] for p in info['plugins'].itervalues()):
+            continue
+        if group and not any(group in p['groups'] for p in info['plugins'].itervalues()):
+            continue
+        _load_pending_module(modulename)
+
+
+def load_plugins(parser, manifest=None):
+    """
+    Load plugins from the standard plugin paths.
+
+    :param parser: Parser where plugin options are added
+    :param string manifest: Optional path of the plugin manifest, see :func:`load_plugins_from_dirs`
+    """
     global plugins_loaded, _parser
 
     if plugins_loaded:
@@ -579,7 +817,8 @@ def load_plugins(parser):
     start_time = time.time()
     _parser = parser
     try:
-        load_plugins_from_dirs(get_standard_plugins_path())
+        with startup_profiler.section('load_plugins'):
+            load_plugins_from_dirs(get_standard_plugins_path(), manifest)
     finally:
         _parser = None
     took = time.time() - start_time
@@ -591,7 +830,8 @@ def get_plugins_by_phase(phase):
     """Return an iterator over all plugins that hook :phase:"""
     if not phase in phase_methods:
         raise Exception('Unknown phase %s' % phase)
-    return (p for p in plugins.itervalues() if phase in p.phase_handlers)
+    load_pending_plugins(phase=phase)
+    return (p for p in dict.itervalues(plugins) if phase in p.phase_handlers)
 
 
 def get_phases_by_plugin(name):
@@ -601,12 +841,27 @@ def get_phases_by_plugin(name):
 
 def get_plugins_by_group(group):
     """Return an iterator over all plugins with in specified group."""
-    return (p for p in plugins.itervalues() if group in p.get('groups'))
+    load_pending_plugins(group=group)
+    return (p for p in dict.itervalues(plugins) if group in p.get('groups'))
 
 
 def get_plugin_keywords():
     """Return iterator over all plugin keywords."""
-    return plugins.iterkeys()
+    return itertools.chain(dict.keys(plugins), list(_pending_plugins))
+
+
+def get_loaded_plugins():
+    """Return an iterator over plugins which have been imported, does not import plugins known only from manifest."""
+    return dict.itervalues(plugins)
+
+
+def get_validated_plugin_keywords():
+    """Return list of keywords of all plugins which have a validator, without importing any plugins."""
+    keywords = [name for name, p in dict.iteritems(plugins) if hasattr(p.instance, 'validator')]
+    with _pending_lock:
+        for info in _pending_modules.itervalues():
+            keywords.extend(name for name, p in info['plugins'].iteritems() if p['validator'])
+    return keywords
 
 
 def get_plugin_by_name(name, issued_by='???'):
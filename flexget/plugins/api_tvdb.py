@@ -10,7 +10,7 @@ from sqlalchemy.schema import ForeignKey
 from sqlalchemy.orm import relation
 from requests import RequestException
 from flexget import schema
-from flexget.utils.tools import decode_html
+from flexget.utils.tools import decode_html, chunked
 from flexget.utils.requests import Session as ReqSession
 from flexget.utils.database import with_session, pipe_list_synonym, text_date_synonym
 from flexget.utils.sqlalchemy_utils import table_add_column
@@ -441,11 +441,6 @@ def mark_expired(session=None):
         for episode in updates.findAll('episode', recursive=False):
             expired_series.append(int(episode.id.string))
 
-        def chunked(seq):
-            """Helper to divide our expired lists into sizes sqlite can handle in a query. (<1000)"""
-            for i in xrange(0, len(seq), 900):
-                yield seq[i:i + 900]
-
         # Update our cache to mark the items that have expired
         for chunk in chunked(expired_series):
             num = session.query(TVDBSeries).filter(TVDBSeries.id.in_(chunk)).update({'expired': True}, 'fetch')
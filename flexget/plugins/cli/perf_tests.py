@@ -18,6 +18,10 @@ class PerfTests(object):
         try:
             if test_name == 'imdb_query':
                 self.imdb_query(session)
+            elif test_name == 'series_parse':
+                self.series_parse()
+            elif test_name == 'quality_parse':
+                self.quality_parse()
             else:
                 log.critical('Unknown performance test %s' % test_name)
         finally:
@@ -70,6 +74,132 @@ class PerfTests(object):
         took = time.time() - start_time
         log.debug('Took %.2f seconds to query %i movies' % (took, len(imdb_urls)))
 
+    def series_parse(self):
+        import time
+        import random
+        from flexget.utils.titles import SeriesParser, SeriesIndex, ParseWarning
+
+        def parse(parser, title):
+            try:
+                parser.parse(title)
+            except ParseWarning:
+                pass
+            return parser.valid
+
+        random.seed(0)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        words = [''.join(random.choice(letters) for i in xrange(random.randint(3, 9))) for i in xrange(5000)]
+        # Sample of entries to run the unindexed parse on, running it on all would take hours with 10k series
+        sample_size = 100
+
+        for series_count in (1000, 10000):
+            for entry_count in (1000, 10000):
+                names = set()
+                while len(names) < series_count * 2:
+                    names.add(' '.join(random.sample(words, random.randint(1, 3))).title())
+                names = list(names)
+                # Half of the entries are for series which are not configured
+                configured = names[:series_count]
+                titles = ['%s.S%02dE%02d.720p.HDTV.x264-GRP' % (random.choice(names).replace(' ', '.'),
+                                                                random.randint(1, 9), random.randint(1, 20))
+                          for i in xrange(entry_count)]
+                sample = titles[:sample_size]
+
+                start_time = time.time()
+                parsers = [SeriesParser(name) for name in configured]
+                plain = set()
+                for parser in parsers:
+                    for title in sample:
+                        if parse(parser, title):
+                            plain.add((parser.name, title))
+                plain_took = (time.time() - start_time) * entry_count / len(sample)
+
+                start_time = time.time()
+                index = SeriesIndex()
+                for name in configured:
+                    index.add(name)
+                parsers = dict((name, SeriesParser(name)) for name in configured)
+                indexed = set()
+                for title in titles:
+                    for name in index.find(title):
+                        if parse(parsers[name], title):
+                            indexed.add((name, title))
+                indexed_took = time.time() - start_time
+
+                identical = plain == set(result for result in indexed if result[1] in sample)
+                log.info('%i series x %i entries: unindexed %.2fs (estimated from %i entries), indexed %.2fs, '
+                         'speedup %.0fx, identical results: %s' % (series_count, entry_count, plain_took,
+                         len(sample), indexed_took, plain_took / indexed_took, identical))
+
+    def quality_parse(self):
+        import time
+        import random
+        from flexget.utils import qualities
+
+        def legacy_parse(text):
+            """Quality parsing as it was done before combined regexps and parse cache."""
+            result = []
+            for qlist in (qualities._resolutions, qualities._sources, qualities._codecs, qualities._audios):
+                best = qualities._UNKNOWNS[qlist[0].type]
+                clean_text = text
+                for item in qlist:
+                    match = item.regexp.search(text)
+                    if match:
+                        best, clean_text = item, text[:match.start()] + text[match.end():]
+                        if item.modifier is not None:
+                            break
+                text = clean_text
+                result.append(best)
+            for component in list(result):
+                for default in component.defaults:
+                    default = qualities._registry[default]
+                    if not result[types.index(default.type)]:
+                        result[types.index(default.type)] = default
+            return result
+
+        types = ['resolution', 'source', 'codec', 'audio']
+        random.seed(0)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        names = ['.'.join(''.join(random.choice(letters) for i in xrange(random.randint(3, 8))).title()
+                          for j in xrange(random.randint(1, 3))) for k in xrange(2000)]
+        series_qualities = ['720p.HDTV.x264', 'HDTV.XviD', '1080p.WEB-DL.DD5.1.H.264', 'PDTV.XviD', '480p.WEB-DL.x264',
+                            '1080i.HDTV.MPEG2', 'DSR.XviD', 'WEBRip.x264', '720p.BluRay.x264', 'HDTV']
+        movie_qualities = ['DVDRip.XviD', 'BRRip.XviD.AC3', '720p.BluRay.x264.DTS', 'CAM.XviD', 'TS.XviD',
+                           'R5.LiNE.XviD', 'DVDSCR.XviD', '1080p.BluRay.x264.10bit', 'BDRip.x264.AAC', 'HDRip.XviD.AC3']
+        groups = ['LOL', 'DIMENSION', 'ASAP', 'FQM', 'KILLERS', 'EVOLVE', 'SPARKS', 'AMIABLE', 'NoGRP', 'iMMORTALs']
+        literals = ['720p hdtv', '1080p', 'hdtv', 'webdl', 'dvdrip', 'bluray', '720p bluray', 'sdtv']
+
+        for entry_count in (1000, 10000):
+            corpus = []
+            for i in xrange(entry_count):
+                name = random.choice(names)
+                if random.random() < 0.7:
+                    corpus.append('%s.S%02dE%02d.%s-%s' % (name, random.randint(1, 9), random.randint(1, 24),
+                                                           random.choice(series_qualities), random.choice(groups)))
+                else:
+                    corpus.append('%s.%s.%s-%s' % (name, random.randint(1950, 2012), random.choice(movie_qualities),
+                                                   random.choice(groups)))
+            # Entries are usually compared against a few quality literals from the config
+            corpus += [random.choice(literals) for i in xrange(entry_count)]
+
+            start_time = time.time()
+            legacy = [legacy_parse(text) for text in corpus]
+            legacy_took = time.time() - start_time
+
+            qualities._parse_cache.clear()
+            start_time = time.time()
+            compiled = [qualities.Quality(text).components for text in corpus]
+            compiled_took = time.time() - start_time
+
+            start_time = time.time()
+            for text in corpus:
+                qualities.Quality(text)
+            cached_took = time.time() - start_time
+
+            log.info('%i titles + %i literals: legacy %.3fs, compiled %.3fs (speedup %.1fx), fully cached %.3fs '
+                     '(speedup %.1fx), identical results: %s' % (entry_count, entry_count, legacy_took, compiled_took,
+                     legacy_took / compiled_took, cached_took, legacy_took / cached_took, legacy == compiled))
+
 
 register_plugin(PerfTests, 'perftests', api_ver=2, debug=True, builtin=True)
 register_parser_option('--perf-test', action='store', dest='perf_test', default='',
@@ -3,6 +3,9 @@ from flexget.plugin import register_plugin, add_plugin_validators, PluginError,
 
 log = logging.getLogger('crossmatch')
 
+# entries without the field never intersect on it
+MISSING = object()
+
 
 class CrossMatch(object):
     """
@@ -54,45 +57,75 @@ class CrossMatch(object):
                     log.warning('Input %s did not return anything' % input_name)
                     continue
 
+        if not result:
+            # nothing to intersect with, avoid evaluating lazy fields of the entries
+            return
+
+        index = self.build_index(result, fields)
+        log.debug('checking %s entries against %s entries from inputs' % (len(task.entries), len(result)))
+
         # perform action on intersecting entries
         for entry in task.entries:
-            for generated_entry in result:
-                log.trace('checking if %s matches %s' % (entry['title'], generated_entry['title']))
-                common = self.entry_intersects(entry, generated_entry, fields)
-                if common:
-                    msg = 'intersects with %s on field(s) %s' % \
-                          (generated_entry['title'], ', '.join(common))
-                    if action == 'reject':
-                        task.reject(entry, msg)
-                    if action == 'accept':
-                        task.accept(entry, msg)
-
-    def entry_intersects(self, e1, e2, fields=None):
+            matches = self.find_intersecting(entry, index, fields)
+            for position in sorted(matches):
+                msg = 'intersects with %s on field(s) %s' % \
+                      (result[position]['title'], ', '.join(matches[position]))
+                if action == 'reject':
+                    task.reject(entry, msg)
+                if action == 'accept':
+                    task.accept(entry, msg)
+
+    def build_index(self, entries, fields):
         """
-        :param e1: First :class:`flexget.entry.Entry`
-        :param e2: Second :class:`flexget.entry.Entry`
-        :param fields: List of fields which are checked
-        :return: List of field names in common
-        """
-
-        if fields is None:
-            fields = []
+        Index entries by their field values, so that intersecting entries can be found without comparing
+        against all of them.
 
-        common_fields = []
+        :param entries: List of :class:`flexget.entry.Entry`
+        :param fields: List of fields which are indexed
+        :return: Dict of field name to tuple (dict of value to entry positions, list of (position, value) pairs
+          for values that cannot be hashed)
+        """
+        index = {}
+        for field in fields:
+            by_value = {}
+            unhashable = []
+            for position, entry in enumerate(entries):
+                value = entry.get(field, MISSING)
+                if value is MISSING:
+                    continue
+                try:
+                    by_value.setdefault(value, []).append(position)
+                except TypeError:
+                    unhashable.append((position, value))
+            index[field] = (by_value, unhashable)
+        return index
 
+    def find_intersecting(self, entry, index, fields):
+        """
+        :param entry: :class:`flexget.entry.Entry` to look up
+        :param index: Index from :meth:`build_index`
+        :param fields: List of fields which are checked
+        :return: Dict of entry positions in the index to list of field names in common
+        """
+        matches = {}
         for field in fields:
-            # TODO: simplify if seems to work (useless debug)
-            log.trace('checking field %s' % field)
-            v1 = e1.get(field, object())
-            v2 = e2.get(field, object())
-            log.trace('v1: %r' % v1)
-            log.trace('v2: %r' % v2)
-
-            if v1 == v2:
-                common_fields.append(field)
-            else:
-                log.trace('not matching')
-        return common_fields
+            by_value, unhashable = index[field]
+            if not by_value and not unhashable:
+                # no entry has the field, do not evaluate it
+                continue
+            value = entry.get(field, MISSING)
+            if value is MISSING:
+                continue
+            try:
+                positions = list(by_value.get(value, []))
+            except TypeError:
+                # unhashable value, can still be equal to some of the indexed ones
+                positions = [position for indexed_value, indexed in by_value.iteritems() if value == indexed_value
+                             for position in indexed]
+            positions.extend(position for position, indexed_value in unhashable if value == indexed_value)
+            for position in positions:
+                matches.setdefault(position, []).append(field)
+        return matches
 
 
 register_plugin(CrossMatch, 'crossmatch', api_ver=2)
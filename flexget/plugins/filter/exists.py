@@ -1,6 +1,7 @@
 import os
 import logging
 from flexget.plugin import register_plugin, priority, PluginWarning
+from flexget.utils.filesystem_index import walk
 
 log = logging.getLogger('exists')
 
@@ -37,20 +38,22 @@ class FilterExists(object):
             return
         log.verbose('Scanning path(s) for existing files.')
         config = self.get_config(task)
+        accepted = {}
+        for entry in task.accepted:
+            accepted.setdefault(entry['title'], []).append(entry)
         for path in config:
             # unicode path causes crashes on some paths
             path = str(os.path.expanduser(path))
             if not os.path.exists(path):
                 raise PluginWarning('Path %s does not exist' % path, log)
             # scan through
-            for root, dirs, files in os.walk(path):
+            for root, dirs, files in walk(path, task.session):
                 # convert filelists into utf-8 to avoid unicode problems
-                dirs = [x.decode('utf-8', 'ignore') for x in dirs]
-                files = [x.decode('utf-8', 'ignore') for x in files]
-                for entry in task.accepted:
-                    name = entry['title']
-                    if name in dirs or name in files:
+                for name in dirs + files:
+                    name = name.decode('utf-8', 'ignore')
+                    if name in accepted:
                         log.debug('Found %s in %s' % (name, root))
-                        task.reject(entry, os.path.join(root, name))
+                        for entry in accepted[name]:
+                            task.reject(entry, os.path.join(root, name))
 
 register_plugin(FilterExists, 'exists')
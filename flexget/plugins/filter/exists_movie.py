@@ -2,6 +2,7 @@ import os
 import logging
 from flexget.plugin import register_plugin, priority, PluginError, get_plugin_by_name
 from flexget.utils.titles.movie import MovieParser
+from flexget.utils.filesystem_index import walk
 
 log = logging.getLogger('exists_movie')
 
@@ -77,7 +78,7 @@ class FilterExistsMovie(object):
             #logging.getLogger('imdb_lookup').setLevel(logging.WARNING)
 
             # scan through
-            for root, dirs, files in os.walk(path):
+            for root, dirs, files in walk(path, task.session):
                 # convert filelists into utf-8 to avoid unicode problems
                 dirs = [x.decode('utf-8', 'ignore') for x in dirs]
                 # files = [x.decode('utf-8', 'ignore') for x in files]
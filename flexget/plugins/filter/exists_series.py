@@ -2,7 +2,8 @@ import copy
 import os
 import logging
 from flexget.plugin import register_plugin, priority, PluginWarning
-from flexget.utils.titles import SeriesParser, ParseWarning
+from flexget.utils.titles import SeriesParser, SeriesIndex, ParseWarning
+from flexget.utils.filesystem_index import walk
 
 log = logging.getLogger('exists_series')
 
@@ -55,6 +56,12 @@ class FilterExistsSeries(object):
                 log.debug('Scanning not needed')
             return
 
+        # Names on disk are only parsed for the series they may belong to
+        index = SeriesIndex()
+        for series, entries in accepted_series.iteritems():
+            parser = entries[0]['series_parser']
+            index.add(series, None if parser.re_from_name else list(parser.name_regexps))
+
         config = self.get_config(task)
         for path in config.get('path'):
             log.verbose('Scanning %s' % path)
@@ -63,15 +70,14 @@ class FilterExistsSeries(object):
             if not os.path.exists(path):
                 raise PluginWarning('Path %s does not exist' % path, log)
             # scan through
-            for root, dirs, files in os.walk(path):
+            for root, dirs, files in walk(path, task.session):
                 # convert filelists into utf-8 to avoid unicode problems
-                dirs = [x.decode('utf-8', 'ignore') for x in dirs]
-                files = [x.decode('utf-8', 'ignore') for x in files]
-                # For speed, only test accepted entries since our priority should be after everything is accepted.
-                for series in accepted_series:
-                    # make new parser from parser in entry
-                    disk_parser = copy.copy(accepted_series[series][0]['series_parser'])
-                    for name in files + dirs:
+                for name in files + dirs:
+                    name = name.decode('utf-8', 'ignore')
+                    # For speed, only test accepted entries since our priority should be after everything is accepted.
+                    for series in index.find(name):
+                        # make new parser from parser in entry
+                        disk_parser = copy.copy(accepted_series[series][0]['series_parser'])
                         # run parser on filename data
                         disk_parser.data = name
                         try:
@@ -80,33 +86,37 @@ class FilterExistsSeries(object):
                             from flexget.utils.log import log_once
                             log_once(pw.value, logger=log)
                         if disk_parser.valid:
-                            log.debug('name %s is same series as %s' % (name, series))
-                            log.debug('disk_parser.identifier = %s' % disk_parser.identifier)
-                            log.debug('disk_parser.quality = %s' % disk_parser.quality)
-                            log.debug('disk_parser.proper_count = %s' % disk_parser.proper_count)
+                            self.reject_existing(task, config, series, disk_parser, accepted_series[series])
+
+    def reject_existing(self, task, config, series, disk_parser, entries):
+        """Reject `entries` of `series` which are already on disk as parsed by `disk_parser`."""
+        log.debug('name %s is same series as %s' % (disk_parser.data, series))
+        log.debug('disk_parser.identifier = %s' % disk_parser.identifier)
+        log.debug('disk_parser.quality = %s' % disk_parser.quality)
+        log.debug('disk_parser.proper_count = %s' % disk_parser.proper_count)
 
-                            for entry in accepted_series[series]:
-                                log.debug('series_parser.identifier = %s' % entry['series_parser'].identifier)
-                                if disk_parser.identifier != entry['series_parser'].identifier:
-                                    log.trace('wrong identifier')
-                                    continue
-                                log.debug('series_parser.quality = %s' % entry['series_parser'].quality)
-                                if config.get('allow_different_qualities') == 'better':
-                                    if entry['series_parser'].quality > disk_parser.quality:
-                                        log.trace('better quality')
-                                        continue
-                                elif config.get('allow_different_qualities'):
-                                    if disk_parser.quality != entry['series_parser'].quality:
-                                        log.trace('wrong quality')
-                                        continue
-                                log.debug('entry parser.proper_count = %s' % entry['series_parser'].proper_count)
-                                if disk_parser.proper_count >= entry['series_parser'].proper_count:
-                                    task.reject(entry, 'proper already exists')
-                                    continue
-                                else:
-                                    log.trace('new one is better proper, allowing')
-                                    continue
+        for entry in entries:
+            log.debug('series_parser.identifier = %s' % entry['series_parser'].identifier)
+            if disk_parser.identifier != entry['series_parser'].identifier:
+                log.trace('wrong identifier')
+                continue
+            log.debug('series_parser.quality = %s' % entry['series_parser'].quality)
+            if config.get('allow_different_qualities') == 'better':
+                if entry['series_parser'].quality > disk_parser.quality:
+                    log.trace('better quality')
+                    continue
+            elif config.get('allow_different_qualities'):
+                if disk_parser.quality != entry['series_parser'].quality:
+                    log.trace('wrong quality')
+                    continue
+            log.debug('entry parser.proper_count = %s' % entry['series_parser'].proper_count)
+            if disk_parser.proper_count >= entry['series_parser'].proper_count:
+                task.reject(entry, 'proper already exists')
+                continue
+            else:
+                log.trace('new one is better proper, allowing')
+                continue
 
-                                task.reject(entry, 'episode already exists')
+            task.reject(entry, 'episode already exists')
 
 register_plugin(FilterExistsSeries, 'exists_series', groups=['exists'])
@@ -1,22 +1,64 @@
 import logging
 import re
 import datetime
-from copy import copy
 from collections import defaultdict
 from flexget.task import Task
 from flexget.plugin import register_plugin, plugins as all_plugins, get_plugin_by_name, phase_methods
 
 log = logging.getLogger('if')
 
+ALLOWED_BUILTINS = ['True', 'False', 'str', 'unicode', 'int', 'float', 'len', 'any', 'all', 'sorted']
+UNSAFE_STATEMENT = re.compile(r'__|try\s*:|lambda')
+
+# Compiled code objects of checked statements
+_compiled = {}
+MAX_COMPILED = 1000
+
+
+def compile_statement(statement):
+    """
+    Checks that `statement` is safe to evaluate and compiles it. Results are cached.
+
+    :raises ValueError: If statement contains `__`, lambda or try blocks
+    :raises SyntaxError: If statement is not a valid expression
+    """
+    code = _compiled.get(statement)
+    if code is None:
+        if UNSAFE_STATEMENT.search(statement):
+            raise ValueError('`__`, lambda or try blocks not allowed in if statements.')
+        code = compile(statement, '<if>', 'eval')
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        _compiled[statement] = code
+    return code
+
 
 def safer_eval(statement, locals):
     """A safer eval function. Does not allow __ or try statements, only includes certain 'safe' builtins."""
-    allowed_builtins = ['True', 'False', 'str', 'unicode', 'int', 'float', 'len', 'any', 'all', 'sorted']
-    for name in allowed_builtins:
+    for name in ALLOWED_BUILTINS:
         locals[name] = globals()['__builtins__'].get(name)
-    if re.search(r'__|try\s*:|lambda', statement):
-        raise ValueError('`__`, lambda or try blocks not allowed in if statements.')
-    return eval(statement, {'__builtins__': None}, locals)
+    return eval(compile_statement(statement), {'__builtins__': None}, locals)
+
+
+class EntryNamespace(object):
+    """
+    Read-only mapping used as eval namespace for conditions. Names are looked up from `extra` first and then from
+    the entry, so lazy fields of the entry are only evaluated when a condition uses them.
+    """
+
+    def __init__(self, entry, extra):
+        self.entry = entry
+        self.extra = extra
+
+    def has_field(self, field):
+        return field in self.entry
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        if key == 'has_field':
+            return self.has_field
+        return self.entry[key]
 
 
 class FilterIf(object):
@@ -47,9 +89,15 @@ class FilterIf(object):
         """Divide the config into parts based on which phase they need to run on."""
         phase_dict = self.task_phases[task.name] = defaultdict(lambda: [])
         for item in config:
-            action = item.values()[0]
+            requirement, action = item.items()[0]
+            try:
+                code = compile_statement(requirement)
+            except (ValueError, SyntaxError), e:
+                # Statement is skipped, errors are logged when it would be evaluated
+                log.error('Invalid if statement `%s`: %s' % (requirement, e))
+                code = None
             if isinstance(action, basestring):
-                phase_dict['filter'].append(item)
+                phase_dict['filter'].append((requirement, code, action))
             else:
                 for plugin_name, plugin_config in action.iteritems():
                     plugin = get_plugin_by_name(plugin_name)
@@ -62,19 +110,29 @@ class FilterIf(object):
                                 # Print to debug, as validator will show user error message
                                 log.debug('Cannot run api < 2 plugins.')
                         else:
-                            phase_dict[phase].append(item)
-
-    def check_condition(self, condition, entry):
-        """Checks if a given `entry` passes `condition`"""
-        # Make entry fields and other utilities available in the eval namespace
-        # We need our namespace to be an Entry instance for lazy loading to work
-        eval_locals = copy(entry)
-        eval_locals.update({'has_field': lambda f: f in entry,
-                            'timedelta': datetime.timedelta,
-                            'now': datetime.datetime.now()})
+                            phase_dict[phase].append((requirement, code, action))
+
+    def namespace(self):
+        """Returns names available in conditions in addition to the entry fields and `has_field`."""
+        namespace = dict((name, globals()['__builtins__'].get(name)) for name in ALLOWED_BUILTINS)
+        namespace.update({'timedelta': datetime.timedelta,
+                          'now': datetime.datetime.now()})
+        return namespace
+
+    def check_condition(self, condition, entry, code=None, namespace=None):
+        """
+        Checks if a given `entry` passes `condition`
+
+        :param code: Compiled `condition`, compiled here if not given
+        :param namespace: Extra names for the eval namespace, see :meth:`namespace`
+        """
         try:
-            # Restrict eval namespace to have no globals and locals only from eval_locals
-            passed = safer_eval(condition, eval_locals)
+            if code is None:
+                code = compile_statement(condition)
+            if namespace is None:
+                namespace = self.namespace()
+            # Restrict eval namespace to have no globals, names are looked up from the namespace and entry fields
+            passed = eval(code, {'__builtins__': None}, EntryNamespace(entry, namespace))
             if passed:
                 log.debug('%s matched requirement %s' % (entry['title'], condition))
             return passed
@@ -102,9 +160,12 @@ class FilterIf(object):
                 'accept': task.accept,
                 'reject': task.reject,
                 'fail': task.fail}
-            for item in self.task_phases[task.name][phase]:
-                requirement, action = item.items()[0]
-                passed_entries = [e for e in task.entries if self.check_condition(requirement, e)]
+            # Shared by all conditions and entries on this phase
+            namespace = self.namespace()
+            for requirement, code, action in self.task_phases[task.name][phase]:
+                if code is None:
+                    continue
+                passed_entries = [e for e in task.entries if self.check_condition(requirement, e, code, namespace)]
                 if passed_entries:
                     if isinstance(action, basestring):
                         # Simple entry action (accept, reject or fail) was specified as a string
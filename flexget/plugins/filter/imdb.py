@@ -85,18 +85,18 @@ class FilterImdb(object):
     @priority(120)
     def on_task_filter(self, task, config):
 
-        lookup = get_plugin_by_name('imdb_lookup').instance.lookup
+        lookup_all = get_plugin_by_name('imdb_lookup').instance.lookup_all
 
         # since the plugin does not reject anything, no sense going trough accepted
-        for entry in task.undecided:
+        entries = list(task.undecided)
+        errors = dict((id(entry), error) for entry, error in lookup_all(entries))
+        for entry in entries:
 
             force_accept = False
 
-            try:
-                lookup(entry)
-            except PluginError, e:
+            if id(entry) in errors:
                 # logs skip message once trough log_once (info) and then only when ran from cmd line (w/o --cron)
-                msg = 'Skipping %s because of an error: %s' % (entry['title'], e.value)
+                msg = 'Skipping %s because of an error: %s' % (entry['title'], errors[id(entry)].value)
                 if not log_once(msg, logger=log):
                     log.verbose(msg)
                 continue
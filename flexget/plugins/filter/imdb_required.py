@@ -1,5 +1,5 @@
 import logging
-from flexget.plugin import register_plugin, priority, get_plugin_by_name, PluginError
+from flexget.plugin import register_plugin, priority, get_plugin_by_name
 
 log = logging.getLogger('imdb_required')
 
@@ -20,11 +20,10 @@ class FilterImdbRequired(object):
 
     @priority(32)
     def on_task_filter(self, task):
-        for entry in task.entries:
-            try:
-                get_plugin_by_name('imdb_lookup').instance.lookup(entry)
-            except PluginError:
-                task.reject(entry, 'imdb required')
+        entries = list(task.entries)
+        for entry, error in get_plugin_by_name('imdb_lookup').instance.lookup_all(entries):
+            task.reject(entry, 'imdb required')
+        for entry in entries:
             if 'imdb_url' not in entry and 'imdb_id' not in entry:
                 task.reject(entry, 'imdb required')
 
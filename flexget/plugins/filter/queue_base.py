@@ -31,10 +31,13 @@ class QueuedItem(Base):
 class FilterQueueBase(object):
     """Base class to handle general tasks of keeping a queue of wanted items."""
 
-    def on_task_start(self, task, config):
-        # Dict of entries accepted by this plugin {imdb_id: entry} format
+    def __init__(self):
+        # Entries accepted by this plugin for each task {task name: {item id: entry}}, tasks may execute concurrently
         self.accepted_entries = {}
 
+    def on_task_start(self, task, config):
+        self.accepted_entries[task.name] = {}
+
     def validator(self):
         """Default validator just accepts a boolean, can be overridden by subclasses"""
         from flexget import validator
@@ -49,21 +52,22 @@ class FilterQueueBase(object):
         if config is False:
             return
 
+        accepted_entries = self.accepted_entries[task.name]
         for entry in task.entries:
             item = self.matches(task, config, entry)
-            if item and item.id not in self.accepted_entries:
+            if item and item.id not in accepted_entries:
                 # Accept this entry if it matches a queue item that has not been accepted this run yet
                 if item.immortal:
                     entry['immortal'] = True
                 task.accept(entry, reason='Matches %s queue item: %s' % (item.discriminator, item.title))
                 # Keep track of entries we accepted, so they can be marked as downloaded on task_exit if successful
-                self.accepted_entries[item.id] = entry
+                accepted_entries[item.id] = entry
 
     def on_task_exit(self, task, config):
         if config is False:
             return
 
-        for id, entry in self.accepted_entries.iteritems():
+        for id, entry in self.accepted_entries.pop(task.name, {}).iteritems():
             if entry in task.accepted and entry not in task.failed:
                 # If entry was not rejected or failed, mark it as downloaded
                 update_values = {'downloaded': datetime.now(),
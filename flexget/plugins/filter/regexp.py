@@ -1,7 +1,10 @@
 import urllib
+import copy
 import logging
 import re
 from flexget.plugin import register_plugin, priority, get_plugin_by_name
+from flexget.utils.cached_input import config_hash
+from flexget.utils.tools import RegexpIndex
 
 log = logging.getLogger('regexp')
 
@@ -34,6 +37,10 @@ class FilterRegexp(object):
         Possible operations: accept, reject, accept_excluding, reject_excluding
     """
 
+    def __init__(self):
+        # prepared configs by config hash, compiling thousands of regexps on every run is slow
+        self.prepared = {}
+
     def validator(self):
         from flexget import validator
 
@@ -83,6 +90,8 @@ class FilterRegexp(object):
             not: a list of compiled regexps that if matching, will disqualify the main match
         :return: New config dictionary
         """
+        # Do not modify the task config, options are changed in place
+        config = copy.deepcopy(config)
         out_config = {}
         if 'rest' in config:
             out_config['rest'] = config['rest']
@@ -117,15 +126,29 @@ class FilterRegexp(object):
                 out_config.setdefault(operation, []).append({regexp: opts})
         return out_config
 
+    def get_config(self, config):
+        """Returns prepared config and indexes of regexps for each operation, reusing them while config stays same."""
+        key = config_hash(config)
+        if key not in self.prepared:
+            prepared = self.prepare_config(config)
+            indexes = {}
+            for operation, regexps in prepared.iteritems():
+                if operation != 'rest':
+                    indexes[operation] = RegexpIndex([regexp_opts.keys()[0] for regexp_opts in regexps])
+            if len(self.prepared) > 100:
+                self.prepared.clear()
+            self.prepared[key] = (prepared, indexes)
+        return self.prepared[key]
+
     @priority(172)
     def on_task_filter(self, task, config):
         # TODO: what if accept and accept_excluding configured? Should raise error ...
-        config = self.prepare_config(config)
+        config, indexes = self.get_config(config)
         rest = []
         for operation, regexps in config.iteritems():
             if operation == 'rest':
                 continue
-            r = self.filter(task, operation, regexps)
+            r = self.filter(task, operation, regexps, indexes.get(operation))
             if not rest:
                 rest = r
             else:
@@ -172,13 +195,39 @@ class FilterRegexp(object):
                         return field
         return None
 
-    def filter(self, task, operation, regexps):
+    def candidates(self, entry, index, find_from, found):
+        """
+        Returns positions of regexps in `index` which may match some of the `find_from` fields of `entry`.
+
+        :param found: Dict used to remember candidates of each field for the entry
+        """
+        result = set()
+        for field in find_from or ['title', 'description']:
+            key = (field, bool(find_from))
+            if key not in found:
+                found[key] = set()
+                # Same rules for evaluating lazy fields as in matches
+                if entry.get(field, eval_lazy=find_from):
+                    values = entry[field]
+                    if not isinstance(values, list):
+                        values = [values]
+                    for value in values:
+                        if not isinstance(value, basestring):
+                            continue
+                        if field == 'url':
+                            value = urllib.unquote(value)
+                        found[key].update(index.candidates(value))
+            result.update(found[key])
+        return result
+
+    def filter(self, task, operation, regexps, index=None):
         """
         :param task: Task instance
         :param operation: one of 'accept' 'reject' 'accept_excluding' and 'reject_excluding'
                           accept and reject will be called on the entry if any of the regxps match
                           *_excluding operations will be called if any of the regexps don't match
         :param regexps: list of {compiled_regexp: options} dictionaries
+        :param index: Optional :class:`RegexpIndex` of the regexps, used to skip regexps which cannot match
         :return: Return list of entries that didn't match regexps
         """
 
@@ -187,11 +236,22 @@ class FilterRegexp(object):
         match_mode = 'excluding' not in operation
         for entry in task.entries:
             log.trace('testing %i regexps to %s' % (len(regexps), entry['title']))
-            for regexp_opts in regexps:
+            found = {}
+            # candidate positions for each distinct from list, regexps mostly share the same few
+            candidates = {}
+            for position, regexp_opts in enumerate(regexps):
                 regexp, opts = regexp_opts.items()[0]
 
                 # check if entry matches given regexp configuration
-                field = self.matches(entry, regexp, opts.get('from'), opts.get('not'))
+                if index:
+                    find_from = opts.get('from')
+                    key = tuple(find_from) if find_from else None
+                    if key not in candidates:
+                        candidates[key] = self.candidates(entry, index, find_from, found)
+                if index and position not in candidates[key]:
+                    field = None
+                else:
+                    field = self.matches(entry, regexp, opts.get('from'), opts.get('not'))
 
                 # Run if we are in match mode and have a hit, or are in non-match mode and don't have a hit
                 if match_mode == bool(field):
@@ -9,16 +9,20 @@ forget (string)
 """
 
 import logging
+import hashlib
+import struct
 from datetime import datetime, timedelta
 from sqlalchemy import Column, Integer, String, DateTime, Unicode, Boolean, asc, or_, select, update, Index
 from sqlalchemy.schema import ForeignKey
 from sqlalchemy.orm import relation
 from flexget.manager import Session
+from flexget.entry import resolve_lazy_fields
 from flexget.event import event
 from flexget.plugin import register_plugin, priority, register_parser_option
 from flexget import schema
 from flexget.utils.sqlalchemy_utils import table_schema, table_add_column
 from flexget.utils.imdb import is_imdb_url, extract_id
+from flexget.utils.tools import chunked
 
 log = logging.getLogger('seen')
 Base = schema.versioned_base('seen', 4)
@@ -95,6 +99,68 @@ class SeenField(Base):
         return '<SeenField(field=%s,value=%s,added=%s)>' % (self.field, self.value, self.added)
 
 
+class SeenPrefilter(object):
+    """
+    Process-wide bloom filter of all seen values.
+
+    A miss means the value is definitely not in the seen database, a hit still needs to be verified from the database.
+    Forgotten values are not removed, they only cause extra database lookups until the filter is rebuilt.
+    """
+
+    # number of hash functions, gives ~1% false positive rate with 10 bits per value
+    hashes = 7
+    bits_per_value = 10
+
+    def __init__(self):
+        self.bits = None
+        self.size = 0
+        self.capacity = 0
+        self.count = 0
+        self.database_uri = None
+
+    def loaded(self, database_uri):
+        return self.bits is not None and self.database_uri == database_uri
+
+    def load(self, session, database_uri):
+        """Build filter from all values in the seen database."""
+        self.database_uri = database_uri
+        total = session.query(SeenField).count()
+        # leave room for the values learned during the lifetime of the process
+        self.capacity = max(total * 2, 100000)
+        self.size = self.capacity * self.bits_per_value
+        self.bits = bytearray(self.size // 8 + 1)
+        self.count = 0
+        for value, in session.query(SeenField.value).yield_per(10000):
+            self.add(value)
+        log.debug('Loaded %s seen values into prefilter' % self.count)
+
+    def positions(self, value):
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        h1, h2 = struct.unpack('<QQ', hashlib.md5(value).digest())
+        return [(h1 + i * h2) % self.size for i in xrange(self.hashes)]
+
+    def add(self, value):
+        if self.bits is None:
+            return
+        for pos in self.positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        if self.count > self.capacity:
+            # false positive rate grows too high, rebuild on next use
+            log.debug('Seen prefilter is full, it will be rebuilt')
+            self.bits = None
+
+    def __contains__(self, value):
+        for pos in self.positions(value):
+            if not self.bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+prefilter = SeenPrefilter()
+
+
 @event('forget')
 def forget(value):
     """
@@ -280,6 +346,7 @@ class SeenCmd(object):
         se.fields.append(sf)
         session.add(se)
         session.commit()
+        prefilter.add(sf.value)
 
         log.info('Added %s as seen. This will affect all tasks.' % seen_name)
 
@@ -316,27 +383,51 @@ class FilterSeen(object):
         fields = self.fields
         local = config == 'local'
 
+        use_prefilter = task.manager.options.seen_prefilter
+        if use_prefilter and not prefilter.loaded(task.manager.database_uri):
+            prefilter.load(task.session, task.manager.database_uri)
+
+        # values of all entries are needed, evaluate lazy fields at once
+        resolve_lazy_fields(task.entries, fields)
+
+        # construct list of values looked for each entry
+        entry_values = []
+        lookup = set()
         for entry in task.entries:
-            # construct list of values looked
             values = []
             for field in fields:
                 if field not in entry:
                     continue
                 if entry[field] not in values and entry[field]:
                     values.append(unicode(entry[field]))
+            if use_prefilter:
+                values = [value for value in values if value in prefilter]
             if values:
-                log.trace('querying for: %s' % ', '.join(values))
-                # check if SeenField.value is any of the values
-                found = task.session.query(SeenField).join(SeenEntry).filter(SeenField.value.in_(values))
-                if local:
-                    found = found.filter(SeenEntry.task == task.name)
-                else:
-                    found = found.filter(SeenEntry.local == False)
-                found = found.first()
-                if found:
-                    log.debug("Rejecting '%s' '%s' because of seen '%s'" % (entry['url'], entry['title'], found.value))
-                    task.reject(entry, 'Entry with %s `%s` is already seen' % (found.field, found.value),
+                entry_values.append((entry, values))
+                lookup.update(values)
+        if not lookup:
+            return
+
+        # check which of the values are seen, in chunks so that the queries stay within sqlite limits
+        seen = {}
+        for chunk in chunked(list(lookup)):
+            log.trace('querying for: %s' % ', '.join(chunk))
+            found = task.session.query(SeenField.value, SeenField.field).join(SeenEntry).\
+                filter(SeenField.value.in_(chunk))
+            if local:
+                found = found.filter(SeenEntry.task == task.name)
+            else:
+                found = found.filter(SeenEntry.local == False)
+            for value, field in found:
+                seen.setdefault(value, field)
+
+        for entry, values in entry_values:
+            for value in values:
+                if value in seen:
+                    log.debug("Rejecting '%s' '%s' because of seen '%s'" % (entry['url'], entry['title'], value))
+                    task.reject(entry, 'Entry with %s `%s` is already seen' % (seen[value], value),
                                 remember=remember_rejected)
+                    break
 
     def on_task_exit(self, task, config):
         """Remember succeeded entries"""
@@ -370,6 +461,7 @@ class FilterSeen(object):
             remembered.append(entry[field])
             sf = SeenField(unicode(field), unicode(entry[field]))
             se.fields.append(sf)
+            prefilter.add(sf.value)
             log.debug("Learned '%s' (field: %s)" % (entry[field], field))
         # Only add the entry to the session if it has one of the required fields
         if se.fields:
@@ -405,5 +497,9 @@ register_parser_option('--forget', action='store', dest='forget', default=False,
                        metavar='TASK|VALUE', help='Forget task (completely) or given title or url.')
 register_parser_option('--seen', action='store', dest='seen', default=False,
                        metavar='VALUE', help='Add title or url to what has been seen in tasks.')
+register_parser_option('--seen-prefilter', action='store_true', dest='seen_prefilter', default=False,
+                       help='Keep an in-memory filter of seen values so that most unseen entries skip the database. '
+                            'Useful with large seen databases and long running processes, values learned by '
+                            'other processes using the same database are not noticed.')
 register_parser_option('--seen-search', action='store', dest='seen_search', default=False,
                        metavar='VALUE', help='Search given text from seen database.')
@@ -1,6 +1,7 @@
 import logging
 from flexget.plugins.filter.seen import FilterSeen
 from flexget.plugin import register_plugin, priority
+from flexget.entry import resolve_lazy_fields
 
 log = logging.getLogger('seenmovies')
 
@@ -29,6 +30,7 @@ class FilterSeenMovies(FilterSeen):
     # We run last (-255) to make sure we don't reject duplicates before all the other plugins get a chance to reject.
     @priority(-255)
     def on_task_filter(self, task, config):
+        resolve_lazy_fields(task.entries, self.fields)
         # strict method
         if config == 'strict':
             for entry in task.entries:
@@ -5,17 +5,17 @@ from copy import copy
 from datetime import datetime, timedelta
 from sqlalchemy import (Column, Integer, String, Unicode, DateTime, Boolean,
                         desc, select, update, delete, ForeignKey, Index, func, and_)
-from sqlalchemy.orm import relation, join
+from sqlalchemy.orm import relation, join, joinedload
 from sqlalchemy.ext.hybrid import Comparator, hybrid_property
 from sqlalchemy.exc import OperationalError
 from flexget import schema
 from flexget.event import event
 from flexget.utils import qualities
 from flexget.utils.log import log_once
-from flexget.utils.titles import SeriesParser, ParseWarning, ID_TYPES
+from flexget.utils.titles import SeriesParser, SeriesIndex, ParseWarning, ID_TYPES
 from flexget.utils.sqlalchemy_utils import (table_columns, table_exists, drop_tables, table_schema, table_add_column,
                                             create_index)
-from flexget.utils.tools import merge_dict_from_to, parse_timedelta
+from flexget.utils.tools import merge_dict_from_to, parse_timedelta, chunked
 from flexget.utils.database import quality_property
 from flexget.manager import Session
 from flexget.plugin import (register_plugin, register_parser_option, get_plugin_by_name, get_plugin_keywords,
@@ -382,60 +382,87 @@ class SeriesDatabase(object):
 
     def store(self, session, parser):
         """Push series information into database. Returns added/existing release."""
+        return self.store_all(session, [parser])[parser]
+
+    def store_all(self, session, parsers):
+        """
+        Push series information from all `parsers` into database, using a few queries for all of them.
+
+        :return: Dict mapping each parser to list of added/existing releases
+        """
+        if not parsers:
+            return {}
         # if series does not exist in database, add new
-        series = session.query(Series).\
-            filter(Series.name == parser.name).\
-            filter(Series.id != None).first()
-        if not series:
-            log.debug('adding series %s into db' % parser.name)
-            series = Series()
-            series.name = parser.name
-            session.add(series)
-            log.debug('-> added %s' % series)
-
-        releases = []
-        for ix, identifier in enumerate(parser.identifiers):
-            # if episode does not exist in series, add new
-            episode = session.query(Episode).filter(Episode.series_id == series.id).\
-                filter(Episode.identifier == identifier).\
-                filter(Episode.series_id != None).first()
-            if not episode:
-                log.debug('adding episode %s into series %s' % (identifier, parser.name))
-                episode = Episode()
-                episode.identifier = identifier
-                episode.identified_by = parser.id_type
-                # if episodic format
-                if parser.id_type == 'ep':
-                    episode.season = parser.season
-                    episode.number = parser.episode + ix
-                elif parser.id_type == 'sequence':
-                    episode.season = 0
-                    episode.number = parser.id + ix
-                series.episodes.append(episode)  # pylint:disable=E1103
-                log.debug('-> added %s' % episode)
-
-            # if release does not exists in episodes, add new
-            #
-            # NOTE:
-            #
-            # filter(Release.episode_id != None) fixes weird bug where release had/has been added
-            # to database but doesn't have episode_id, this causes all kinds of havoc with the plugin.
-            # perhaps a bug in sqlalchemy?
-            release = session.query(Release).filter(Release.episode_id == episode.id).\
-                filter(Release.title == parser.data).\
-                filter(Release.quality == parser.quality).\
-                filter(Release.proper_count == parser.proper_count).\
-                filter(Release.episode_id != None).first()
-            if not release:
-                log.debug('adding release %s into episode' % parser)
-                release = Release()
-                release.quality = parser.quality
-                release.proper_count = parser.proper_count
-                release.title = parser.data
-                episode.releases.append(release)  # pylint:disable=E1103
-                log.debug('-> added %s' % release)
-            releases.append(release)
-        return releases
+        all_series = {}
+        names = list(set(normalize_series_name(parser.name) for parser in parsers))
+        for names_chunk in chunked(names):
+            for series in session.query(Series).filter(Series._name_normalized.in_(names_chunk)).\
+                                               order_by(Series.id):
+                all_series.setdefault(series._name_normalized, series)
+
+        # load existing episodes of the series, along with their releases
+        episodes = {}
+        releases = {}
+        series_ids = [series.id for series in all_series.itervalues()]
+        identifiers = list(set(identifier for parser in parsers for identifier in parser.identifiers))
+        if series_ids:
+            for ids_chunk in chunked(identifiers):
+                query = session.query(Episode).options(joinedload(Episode.releases)).\
+                    filter(Episode.series_id.in_(series_ids)).\
+                    filter(Episode.identifier.in_(ids_chunk)).order_by(Episode.id)
+                for episode in query:
+                    episodes.setdefault((episode.series_id, episode.identifier), episode)
+        for episode in episodes.itervalues():
+            for release in sorted(episode.releases, key=lambda release: release.id):
+                key = (episode.id, release.title, release._quality, release.proper_count)
+                releases.setdefault(key, release)
+
+        result = {}
+        for parser in parsers:
+            series = all_series.get(normalize_series_name(parser.name))
+            if not series:
+                log.debug('adding series %s into db' % parser.name)
+                series = Series()
+                series.name = parser.name
+                session.add(series)
+                all_series[series._name_normalized] = series
+                log.debug('-> added %s' % series)
+
+            parser_releases = []
+            for ix, identifier in enumerate(parser.identifiers):
+                # if episode does not exist in series, add new
+                episode = episodes.get((series.id or series, identifier))
+                if not episode:
+                    log.debug('adding episode %s into series %s' % (identifier, parser.name))
+                    episode = Episode()
+                    episode.identifier = identifier
+                    episode.identified_by = parser.id_type
+                    # if episodic format
+                    if parser.id_type == 'ep':
+                        episode.season = parser.season
+                        episode.number = parser.episode + ix
+                    elif parser.id_type == 'sequence':
+                        episode.season = 0
+                        episode.number = parser.id + ix
+                    series.episodes.append(episode)  # pylint:disable=E1103
+                    episodes[(series.id or series, identifier)] = episode
+                    log.debug('-> added %s' % episode)
+
+                # if release does not exists in episodes, add new
+                key = (episode.id or episode, parser.data, parser.quality.name, parser.proper_count)
+                release = releases.get(key)
+                if not release:
+                    log.debug('adding release %s into episode' % parser)
+                    release = Release()
+                    release.quality = parser.quality
+                    release.proper_count = parser.proper_count
+                    release.title = parser.data
+                    episode.releases.append(release)  # pylint:disable=E1103
+                    releases[key] = release
+                    log.debug('-> added %s' % release)
+                parser_releases.append(release)
+            result[parser] = parser_releases
+        return result
 
 
 def forget_series(name):
@@ -491,6 +518,14 @@ def populate_entry_fields(entry, parser):
     entry['series_id_type'] = parser.id_type
 
 
+def get_as_array(config, key):
+    """Return configuration key as array, even if given as a single string"""
+    v = config.get(key, [])
+    if isinstance(v, basestring):
+        return [v]
+    return v
+
+
 class FilterSeriesBase(object):
     """
     Class that contains helper methods for both filter.series as well as plugins that configure it,
@@ -735,11 +770,12 @@ class FilterSeries(SeriesDatabase, FilterSeriesBase):
     def on_task_metainfo(self, task):
         config = self.prepare_config(task.config.get('series', {}))
         self.auto_exact(config)
+        candidates = self.find_candidates(task.entries, config)
         for series_item in config:
             series_name, series_config = series_item.items()[0]
             log.trace('series_name: %s series_config: %s' % (series_name, series_config))
             start_time = time.clock()
-            self.parse_series(task.session, task.entries, series_name, series_config)
+            self.parse_series(task.session, candidates.get(series_name, []), series_name, series_config)
             took = time.clock() - start_time
             log.trace('parsing %s took %s' % (series_name, took))
 
@@ -758,6 +794,15 @@ class FilterSeries(SeriesDatabase, FilterSeriesBase):
 
         config = self.prepare_config(task.config.get('series', {}))
 
+        # store found episodes of all series into database at once
+        parsers = []
+        for series_item in config:
+            series_name, series_config = series_item.items()[0]
+            if not series_config.get('parse_only'):
+                for eps in found_series.get(unicode(series_name), {}).itervalues():
+                    parsers.extend(eps)
+        stored = self.store_all(task.session, parsers)
+
         for series_item in config:
             series_name, series_config = series_item.items()[0]
             if series_config.get('parse_only'):
@@ -775,10 +820,9 @@ class FilterSeries(SeriesDatabase, FilterSeriesBase):
                 continue
             for id, eps in found_series[series_name].iteritems():
                 for parser in eps:
-                    # store found episodes into database and save reference for later use
-                    releases = self.store(task.session, parser)
+                    # save reference to stored releases for later use
                     entry = self.parser2entry[parser]
-                    entry['series_releases'] = releases
+                    entry['series_releases'] = stored[parser]
 
                     # set custom download path
                     if 'path' in series_config:
@@ -801,6 +845,28 @@ class FilterSeries(SeriesDatabase, FilterSeriesBase):
             took = time.clock() - start_time
             log.trace('processing %s took %s' % (series_name, took))
 
+    def find_candidates(self, entries, config):
+        """
+        Scan entries once and return dict of series name -> list of entries which may belong to that series.
+
+        :param entries: List of entries to process
+        :param config: Prepared series config
+        """
+        index = SeriesIndex()
+        for series_item in config:
+            series_name, series_config = series_item.items()[0]
+            index.add(series_name, get_as_array(series_config, 'name_regexp'))
+        candidates = {}
+        for entry in entries:
+            found = set()
+            for field in ('title', 'description'):
+                data = entry.get(field)
+                if isinstance(data, basestring) and data:
+                    found.update(index.find(data))
+            for series_name in found:
+                candidates.setdefault(series_name, []).append(entry)
+        return candidates
+
     def parse_series(self, session, entries, series_name, config):
         """
         Search for `series_name` and populate all `series_*` fields in entries when successfully parsed
@@ -811,13 +877,6 @@ class FilterSeries(SeriesDatabase, FilterSeriesBase):
         :param config: Series config being processed
         """
 
-        def get_as_array(config, key):
-            """Return configuration key as array, even if given as a single string"""
-            v = config.get(key, [])
-            if isinstance(v, basestring):
-                return [v]
-            return v
-
         # set parser flags flags based on config / database
         identified_by = config.get('identified_by', 'auto')
         series = session.query(Series).filter(Series.name == series_name).first()
@@ -912,7 +971,9 @@ class FilterSeries(SeriesDatabase, FilterSeriesBase):
                     continue
 
             # Many of the following functions need to know this info. Only look it up once.
-            downloaded = self.get_downloaded(task.session, eps[0].name, eps[0].identifier)
+            # Releases of the episode have been loaded when storing them.
+            episode = self.parser2entry[eps[0]]['series_releases'][0].episode
+            downloaded = [release for release in episode.releases if release.downloaded]
             downloaded_qualities = [ep.quality for ep in downloaded]
 
             # proper handling
@@ -1,16 +1,18 @@
 import logging
+import re
 from datetime import datetime
 from argparse import Action, ArgumentError
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.schema import Table, ForeignKey
-from sqlalchemy import Column, Integer, DateTime, Unicode, Index
+from sqlalchemy.schema import Table, ForeignKey, MetaData
+from sqlalchemy.exc import OperationalError
+from sqlalchemy import Column, Integer, DateTime, Unicode, Index, select, case, literal_column
 from flexget import schema
 from flexget.event import event
 from flexget.entry import Entry
 from flexget.plugin import priority, register_parser_option, register_plugin
 from flexget.utils.sqlalchemy_utils import table_schema, get_index_by_name
-from flexget.utils.tools import console, strip_html
+from flexget.utils.tools import console, strip_html, chunked
 from flexget.manager import Session
 
 log = logging.getLogger('archive')
@@ -30,6 +32,17 @@ archive_sources_table = Table('archive_entry_sources', Base.metadata,
                               Index('ix_archive_sources', 'entry_id', 'source_id'))
 
 
+# Full-text index of titles and descriptions, docid is the ArchiveEntry id. It is a virtual table which is not created
+# by create_all, hence the separate metadata. See init_search_index.
+archive_fts_table = Table('archive_fts', MetaData(),
+                          Column('docid', Integer, primary_key=True),
+                          Column('title', Unicode),
+                          Column('description', Unicode))
+
+# Whether the full-text index is available in the current database
+search_index = False
+
+
 class ArchiveEntry(Base):
     __tablename__ = 'archive_entry'
     __table_args__ = (Index('ix_archive_title_url', 'title', 'url'),)
@@ -104,6 +117,107 @@ def get_tag(name, session):
         return source
 
 
+def find_archived(session, keys):
+    """
+    :param keys: (title, url) pairs to look for
+    :param session: SQLAlchemy session
+    :return: Dict of (title, url) -> :attr:`ArchiveEntry.id` for pairs which are in the archive
+    """
+    keys = set(keys)
+    found = {}
+    for titles in chunked(list(set(title for title, url in keys))):
+        query = session.query(ArchiveEntry.id, ArchiveEntry.title, ArchiveEntry.url).\
+            filter(ArchiveEntry.title.in_(titles))
+        for id, title, url in query:
+            if (title, url) in keys:
+                found[(title, url)] = id
+    return found
+
+
+def add_associations(session, table, column, value, entry_ids, existing_ids):
+    """
+    Links archive entries to a source or tag, skipping the links that already exist.
+
+    :param table: Association table
+    :param string column: Name of the source or tag id column in `table`
+    :param int value: Id of the source or tag
+    :param entry_ids: Ids of archive entries to link
+    :param existing_ids: Ids of archive entries which may already be linked
+    """
+    linked = set()
+    for chunk in chunked(list(existing_ids)):
+        linked.update(row[0] for row in session.execute(
+            select([table.c.entry_id]).where(table.c[column] == value).where(table.c.entry_id.in_(chunk))))
+    rows = [{'entry_id': entry_id, column: value} for entry_id in set(entry_ids) if entry_id not in linked]
+    if rows:
+        session.execute(table.insert(), rows)
+
+
+def init_search_index(session):
+    """
+    Creates the full-text index if the SQLite build supports it, indexing all entries already in the archive.
+
+    The index is not dropped along with the archive tables (eg. --reset-plugin archive), so an existing index which
+    does not match the archive is rebuilt.
+
+    :param session: SQLAlchemy session
+    :return: True if the index can be used
+    """
+    if session.bind.dialect.name != 'sqlite':
+        return False
+    if session.execute('SELECT name FROM sqlite_master WHERE type = \'table\' AND name = :name',
+                       {'name': archive_fts_table.name}).first():
+        # Only largest ids are compared, they are rowid lookups while counting would scan both tables
+        indexed = session.execute('SELECT max(docid) FROM %s' % archive_fts_table.name).scalar()
+        archived = session.execute('SELECT max(id) FROM %s' % ArchiveEntry.__tablename__).scalar()
+        if indexed == archived:
+            return True
+        log.debug('Archive search index does not match the archive (largest id %s, %s), rebuilding' %
+                  (indexed, archived))
+        session.execute('DROP TABLE %s' % archive_fts_table.name)
+    for module in ('fts4', 'fts3'):
+        try:
+            session.execute('CREATE VIRTUAL TABLE %s USING %s(title, description)' % (archive_fts_table.name, module))
+        except OperationalError:
+            continue
+        break
+    else:
+        log.debug('SQLite has no full-text search support, archive searches will scan the whole archive')
+        return False
+    if session.query(ArchiveEntry.id).first():
+        log.verbose('Building archive search index, may take a while ...')
+        session.execute('INSERT INTO %s (docid, title, description) SELECT id, title, description FROM %s' %
+                        (archive_fts_table.name, ArchiveEntry.__tablename__))
+    return True
+
+
+@event('manager.startup')
+def setup_search_index(manager):
+    global search_index
+    session = Session()
+    try:
+        search_index = init_search_index(session)
+        session.commit()
+    finally:
+        session.close()
+
+
+def index_entries(session, rows):
+    """
+    Adds archive entries into the full-text index, if available.
+
+    :param rows: List of (id, title, description) tuples
+    """
+    if search_index and rows:
+        session.execute(archive_fts_table.insert(),
+                        [{'docid': id, 'title': title, 'description': description} for id, title, description in rows])
+
+
+def search_terms(text):
+    """Return list of lowercase words in :text:, as split by the full-text index."""
+    return re.findall(r'[^\W_]+', unicode(text).lower(), re.UNICODE)
+
+
 @schema.upgrade('archive')
 def upgrade(ver, session):
     if ver is None:
@@ -156,51 +270,44 @@ class Archive(object):
         else:
             tag_names = config
 
-        tags = []
-        for tag_name in set(tag_names):
-            tags.append(get_tag(tag_name, task.session))
-
-        count = 0
-        processed = []
+        # Archive entries are unique by title and url, entry may also be in multiple of these lists
+        entries = {}
         for entry in task.entries + task.rejected + task.failed:
-            # I think entry can be in multiple of those lists .. not sure though!
-            if entry in processed:
-                continue
-            else:
-                processed.append(entry)
-
-            ae = task.session.query(ArchiveEntry).\
-                 filter(ArchiveEntry.title == entry['title']).\
-                 filter(ArchiveEntry.url == entry['url']).first()
-            if ae:
-                # add (missing) sources
-                source = get_source(task.name, task.session)
-                if not source in ae.sources:
-                    log.debug('Adding `%s` into `%s` sources' % (task.name, ae))
-                    ae.sources.append(source)
-                # add (missing) tags
-                for tag_name in tag_names:
-                    atag = get_tag(tag_name, task.session)
-                    if not atag in ae.tags:
-                        log.debug('Adding tag %s into %s' % (tag_name, ae))
-                        ae.tags.append(atag)
-            else:
-                # create new archive entry
-                ae = ArchiveEntry()
-                ae.title = entry['title']
-                ae.url = entry['url']
-                if 'description' in entry:
-                    ae.description = entry['description']
-                ae.task = task.name
-                ae.sources.append(get_source(task.name, task.session))
-                if tags:
-                    # note, we're extending empty list
-                    ae.tags.extend(tags)
-                log.debug('Adding `%s` with %i tags to archive' % (ae, len(tags)))
-                task.session.add(ae)
-                count += 1
-        if count:
-            log.verbose('Added %i new entries to archive' % count)
+            entries.setdefault((entry['title'], entry['url']), entry)
+        if not entries:
+            return
+
+        session = task.session
+        source = get_source(task.name, session)
+        tags = [get_tag(tag_name, session) for tag_name in set(tag_names)]
+        # Sources and tags need ids for the association rows
+        for item in [source] + tags:
+            if item.id is None:
+                session.add(item)
+        session.flush()
+
+        existing = find_archived(session, entries)
+        new = [key for key in entries if key not in existing]
+        if new:
+            now = datetime.now()
+            session.execute(ArchiveEntry.__table__.insert(), [
+                {'title': title, 'url': url, 'description': entries[(title, url)].get('description'),
+                 'feed': task.name, 'added': now} for title, url in new])
+            added = find_archived(session, new)
+            index_entries(session, [(id, title, entries[(title, url)].get('description'))
+                                    for (title, url), id in added.iteritems()])
+            log.debug('Added %i entries with %i tags to archive' % (len(added), len(tags)))
+        else:
+            added = {}
+
+        # add (missing) sources and tags
+        ids = existing.values() + added.values()
+        add_associations(session, archive_sources_table, 'source_id', source.id, ids, existing.values())
+        for tag in tags:
+            add_associations(session, archive_tags_table, 'tag_id', tag.id, ids, existing.values())
+
+        if added:
+            log.verbose('Added %i new entries to archive' % len(added))
 
     def on_task_abort(self, task, config):
         """
@@ -416,6 +523,9 @@ def consolidate():
             log.info('Consolidated %i items, removing duplicates ...' % len(duplicates))
             for id in duplicates:
                 session.query(ArchiveEntry).filter(ArchiveEntry.id == id).delete()
+            if search_index:
+                for chunk in chunked(duplicates):
+                    session.execute(archive_fts_table.delete().where(archive_fts_table.c.docid.in_(chunk)))
         session.commit()
         log.info('Completed! This does NOT need to be ran again.')
     except KeyboardInterrupt:
@@ -467,15 +577,27 @@ def search(session, text, tags=None, sources=None, desc=False):
     """
     Search from the archive.
 
-    :param string text: Search keywords, spaces will be replaced with %
+    Uses the full-text index when available, keywords then match the beginning of words in titles and descriptions
+    and entries matching by title are ranked first. Otherwise keywords are matched anywhere in the titles.
+
+    :param string text: Search keywords
     :param Session session: SQLAlchemy session, should not be closed while iterating results.
     :param list tags: Optional list of acceptable tags
     :param list sources: Optional list of acceptable sources
     :param bool desc: Sort results descending
     :return: ArchiveEntries responding to query
     """
-    keyword = unicode(text).replace(' ', '%')
-    query = session.query(ArchiveEntry).filter(ArchiveEntry.title.like('%' + keyword + '%'))
+    query = session.query(ArchiveEntry)
+    terms = search_terms(text)
+    if search_index and terms:
+        expression = ' '.join(term + '*' for term in terms)
+        matches = select([archive_fts_table.c.docid]).where(literal_column(archive_fts_table.name).match(expression))
+        title_matches = select([archive_fts_table.c.docid]).where(archive_fts_table.c.title.match(expression))
+        query = query.filter(ArchiveEntry.id.in_(matches)).\
+            order_by(case([(ArchiveEntry.id.in_(title_matches), 0)], else_=1))
+    else:
+        keyword = unicode(text).replace(' ', '%')
+        query = query.filter(ArchiveEntry.title.like('%' + keyword + '%'))
     if tags:
         query = query.filter(ArchiveEntry.tags.any(ArchiveTag.name.in_(tags)))
     if sources:
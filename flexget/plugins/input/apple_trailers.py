@@ -22,6 +22,9 @@ class AppleTrailers(InputRSS):
         Choice of quality is one of: ipod, '320', '480', 640w, 480p, 720p, 1080p
     """
 
+    # configures the headers plugin for the task
+    uses_global_opener = True
+
     def __init__(self):
         self.rss_url = 'http://trailers.apple.com/trailers/home/rss/newtrailers.rss'
         self.qualities = ['ipod', 320, '320', 480, '480', '640w', '480p', '720p', '1080p']
@@ -42,7 +45,6 @@ class AppleTrailers(InputRSS):
         get_plugin_by_name('headers')
         # configure them
         task.config['headers'] = {'User-Agent': 'QuickTime/7.6.6'}
-        self.quality = str(config)
 
     @priority(127)
     @cached('apple_trailers')
@@ -73,7 +75,7 @@ class AppleTrailers(InputRSS):
             for link in links:
                 url = link.get('href')
                 url = url[:url.rfind('_')]
-                quality = self.quality.lower()
+                quality = str(config).lower()
 
                 if quality == 'ipod':
                     url += '_i320.m4v'
@@ -1,10 +1,14 @@
 import os
+import copy
+import hashlib
 import logging
 import urlparse
 import xml.sax
+from xml.parsers import expat
 import posixpath
 import httplib
 from datetime import datetime
+from xml.etree import cElementTree as ElementTree
 import feedparser
 from requests import RequestException
 from flexget.entry import Entry
@@ -14,6 +18,85 @@ from flexget.utils.tools import decode_html
 
 log = logging.getLogger('rss')
 
+# Amount of bytes read at a time when streaming feeds
+CHUNK_SIZE = 16 * 1024
+
+
+def local_name(tag):
+    """Returns element tag without namespace or prefix."""
+    return tag.rsplit('}', 1)[-1].rsplit(':', 1)[-1]
+
+
+class ItemReader(object):
+    """
+    Reads feed items from an iterator of strings one at a time, using expat.
+
+    Only the item being read is built into an element. The raw content is kept, so the feed can be cut before an item
+    without serializing the XML again, which would rename namespace prefixes.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.data = []
+        self.parser = expat.ParserCreate()
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self._data
+        # names of open elements
+        self.open = []
+        # builder, start offset and open elements of the item being read
+        self.item = None
+        # finished items, see __iter__
+        self.items = []
+
+    def _start(self, name, attrs):
+        if self.item is None and local_name(name) in ('item', 'entry'):
+            self.item = (ElementTree.TreeBuilder(), self.parser.CurrentByteIndex, list(self.open))
+        if self.item is not None:
+            self.item[0].start(name, attrs)
+        self.open.append(name)
+
+    def _end(self, name):
+        self.open.pop()
+        if self.item is not None:
+            builder, offset, parents = self.item
+            builder.end(name)
+            if len(self.open) == len(parents):
+                self.items.append((builder.close(), offset, parents))
+                self.item = None
+
+    def _data(self, data):
+        if self.item is not None:
+            self.item[0].data(data)
+
+    def __iter__(self):
+        """
+        Yields tuples (element, offset, parents) of the items, where offset is the position of the item in the content
+        and parents are names of elements containing it.
+
+        :raises SyntaxError: If the content is not valid XML
+        """
+        try:
+            for chunk in self.chunks:
+                self.data.append(chunk)
+                self.parser.Parse(chunk)
+                while self.items:
+                    yield self.items.pop(0)
+            self.parser.Parse('', True)
+        except expat.ExpatError, e:
+            raise SyntaxError(str(e))
+        while self.items:
+            yield self.items.pop(0)
+
+    def cut(self, offset, parents):
+        """Returns content read so far up to `offset`, with elements in `parents` closed."""
+        closing = ''.join('</%s>' % name.encode('utf-8') for name in reversed(parents))
+        return ''.join(self.data)[:offset] + closing
+
+    def content(self):
+        """Returns all data, including what has not been read yet."""
+        return ''.join(self.data) + ''.join(self.chunks)
+
 
 class InputRSS(object):
     """
@@ -77,6 +160,15 @@ class InputRSS(object):
       rss:
         url: <url>
         group_links: yes
+
+    Large feeds can be parsed while they are being downloaded. Download is stopped when items processed on
+    previous run are reached, so only new items are read. Requires the feed to be ordered from newest to oldest.
+
+    Example::
+
+      rss:
+        url: <url>
+        stream: yes
     """
 
     def validator(self):
@@ -100,6 +192,7 @@ class InputRSS(object):
         advanced.accept('boolean', key='filename')
         advanced.accept('boolean', key='group_links')
         advanced.accept('boolean', key='all_entries')
+        advanced.accept('boolean', key='stream')
         return root
 
     def build_config(self, config):
@@ -166,6 +259,78 @@ class InputRSS(object):
             entry['filename'] = basename
             log.trace('filename `%s` from enclosure' % entry['filename'])
 
+    def item_date(self, item):
+        """Returns publish date of feed item element as time tuple or None."""
+        for child in item:
+            if local_name(child.tag) in ('pubDate', 'published', 'updated', 'date') and child.text:
+                return feedparser._parse_date(child.text.strip())
+
+    def item_id(self, item, title_field):
+        """Returns same identifier for feed item element as used to store the location in feed."""
+        title = guid = ''
+        for child in item:
+            name = local_name(child.tag)
+            if name == title_field:
+                title = child.text or ''
+            elif name in ('guid', 'id'):
+                guid = child.text or ''
+        return title.strip() + guid.strip()
+
+    def stream_feed(self, chunks, last_entry_id, title_field='title'):
+        """
+        Parses feed items incrementally from `chunks`, stops reading when the item stored as last entry is reached.
+
+        :param chunks: Iterator of feed content
+        :param last_entry_id: Identifier of the newest item from previous run
+        :return: Feed content containing only the new items
+        :raises SyntaxError: If the content is not valid XML, attribute `content` contains the whole feed
+        """
+        reader = ItemReader(chunks)
+        items = 0
+        previous_date = None
+        # Last entry when it was the first item, next item tells whether feed is newest first
+        pending = None
+        content = None
+        try:
+            for elem, offset, parents in reader:
+                items += 1
+                date = self.item_date(elem)
+                if pending is not None:
+                    pending_date = pending[0]
+                    if pending_date and date and date > pending_date:
+                        log.debug('Feed is not ordered newest first, reading all items')
+                        pending = last_entry_id = None
+                        continue
+                    # Parser may have read ahead, remove all items from last run
+                    content = reader.cut(*pending[1:])
+                    break
+                if last_entry_id and self.item_id(elem, title_field) == last_entry_id:
+                    if items == 1 and date:
+                        # This is the first item, order of the feed is not known yet
+                        pending = (date, offset, parents)
+                        continue
+                    if previous_date and date and previous_date < date:
+                        log.debug('Feed is not ordered newest first, reading all items')
+                        last_entry_id = None
+                        continue
+                    content = reader.cut(offset, parents)
+                    break
+                previous_date = date
+        except SyntaxError, e:
+            e.content = reader.content()
+            raise
+        log.debug('Read %s bytes of the feed' % sum(len(chunk) for chunk in reader.data))
+        if content is None:
+            content = ''.join(reader.data)
+        return content
+
+    def restore_entries(self, task, url_hash):
+        """Returns entries created from the feed on previous run, or None if they have not been stored."""
+        stored = task.simple_persistence.get('%s_entries' % url_hash)
+        if stored is None:
+            return None
+        return [Entry(fields) for fields in stored]
+
     @cached('rss')
     @internet(log)
     def on_task_input(self, task, config):
@@ -179,8 +344,17 @@ class InputRSS(object):
         # set etag and last modified headers if config has not changed since
         # last run and if caching wasn't disabled with --no-cache argument.
         all_entries = config['all_entries'] or task.config_modified or task.manager.options.nocache
+        # with all_entries the feed is still not parsed again if it has not changed, entries from last run are used
+        stored_entries = None
+        if config['all_entries'] and not (task.config_modified or task.manager.options.nocache):
+            stored_entries = self.restore_entries(task, url_hash)
+        # feed can be read incrementally only when location in feed from last run is known
+        last_entry_id = None
+        if config.get('stream') and not all_entries:
+            last_entry_id = task.simple_persistence.get('%s_last_entry' % url_hash)
+        stream = bool(last_entry_id)
         headers = {}
-        if not all_entries:
+        if not all_entries or stored_entries is not None:
             etag = task.simple_persistence.get('%s_etag' % url_hash, None)
             if etag:
                 log.debug('Sending etag %s for task %s' % (etag, task.name))
@@ -202,7 +376,8 @@ class InputRSS(object):
             try:
                 # Use the raw response so feedparser can read the headers and status values
                 response = task.requests.get(config['url'], timeout=60, headers=headers, raise_status=False, auth=auth)
-                content = response.content
+                if not stream:
+                    content = response.content
             except RequestException, e:
                 raise PluginError('Unable to download the RSS for task %s (%s): %s' %
                                   (task.name, config['url'], e))
@@ -210,6 +385,10 @@ class InputRSS(object):
             # status checks
             status = response.status_code
             if status == 304:
+                if stored_entries is not None:
+                    log.verbose('%s hasn\'t changed since last run. Using %s entries from last run.' %
+                                (config['url'], len(stored_entries)))
+                    return stored_entries
                 log.verbose('%s hasn\'t changed since last run. Not creating entries.' % config['url'])
                 # Let details plugin know that it is ok if this feed doesn't produce any entries
                 task.no_entries_ok = True
@@ -225,15 +404,26 @@ class InputRSS(object):
                 raise PluginError('HTTP error %s received from %s' % (status, config['url']), log)
 
             # update etag and last modified
-            if not config['all_entries']:
-                etag = response.headers.get('etag')
-                if etag:
-                    task.simple_persistence['%s_etag' % url_hash] = etag
-                    log.debug('etag %s saved for task %s' % (etag, task.name))
-                if  response.headers.get('last-modified'):
-                    modified = response.headers['last-modified']
-                    task.simple_persistence['%s_modified' % url_hash] = modified
-                    log.debug('last modified %s saved for task %s' % (modified, task.name))
+            etag = response.headers.get('etag')
+            if etag:
+                task.simple_persistence['%s_etag' % url_hash] = etag
+                log.debug('etag %s saved for task %s' % (etag, task.name))
+            if  response.headers.get('last-modified'):
+                modified = response.headers['last-modified']
+                task.simple_persistence['%s_modified' % url_hash] = modified
+                log.debug('last modified %s saved for task %s' % (modified, task.name))
+
+            if stream:
+                try:
+                    content = self.stream_feed(response.iter_content(CHUNK_SIZE), last_entry_id,
+                                               config.get('title', 'title'))
+                except SyntaxError, e:
+                    log.debug('Unable to read %s incrementally (%s), parsing whole feed' % (config['url'], e))
+                    content = e.content
+                    stream = False
+                except RequestException, e:
+                    raise PluginError('Unable to download the RSS for task %s (%s): %s' %
+                                      (task.name, config['url'], e))
         else:
             # This is a file, open it
             content = open(config['url'], 'rb').read()
@@ -241,6 +431,21 @@ class InputRSS(object):
         if not content:
             log.error('No data recieved for rss feed.')
             return
+
+        # Servers not supporting conditional requests send the same content again, no need to parse it
+        content_hash = None
+        if not stream:
+            content_hash = hashlib.md5(content).hexdigest()
+        if content_hash and task.simple_persistence.get('%s_hash' % url_hash) == content_hash:
+            if not all_entries:
+                log.verbose('%s hasn\'t changed since last run. Not creating entries.' % config['url'])
+                task.no_entries_ok = True
+                return []
+            if stored_entries is not None:
+                log.verbose('%s hasn\'t changed since last run. Using %s entries from last run.' %
+                            (config['url'], len(stored_entries)))
+                return stored_entries
+
         try:
             rss = feedparser.parse(content)
         except LookupError, e:
@@ -446,6 +651,10 @@ class InputRSS(object):
         if rss.entries:
             log.debug('Saving location in rss feed.')
             task.simple_persistence['%s_last_entry' % url_hash] = rss.entries[0].title + rss.entries[0].get('guid', '')
+        task.simple_persistence['%s_hash' % url_hash] = content_hash
+        if config['all_entries']:
+            # Store entries so they can be used while the feed does not change
+            task.simple_persistence['%s_entries' % url_hash] = [copy.deepcopy(dict(e)) for e in entries]
 
         if ignored:
             if not config.get('silent'):
@@ -11,10 +11,15 @@ from flexget.utils.log import log_once
 from flexget.utils.imdb import ImdbSearch, ImdbParser, extract_id, make_url
 from flexget.utils.sqlalchemy_utils import table_add_column
 from flexget.utils.database import with_session
+from flexget.utils.tools import chunked
 from flexget.utils.sqlalchemy_utils import table_columns, get_index_by_name
 
 SCHEMA_VER = 2
 
+# Maximum number of imdb pages fetched at the same time by lookup_all. Requests still go through the imdb.com domain
+# delay, so workers only overlap downloading and parsing with waiting for the next turn.
+MAX_FETCH_WORKERS = 4
+
 Base = schema.versioned_base('imdb_lookup', SCHEMA_VER)
 
 
@@ -215,6 +220,10 @@ class ImdbLookup(object):
         Also provides imdb lookup functionality to all other imdb related plugins.
     """
 
+    def __init__(self):
+        # imdb pages fetched in advance by lookup_all, by url
+        self._parsed = {}
+
     field_map = {
         'imdb_url': 'url',
         'imdb_id': lambda movie: extract_id(movie.url),
@@ -245,7 +254,7 @@ class ImdbLookup(object):
             self.register_lazy_fields(entry)
 
     def register_lazy_fields(self, entry):
-        entry.register_lazy_fields(self.field_map, self.lazy_loader)
+        entry.register_lazy_fields(self.field_map, self.lazy_loader, self.batch_loader)
 
     def lazy_loader(self, entry, field):
         """Does the lookup for this entry and populates the entry fields."""
@@ -257,6 +266,109 @@ class ImdbLookup(object):
             entry.unregister_lazy_fields(self.field_map, self.lazy_loader)
         return entry[field]
 
+    def batch_loader(self, entries, field):
+        """Does the lookup for all entries at once and populates their fields."""
+        for entry, error in self.lookup_all(entries):
+            log_once(error.value.capitalize(), logger=log)
+            entry.unregister_lazy_fields(self.field_map, self.lazy_loader)
+
+    def lookup_all(self, entries):
+        """
+        Perform imdb lookup for all entries.
+
+        Movies which are cached are loaded for all entries with a few queries. Pages of the other movies with known
+        imdb url are fetched concurrently, and then the remaining entries are looked up one by one with
+        :meth:`lookup`.
+
+        :param entries: List of Entry instances
+        :return: List of (entry, PluginError) tuples of failed lookups
+        """
+        from flexget.manager import manager
+
+        urls = {}
+        for entry in entries:
+            if entry.get('imdb_url', eval_lazy=False):
+                urls[id(entry)] = entry['imdb_url']
+            elif entry.get('imdb_id', eval_lazy=False):
+                urls[id(entry)] = make_url(entry['imdb_id'])
+
+        session = Session()
+        try:
+            # urls of titles which have been searched before
+            titles = set(entry['title'] for entry in entries
+                         if id(entry) not in urls and entry.get('title', eval_lazy=False))
+            searched = {}
+            for chunk in chunked(list(titles)):
+                for result in session.query(SearchResult).filter(SearchResult.title.in_(chunk)):
+                    if result.url and (not result.fails or manager.options.retry):
+                        searched.setdefault(result.title, result.url)
+            for entry in entries:
+                if id(entry) not in urls and entry.get('title', eval_lazy=False) in searched:
+                    urls[id(entry)] = searched[entry['title']]
+
+            movies = {}
+            for chunk in chunked(list(set(urls.itervalues()))):
+                query = session.query(Movie).options(joinedload_all(Movie.genres), joinedload_all(Movie.languages),
+                                                     joinedload_all(Movie.actors), joinedload_all(Movie.directors))
+                for movie in query.filter(Movie.url.in_(chunk)):
+                    movies[movie.url] = movie
+
+            remaining = []
+            for entry in entries:
+                movie = movies.get(urls.get(id(entry)))
+                # lookup also validates these fields, leave entries with them to it
+                checked = any(entry.get(field, eval_lazy=False) for field in ['imdb_votes', 'imdb_score'])
+                if movie and not movie.expired and not checked:
+                    entry.update_using_map(self.field_map, movie)
+                else:
+                    remaining.append(entry)
+        finally:
+            session.close()
+        log.debug('%s of %s entries found from cache' % (len(entries) - len(remaining), len(entries)))
+
+        fetch = set(urls[id(entry)] for entry in remaining if id(entry) in urls)
+        if len(fetch) > 1:
+            self._fetch_all(fetch)
+        failed = []
+        try:
+            for entry in remaining:
+                try:
+                    self.lookup(entry)
+                except PluginError, e:
+                    failed.append((entry, e))
+        finally:
+            self._parsed.clear()
+        return failed
+
+    def _fetch_all(self, urls):
+        """
+        Fetches and parses imdb pages of `urls` concurrently, for :meth:`_parse_new_movie` to use.
+
+        Requests are started no faster than the imdb.com domain delay allows, one every 3 seconds. A batch therefore
+        takes about that long per page, compared to the delay plus download and parse time when fetched one by one.
+        """
+        from multiprocessing.pool import ThreadPool
+
+        def fetch(url):
+            imdb_parser = ImdbParser()
+            try:
+                imdb_parser.parse(url)
+            except Exception, e:
+                # lookup will fetch the page again and handle the error
+                log.debug('Fetching %s failed: %s' % (url, e))
+                return url, None
+            return url, imdb_parser
+
+        log.verbose('Fetching %s imdb pages' % len(urls))
+        pool = ThreadPool(min(MAX_FETCH_WORKERS, len(urls)))
+        try:
+            for url, imdb_parser in pool.map(fetch, urls):
+                if imdb_parser is not None:
+                    self._parsed[url] = imdb_parser
+        finally:
+            pool.close()
+            pool.join()
+
     @with_session
     def imdb_id_lookup(self, movie_title=None, raw_title=None, session=None):
         """
@@ -433,8 +545,10 @@ class ImdbLookup(object):
         :param session: Session to be used
         :return: Newly added Movie
         """
-        imdb_parser = ImdbParser()
-        imdb_parser.parse(imdb_url)
+        imdb_parser = self._parsed.pop(imdb_url, None)
+        if imdb_parser is None:
+            imdb_parser = ImdbParser()
+            imdb_parser.parse(imdb_url)
         # store to database
         movie = Movie()
         movie.photo = imdb_parser.photo
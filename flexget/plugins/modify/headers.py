@@ -39,6 +39,8 @@ class PluginHeaders(object):
       cookie: uid=<YOUR UID>; pass=<YOUR PASS>
     """
 
+    uses_global_opener = True
+
     def validator(self):
         from flexget import validator
         config = validator.factory('dict')
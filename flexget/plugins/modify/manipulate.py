@@ -45,33 +45,39 @@ class Manipulate(object):
         replace.accept('text', key='format', required=True)
         return root
 
+    def __init__(self):
+        # Jobs of each task {task name: {phase: jobs}}, tasks may execute concurrently
+        self.phase_jobs = {}
+
     def on_task_start(self, task, config):
         """
         Separates the config into a dict with a list of jobs per phase.
         Allows us to skip phases without any jobs in them.
         """
-        self.phase_jobs = {'filter': [], 'metainfo': []}
+        phase_jobs = self.phase_jobs[task.name] = {'filter': [], 'metainfo': []}
         for item in config:
             for item_config in item.itervalues():
                 # Get the phase specified for this item, or use default of metainfo
                 phase = item_config.get('phase', 'metainfo')
-                self.phase_jobs[phase].append(item)
+                phase_jobs[phase].append(item)
 
     @priority(255)
     def on_task_metainfo(self, task, config):
-        if not self.phase_jobs['metainfo']:
+        jobs = self.phase_jobs[task.name]['metainfo']
+        if not jobs:
             # return if no jobs for this phase
             return
-        modified = sum(self.process(entry, self.phase_jobs['metainfo']) for entry in task.entries)
+        modified = sum(self.process(entry, jobs) for entry in task.entries)
         log.verbose('Modified %d entries.' % modified)
 
 
     @priority(255)
     def on_task_filter(self, task, config):
-        if not self.phase_jobs['filter']:
+        jobs = self.phase_jobs[task.name]['filter']
+        if not jobs:
             # return if no jobs for this phase
             return
-        modified = sum(self.process(entry, self.phase_jobs['filter']) for entry in task.entries + task.rejected)
+        modified = sum(self.process(entry, jobs) for entry in task.entries + task.rejected)
         log.verbose('Modified %d entries.' % modified)
 
     def process(self, entry, jobs):
@@ -1,5 +1,4 @@
 import logging
-from flexget import plugin
 from flexget.plugin import priority, register_plugin, plugins
 
 log = logging.getLogger('builtins')
@@ -13,10 +12,6 @@ def all_builtins():
 class PluginDisableBuiltins(object):
     """Disables all (or specific) builtin plugins from a task."""
 
-    def __init__(self):
-        # cannot trust that on_task_start would have been executed
-        self.disabled = []
-
     def validator(self):
         from flexget import validator
         root = validator.factory()
@@ -29,25 +24,22 @@ class PluginDisableBuiltins(object):
 
     @priority(255)
     def on_task_start(self, task, config):
-        self.disabled = []
         if not config:
             return
 
+        # Builtins are disabled for this task only, other tasks may be executing at the same time
         for plugin in all_builtins():
             if config is True or plugin.name in config:
-                plugin.builtin = False
-                self.disabled.append(plugin.name)
-        log.debug('Disabled builtin plugin(s): %s' % ', '.join(self.disabled))
+                task.disabled_builtins.append(plugin.name)
+        log.debug('Disabled builtin plugin(s): %s' % ', '.join(task.disabled_builtins))
 
     @priority(-255)
     def on_task_exit(self, task, config):
-        if not self.disabled:
+        if not task.disabled_builtins:
             return
 
-        for name in self.disabled:
-            plugin.plugins[name].builtin = True
-        log.debug('Enabled builtin plugin(s): %s' % ', '.join(self.disabled))
-        self.disabled = []
+        log.debug('Enabled builtin plugin(s): %s' % ', '.join(task.disabled_builtins))
+        task.disabled_builtins[:] = []
 
     on_task_abort = on_task_exit
 
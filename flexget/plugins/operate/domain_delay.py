@@ -7,22 +7,43 @@ log = logging.getLogger('domain_delay')
 
 class DomainDelay(object):
     """
-    Sets a minimum interval between requests to specific domains.
+    Sets a minimum interval between requests to specific domains. Limits also apply to subdomains and are shared
+    by all tasks.
 
     Example::
       domain_delay:
         mysite.com: 5 seconds
+
+    Advanced usage, allow a burst of 3 requests and at most 2 simultaneous requests::
+      domain_delay:
+        mysite.com:
+          delay: 5 seconds
+          burst: 3
+          concurrency: 2
     """
 
     def validator(self):
+
+        def limit_validator():
+            limit = validator.factory('root')
+            limit.accept('interval')
+            advanced = limit.accept('dict')
+            advanced.accept('interval', key='delay', required=True)
+            advanced.accept('integer', key='burst')
+            advanced.accept('integer', key='concurrency')
+            return limit
+
         root = validator.factory('dict')
-        root.accept_valid_keys('interval', key_type='text')
+        root.accept_valid_keys(limit_validator, key_type='text')
         return root
 
     def on_task_start(self, task, config):
-        for domain, delay in config.iteritems():
-            log.debug('Adding minimum interval of %s between requests to %s' % (delay, domain))
-            task.requests.set_domain_delay(domain, delay)
+        for domain, limit in config.iteritems():
+            if not isinstance(limit, dict):
+                limit = {'delay': limit}
+            log.debug('Adding minimum interval of %s between requests to %s' % (limit['delay'], domain))
+            task.requests.set_domain_delay(domain, limit['delay'], burst=limit.get('burst', 1),
+                                           concurrency=limit.get('concurrency'))
 
 
 register_plugin(DomainDelay, 'domain_delay', api_ver=2)
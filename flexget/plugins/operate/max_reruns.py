@@ -10,20 +10,22 @@ class MaxReRuns(object):
     """Overrides the maximum amount of re-runs allowed by a task."""
 
     def __init__(self):
-        self.default = Task.max_reruns
+        # Values to restore for each task, tasks may execute concurrently
+        self.defaults = {}
 
     def validator(self):
         root = validator.factory('integer')
         return root
 
     def on_task_start(self, task, config):
-        self.default = task.max_reruns
+        self.defaults[task.name] = task.max_reruns
         task.max_reruns = config
         log.debug('changing max task rerun variable to: %s' % config)
 
     def on_task_exit(self, task, config):
-        log.debug('restoring max task rerun variable to: %s' % self.default)
-        task.max_reruns = self.default
+        default = self.defaults.pop(task.name, Task.max_reruns)
+        log.debug('restoring max task rerun variable to: %s' % default)
+        task.max_reruns = default
 
     on_task_abort = on_task_exit
 
@@ -5,10 +5,13 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
 import urllib
 import urllib2
 from cgi import parse_header
+from collections import defaultdict
 from httplib import BadStatusLine
+from urlparse import urlparse
 
 from requests import RequestException
 
@@ -19,6 +22,41 @@ from flexget.utils.pathscrub import pathscrub
 
 log = logging.getLogger('download')
 
+# Maximum number of entries downloaded at the same time
+MAX_WORKERS = 6
+# Maximum number of entries downloaded at the same time from one host
+MAX_WORKERS_PER_HOST = 2
+
+
+class HostScheduler(object):
+    """Hands out jobs to download workers in order, skipping jobs whose host already has `per_host` jobs running."""
+
+    def __init__(self, jobs, per_host):
+        """
+        :param jobs: List of (host, job) tuples
+        :param int per_host: Maximum number of running jobs per host
+        """
+        self.pending = list(jobs)
+        self.per_host = per_host
+        self.running = defaultdict(int)
+        self.condition = threading.Condition()
+
+    def take(self):
+        """Wait until a job can be started and return it as (host, job), or None when all jobs have been taken."""
+        with self.condition:
+            while self.pending:
+                for i, (host, job) in enumerate(self.pending):
+                    if self.running[host] < self.per_host:
+                        del self.pending[i]
+                        self.running[host] += 1
+                        return host, job
+                self.condition.wait()
+
+    def done(self, host):
+        with self.condition:
+            self.running[host] -= 1
+            self.condition.notify_all()
+
 
 class PluginDownload(object):
 
@@ -89,6 +127,24 @@ class PluginDownload(object):
         :param fail_html:
           fail entries which url respond with html content
         """
+        reason = self.fetch_entry(task, entry, require_path, handle_magnets, fail_html)
+        if reason:
+            task.fail(entry, reason)
+
+    def fetch_entry(self, task, entry, require_path=False, handle_magnets=False, fail_html=True):
+        """
+        Download entry content and store in temporary folder. Does not touch the task, so that it can be used
+        from download worker threads.
+
+        :param bool require_path:
+          whether or not entries without 'path' field are ignored
+        :param bool handle_magnets:
+          when used any of urls containing magnet link will replace url,
+          otherwise warning is printed.
+        :param fail_html:
+          fail entries which url respond with html content
+        :return: Reason to fail the entry with, or None if download succeeded.
+        """
         if entry.get('urls'):
             urls = entry.get('urls')
         else:
@@ -128,14 +184,19 @@ class PluginDownload(object):
             # check if entry must have a path (download: yes)
             if require_path and 'path' not in entry:
                 log.error('%s can\'t be downloaded, no path specified for entry' % entry['title'])
-                task.fail(entry, 'no path specified for entry')
+                return 'no path specified for entry'
             else:
-                task.fail(entry, ", ".join(errors))
+                return ", ".join(errors)
 
     def save_error_page(self, entry, task, page):
         received = os.path.join(task.manager.config_base, 'received', task.name)
         if not os.path.isdir(received):
-            os.makedirs(received)
+            try:
+                os.makedirs(received)
+            except OSError:
+                # Another download worker may have created it
+                if not os.path.isdir(received):
+                    raise
         filename = os.path.join(received, '%s.error' % entry['title'].encode(sys.getfilesystemencoding(), 'replace'))
         log.error('Error retrieving %s, the error page has been saved to %s' % (entry['title'], filename))
         outfile = open(filename, 'w')
@@ -155,8 +216,65 @@ class PluginDownload(object):
         :param fail_html:
           fail entries which url respond with html content
         """
-        for entry in task.accepted:
-            self.get_temp_file(task, entry, require_path, handle_magnets, fail_html)
+        entries = list(task.accepted)
+        if len(entries) <= 1:
+            for entry in entries:
+                self.get_temp_file(task, entry, require_path, handle_magnets, fail_html)
+            return
+
+        jobs = []
+        for entry in entries:
+            url = (entry.get('urls') or [entry['url']])[0]
+            jobs.append((urlparse(url).hostname, entry))
+        scheduler = HostScheduler(jobs, MAX_WORKERS_PER_HOST)
+        results = {}
+
+        from multiprocessing.pool import ThreadPool
+        from flexget import logger
+        execution = logger.get_execution()
+
+        def worker(_):
+            logger.set_execution(execution)
+            logger.set_task(task.name)
+            try:
+                while True:
+                    job = scheduler.take()
+                    if job is None:
+                        return
+                    host, entry = job
+                    try:
+                        results[id(entry)] = (self.fetch_entry(task, entry, require_path, handle_magnets,
+                                                               fail_html), None)
+                    except Exception:
+                        # Re-raised on the task thread
+                        results[id(entry)] = (None, sys.exc_info())
+                    finally:
+                        scheduler.done(host)
+            finally:
+                logger.set_task('')
+                logger.set_execution('')
+
+        workers = min(MAX_WORKERS, len(entries))
+        log.debug('Downloading %s entries using %s workers' % (len(entries), workers))
+        pool = ThreadPool(workers)
+        try:
+            # timeout allows KeyboardInterrupt to be received while waiting
+            pool.map_async(worker, range(workers)).get(timeout=60 * 60 * 24)
+        except KeyboardInterrupt:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
+
+        # Entries are failed on the task thread, in the order they were accepted
+        for entry in entries:
+            reason, exc_info = results[id(entry)]
+            if exc_info:
+                raise exc_info[0], exc_info[1], exc_info[2]
+            if reason:
+                task.fail(entry, reason)
 
     # TODO: a bit silly method, should be get rid of now with simplier exceptions ?
     def process_entry(self, task, entry, url):
@@ -175,7 +293,7 @@ class PluginDownload(object):
             else:
                 if not task.manager.unit_test:
                     log.info('Downloading: %s' % entry['title'])
-                self.download_entry(task, entry, url)
+                return self.download_entry(task, entry, url)
         except RequestException, e:
             # TODO: Improve this error message?
             log.warning('RequestException %s' % e)
@@ -207,6 +325,7 @@ class PluginDownload(object):
     def download_entry(self, task, entry, url):
         """Downloads `entry` by using `url`.
 
+        :return: String error, if downloaded file was empty.
         :raises: Several types of exceptions ...
         :raises: PluginWarning
         """
@@ -246,7 +365,12 @@ class PluginDownload(object):
         tmp_path = os.path.join(task.manager.config_base, 'temp')
         if not os.path.isdir(tmp_path):
             log.debug('creating tmp_path %s' % tmp_path)
-            os.mkdir(tmp_path)
+            try:
+                os.mkdir(tmp_path)
+            except OSError:
+                # Another download worker may have created it
+                if not os.path.isdir(tmp_path):
+                    raise
         tmp_dir = tempfile.mkdtemp(dir=tmp_path)
         fname = hashlib.md5(url).hexdigest()
         datafile = os.path.join(tmp_dir, fname)
@@ -265,9 +389,9 @@ class PluginDownload(object):
             outfile.close()
             # Do a sanity check on downloaded file
             if os.path.getsize(datafile) == 0:
-                task.fail(entry, 'File %s is 0 bytes in size' % datafile)
                 os.remove(datafile)
-                return
+                shutil.rmtree(tmp_dir)
+                return 'File %s is 0 bytes in size' % datafile
             # store temp filename into entry so other plugins may read and modify content
             # temp file is moved into final destination at self.output
             entry['file'] = datafile
@@ -18,6 +18,8 @@ class PluginCookies:
       cookies: /path/firefox/profile/something/cookies.sqlite
     """
 
+    uses_global_opener = True
+
     def validator(self):
         from flexget import validator
         root = validator.factory()
@@ -11,6 +11,8 @@ class FormLogin(object):
     Login on form
     """
 
+    uses_global_opener = True
+
     def validator(self):
         from flexget import validator
         root = validator.factory('dict')
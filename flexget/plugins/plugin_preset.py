@@ -1,7 +1,8 @@
 import logging
 from flexget import validator
 from flexget.manager import register_config_key
-from flexget.plugin import priority, register_plugin, PluginError, register_parser_option, plugins as all_plugins
+from flexget.plugin import priority, register_plugin, PluginError, register_parser_option, \
+    get_validated_plugin_keywords
 
 log = logging.getLogger('preset')
 
@@ -142,7 +143,7 @@ class DisablePlugin(object):
 def root_config_validator():
     """Returns a validator for the 'presets' key of config."""
     # TODO: better error messages
-    valid_plugins = [p for p in all_plugins if hasattr(all_plugins[p].instance, 'validator')]
+    valid_plugins = get_validated_plugin_keywords()
     root = validator.factory('dict')
     root.reject_keys(valid_plugins, message='plugins should go under a specific preset. '
         '(and presets are not allowed to be named the same as any plugins)')
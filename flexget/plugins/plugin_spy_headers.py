@@ -77,6 +77,8 @@ class PluginSpyHeaders(object):
         WARNING: At the moment this modifies requests somehow!
     """
 
+    uses_global_opener = True
+
     def validator(self):
         from flexget import validator
         return validator.factory('any')
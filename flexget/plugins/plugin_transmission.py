@@ -31,6 +31,9 @@ def save_opener(f):
 
 class TransmissionBase(object):
 
+    # transmissionrpc replaces the urllib2 default opener, see save_opener
+    uses_global_opener = True
+
     def __init__(self):
         self.client = None
         self.opener = None
@@ -4,6 +4,7 @@ from flexget.manager import Base, Session
 from flexget.event import event
 from flexget.utils.database import with_session
 from flexget.utils.sqlalchemy_utils import table_schema
+from flexget.utils.startup_profile import startup_profiler
 
 log = logging.getLogger('schema')
 
@@ -91,7 +92,8 @@ def upgrade(plugin):
             ver = get_version(plugin)
             session = Session()
             try:
-                new_ver = func(ver, session)
+                with startup_profiler.section(plugin):
+                    new_ver = func(ver, session)
                 if new_ver > ver:
                     log.info('Plugin `%s` schema upgraded successfully' % plugin)
                     set_version(plugin, new_ver)
@@ -1,14 +1,17 @@
 import logging
+import bisect
 import copy
 import hashlib
 from functools import wraps
 import itertools
+import threading
 from sqlalchemy import Column, Unicode, String, Integer
 from flexget import validator
 from flexget import schema
 from flexget.manager import Session, register_config_key
-from flexget.plugin import get_plugins_by_phase, get_plugin_by_name, \
-    task_phases, PluginWarning, PluginError, DependencyError, plugins as all_plugins
+from flexget.plugin import get_plugin_by_name, task_phases, phase_methods, PluginInfo, \
+    PluginWarning, PluginError, DependencyError, plugins as all_plugins, \
+    get_loaded_plugins, get_validated_plugin_keywords
 from flexget.utils.simple_persistence import SimpleTaskPersistence, SimplePersistence
 import flexget.utils.requests as requests
 from flexget.event import fire_event
@@ -17,6 +20,43 @@ from flexget.entry import Entry, EntryUnicodeError
 log = logging.getLogger('task')
 Base = schema.versioned_base('feed', 0)
 
+# Validator trees of plugins by plugin name, built once for each PluginInfo.revision
+_validators = {}
+# Validation error messages by plugin name, PluginInfo.revision and hash of the plugin config
+_validation_results = {}
+MAX_VALIDATION_RESULTS = 1000
+# Validator trees keep state while validating, they are used by one task at a time
+_validation_lock = threading.Lock()
+
+
+def copy_config(config):
+    """
+    Returns a copy of config which is not affected by changes to the original. Dicts and lists are copied,
+    other values are shared, which is much faster than deepcopy.
+    """
+    if isinstance(config, dict):
+        return dict((key, copy_config(value)) for key, value in config.iteritems())
+    elif isinstance(config, list):
+        return [copy_config(value) for value in config]
+    return config
+
+
+def get_plugin_validator(plugin):
+    """Returns root validator of `plugin`, building it only when plugins have changed. None if it is invalid."""
+    validator = _validators.get(plugin.name)
+    if validator is None or validator[0] != PluginInfo.revision:
+        try:
+            root = plugin.instance.validator()
+        except TypeError, e:
+            log.critical('Invalid validator method in plugin %s' % plugin.name)
+            log.exception(e)
+            return None
+        if not root.name == 'root':
+            # if validator is not root type, add root validator as it's parent
+            root = root.add_root_parent()
+        validator = _validators[plugin.name] = (PluginInfo.revision, root)
+    return validator[1]
+
 
 class TaskConfigHash(Base):
     """Stores the config hash for tasks so that we can tell if the config has changed since last run."""
@@ -53,16 +93,23 @@ class EntryIterator(object):
         self.all_entries = entries
         if isinstance(states, basestring):
             states = [states]
-        self.filter = lambda e: e._state in states
+        self.states = states
+
+    def _entries(self):
+        """Returns list of entries in these states, in container order."""
+        return self.all_entries.by_state(self.states)
 
     def __iter__(self):
-        return itertools.ifilter(self.filter, self.all_entries)
+        # Entries may change state during iteration, skip those which are no longer in these states
+        return (e for e in self._entries() if e._state in self.states)
 
     def __bool__(self):
-        return any(e for e in self)
+        return len(self) > 0
+
+    __nonzero__ = __bool__
 
     def __len__(self):
-        return sum(1 for e in self)
+        return self.all_entries.count_by_state(self.states)
 
     def __add__(self, other):
         return itertools.chain(self, other)
@@ -73,14 +120,13 @@ class EntryIterator(object):
     def __getitem__(self, item):
         if not isinstance(item, int):
             raise ValueError('Index must be integer.')
-        for index, entry in enumerate(self):
-            if index == item:
-                return entry
-        else:
+        entries = self._entries()
+        if not 0 <= item < len(entries):
             raise IndexError('%d is out of bounds' % item)
+        return entries[item]
 
     def __getslice__(self, a, b):
-        return list(itertools.islice(self, a, b))
+        return self._entries()[a:b]
 
     def reverse(self):
         self.all_entries.sort(reverse=True)
@@ -89,8 +135,27 @@ class EntryIterator(object):
         self.all_entries.sort(*args, **kwargs)
 
 
+def _modifies_entries(method):
+    """Decorates list method of :class:`EntryContainer` so that index of entries by state is rebuilt after call."""
+
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._index = None
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
 class EntryContainer(list):
-    """Container for a list of entries, also contains accepted, rejected failed iterators over them."""
+    """
+    Container for a list of entries, also contains accepted, rejected failed iterators over them.
+
+    Entries are indexed by their state, so that the iterators do not need to go through all the entries. The index
+    is updated when an entry of the task changes state and rebuilt when the list itself is modified.
+    """
 
     def __init__(self, iterable=None, task=None):
         list.__init__(self, iterable or [])
@@ -98,6 +163,9 @@ class EntryContainer(list):
         for entry in self:
             entry.task = task
 
+        # Index of entries by state, None when it needs to be rebuilt
+        self._index = None
+
         self._entries = EntryIterator(self, ['undecided', 'accepted'])
         self._accepted = EntryIterator(self, 'accepted') # accepted entries, can still be rejected
         self._rejected = EntryIterator(self, 'rejected') # rejected entries
@@ -111,18 +179,105 @@ class EntryContainer(list):
     failed = property(lambda self: self._failed)
     undecided = property(lambda self: self._undecided)
 
+    def _get_index(self):
+        """Returns dict of state to :class:`StateIndex`, or None if entries cannot be indexed."""
+        if self._index is None or self._index_revision != Entry.state_revision:
+            index = {}
+            positions = {}
+            for position, entry in enumerate(self):
+                if id(entry) in positions:
+                    # Same entry is in the list more than once, positions would be ambiguous
+                    self._index = None
+                    return None
+                positions[id(entry)] = position
+                index.setdefault(entry._state, StateIndex()).append(position, entry)
+            self._index = index
+            self._positions = positions
+            self._index_revision = Entry.state_revision
+        return self._index
+
+    def state_changed(self, entry, old_state):
+        """Called when `entry` has changed state from `old_state`. Updates the index if it was up to date."""
+        if self._index is None or self._index_revision != Entry.state_revision - 1:
+            # Index will be rebuilt when needed
+            return
+        position = self._positions.get(id(entry))
+        if position is not None:
+            self._index[old_state].remove(position)
+            self._index.setdefault(entry._state, StateIndex()).insert(position, entry)
+        self._index_revision = Entry.state_revision
+
+    def by_state(self, states):
+        """Returns list of entries in given `states`, in order."""
+        index = self._get_index()
+        if index is None:
+            return [entry for entry in self if entry._state in states]
+        indexes = [index[state] for state in states if state in index]
+        if len(indexes) == 1:
+            return list(indexes[0].entries)
+        merged = sorted(itertools.chain(*[zip(i.positions, i.entries) for i in indexes]), key=lambda pair: pair[0])
+        return [entry for position, entry in merged]
+
+    def count_by_state(self, states):
+        """Returns number of entries in given `states`."""
+        index = self._get_index()
+        if index is None:
+            return sum(1 for entry in self if entry._state in states)
+        return sum(len(index[state].entries) for state in states if state in index)
+
     def append(self, entry):
         entry.task = self.task
         list.append(self, entry)
+        if self._index is not None and self._index_revision == Entry.state_revision:
+            if id(entry) in self._positions:
+                self._index = None
+            else:
+                self._positions[id(entry)] = len(self) - 1
+                self._index.setdefault(entry._state, StateIndex()).append(len(self) - 1, entry)
+        else:
+            self._index = None
 
     def extend(self, iterable):
         for entry in iterable:
             self.append(entry)
 
+    insert = _modifies_entries(list.insert)
+    remove = _modifies_entries(list.remove)
+    pop = _modifies_entries(list.pop)
+    sort = _modifies_entries(list.sort)
+    reverse = _modifies_entries(list.reverse)
+    __setitem__ = _modifies_entries(list.__setitem__)
+    __delitem__ = _modifies_entries(list.__delitem__)
+    __setslice__ = _modifies_entries(list.__setslice__)
+    __delslice__ = _modifies_entries(list.__delslice__)
+    __iadd__ = _modifies_entries(list.__iadd__)
+
     def __repr__(self):
         return '<EntryContainer(task=%s,%s)' % (self.task.name, list.__repr__(self))
 
 
+class StateIndex(object):
+    """Entries in one state and their positions in :class:`EntryContainer`, ordered by position."""
+
+    def __init__(self):
+        self.positions = []
+        self.entries = []
+
+    def append(self, position, entry):
+        self.positions.append(position)
+        self.entries.append(entry)
+
+    def insert(self, position, entry):
+        i = bisect.bisect_left(self.positions, position)
+        self.positions.insert(i, position)
+        self.entries.insert(i, entry)
+
+    def remove(self, position):
+        i = bisect.bisect_left(self.positions, position)
+        del self.positions[i]
+        del self.entries[i]
+
+
 class Task(object):
 
     """
@@ -168,10 +323,17 @@ class Task(object):
 
         # not to be reset
         self._rerun_count = 0
+        # set by prefetch, execute continues from where prefetch ended
+        self._prefetched = False
+        self._config_backup = None
 
         # This should not be used until after process_start, when it is evaluated
         self.config_modified = None
 
+        # enabled plugins for each phase, see _phase_plan
+        self._plan = None
+        self._plan_key = None
+
         # use reset to init variables when creating
         self._reset()
 
@@ -199,6 +361,10 @@ class Task(object):
         self._all_entries = EntryContainer(task=self)
 
         self.disabled_phases = []
+        # Changes made by plugins (plugin_priority, disable_builtins) for this task only, other tasks may be executing
+        # at the same time
+        self.plugin_priorities = {}
+        self.disabled_builtins = []
 
         # TODO: task.abort() should be done by using exception? not a flag that has to be checked everywhere
         self._abort = False
@@ -228,7 +394,9 @@ class Task(object):
     @property
     def undecided(self):
         """Iterate over undecided entries"""
-        return (entry for entry in self.entries if not entry in self.accepted and entry not in self.rejected)
+        # Entries are compared by title and url, same as `entry in self.accepted` would
+        decided = set((entry.get('title'), entry.get('url')) for entry in self.accepted + self.rejected)
+        return (entry for entry in self.entries if (entry.get('title'), entry.get('url')) not in decided)
 
     def disable_phase(self, phase):
         """Disable ``phase`` from execution.
@@ -304,7 +472,8 @@ class Task(object):
             self._silent_abort = True
         # Run the abort phase before we set the _abort flag
         self._abort = True
-        self.__run_task_phase('abort')
+        with self.manager.task_lock:
+            self.__run_task_phase('abort')
 
     def find_entry(self, category='entries', **values):
         """
@@ -334,10 +503,52 @@ class Task(object):
           An iterator over configured :class:`flexget.plugin.PluginInfo` instances enabled on this task.
         """
         if phase:
-            plugins = sorted(get_plugins_by_phase(phase), key=lambda p: p.phase_handlers[phase], reverse=True)
+            if not phase in phase_methods:
+                raise Exception('Unknown phase %s' % phase)
+            plugins = self._phase_plan().get(phase, [])
         else:
-            plugins = all_plugins.itervalues()
-        return (p for p in plugins if p.name in self.config or p.builtin)
+            plugins = self._phase_plan()[None]
+        # Plugins may still be disabled during a phase (disable_builtins)
+        return (p for p in plugins if p.name in self.config or
+                (p.builtin and p.name not in self.disabled_builtins))
+
+    @property
+    def exclusive(self):
+        """
+        True if the task cannot be executed concurrently with other tasks.
+
+        Plugins with attribute `uses_global_opener` set install handlers (cookies, headers) into the process wide
+        urllib2 opener, which would be used by other tasks as well.
+        """
+        return any(getattr(plugin.instance, 'uses_global_opener', False) for plugin in self.plugins())
+
+    def _phase_plan(self):
+        """
+        Returns dict of phase name -> list of enabled plugins in execution order. Key None has all enabled plugins.
+
+        Built once and reused until task config keys, registered plugins or plugin changes made for this task
+        change.
+        """
+        # Looking up configured plugins imports those known only from the plugin manifest, which changes the
+        # plugin revision, so the key is computed after it
+        enabled = [all_plugins[name] for name in self.config if name in all_plugins]
+        key = (PluginInfo.revision, frozenset(self.config), frozenset(self.plugin_priorities.iteritems()),
+               frozenset(self.disabled_builtins))
+        if key != self._plan_key:
+            # builtins are always imported
+            enabled.extend(p for p in get_loaded_plugins() if p.builtin and p.name not in self.config and
+                           p.name not in self.disabled_builtins)
+            plan = {None: enabled}
+            for plugin in enabled:
+                for phase in plugin.phase_handlers:
+                    plan.setdefault(phase, []).append(plugin)
+            for phase, plugins in plan.iteritems():
+                if phase is None:
+                    continue
+                plugins.sort(key=lambda p: self.plugin_priorities.get(p.name, p.phase_handlers[phase].priority),
+                             reverse=True)
+            self._plan, self._plan_key = plan, key
+        return self._plan
 
     def __run_task_phase(self, phase):
         """Executes task phase, ie. call all enabled plugins on the task.
@@ -473,6 +684,8 @@ class Task(object):
     def execute(self, disable_phases=None, entries=None):
         """Executes the task.
 
+        If the task has been prefetched, execution continues from the phase following input.
+
         :param list disable_phases: Disable given phases names during execution
         :param list entries: Entries to be used in execution instead
             of using the input. Disables input phase.
@@ -480,9 +693,60 @@ class Task(object):
 
         log.debug('executing %s' % self.name)
 
-        # Store original config state to be restored if a rerun is needed
-        config_backup = copy.deepcopy(self.config)
+        if self._prefetched:
+            self._prefetched = False
+            config_backup = self._config_backup
+            log.debug('starting session')
+            self.session = Session()
+            phases = task_phases[task_phases.index('input') + 1:]
+        else:
+            # Store original config state to be restored if a rerun is needed
+            config_backup = copy_config(self.config)
+            if not self._begin(disable_phases, entries):
+                return
+            phases = task_phases
+
+        if not self._run_phases(phases, completed=True):
+            return
+
+        # rerun task
+        if self._rerun:
+            if self._rerun_count >= self.max_reruns:
+                log.info('Task has been rerunning already %s times, stopping for now' % self._rerun_count)
+                # reset the counter for future runs (necessary only with webui)
+                self._rerun_count = 0
+            else:
+                log.info('Rerunning the task in case better resolution can be achieved.')
+                self._rerun_count += 1
+                # Restore config to original state before running again
+                self.config = config_backup
+                self.execute(disable_phases=disable_phases, entries=entries)
+
+        # Clean up entries after the task has executed to reduce ram usage, #1652
+        # TODO: This doesn't work with unified entries, not sure best replacement
+        """if not self.manager.unit_test:
+            log.debug('Clearing all entries from task.')
+            self.entries = []
+            self.rejected = []
+            self.failed = []"""
+
+    @useTaskLogging
+    def prefetch(self, disable_phases=None):
+        """Runs the task phases up to and including input ahead of :meth:`execute`.
+
+        Used by :meth:`Manager.execute` to run the inputs of all tasks concurrently. Database changes made in these
+        phases are committed when prefetch is done.
 
+        :param list disable_phases: Disable given phases names during execution
+        """
+        log.debug('prefetching %s' % self.name)
+        self._config_backup = copy_config(self.config)
+        if not self._begin(disable_phases):
+            return
+        self._prefetched = self._run_phases(task_phases[:task_phases.index('input') + 1])
+
+    def _begin(self, disable_phases=None, entries=None):
+        """Resets and validates the task and starts a session. Returns False if execution should not continue."""
         self._reset()
         # Handle keyword args
         if disable_phases:
@@ -495,14 +759,14 @@ class Task(object):
         # validate configuration
         errors = self.validate()
         if self._abort: # todo: bad practice
-            return
+            return False
         if errors and self.manager.unit_test: # todo: bad practice
             raise Exception('configuration errors')
         if self.manager.options.validate:
             if not errors:
                 log.info('Task \'%s\' passed' % self.name)
             self.enabled = False
-            return
+            return False
 
         log.debug('starting session')
         self.session = Session()
@@ -522,10 +786,20 @@ class Task(object):
             last_hash.hash = config_hash
         else:
             self.config_modified = False
+        return True
 
+    def _run_phases(self, phases, completed=False):
+        """
+        Runs given phases and commits the session. Returns False if the task was aborted.
+
+        :param list phases: Names of the phases, in execution order
+        :param bool completed: True if these are the last phases of the execution
+        """
+        # Plugins keep state between phases, only inputs are allowed to run while another task is executing
+        self.manager.task_lock.acquire()
         try:
             # run phases
-            for phase in task_phases:
+            for phase in phases:
                 if phase in self.disabled_phases:
                     # log keywords not executed
                     for plugin in self.plugins(phase):
@@ -535,40 +809,29 @@ class Task(object):
                     continue
 
                 # run all plugins with this phase
-                self.__run_task_phase(phase)
+                if phase == 'input':
+                    self.manager.task_lock.release()
+                    try:
+                        self.__run_task_phase(phase)
+                    finally:
+                        self.manager.task_lock.acquire()
+                else:
+                    self.__run_task_phase(phase)
 
                 # if abort flag has been set task should be aborted now
                 # since this calls return rerun will not be done
                 if self._abort:
-                    return
+                    return False
 
             log.debug('committing session, abort=%s' % self._abort)
             self.session.commit()
-            fire_event('task.execute.completed', self)
+            if completed:
+                fire_event('task.execute.completed', self)
         finally:
             # this will cause database rollback on exception and task.abort
             self.session.close()
-
-        # rerun task
-        if self._rerun:
-            if self._rerun_count >= self.max_reruns:
-                log.info('Task has been rerunning already %s times, stopping for now' % self._rerun_count)
-                # reset the counter for future runs (necessary only with webui)
-                self._rerun_count = 0
-            else:
-                log.info('Rerunning the task in case better resolution can be achieved.')
-                self._rerun_count += 1
-                # Restore config to original state before running again
-                self.config = config_backup
-                self.execute(disable_phases=disable_phases, entries=entries)
-
-        # Clean up entries after the task has executed to reduce ram usage, #1652
-        # TODO: This doesn't work with unified entries, not sure best replacement
-        """if not self.manager.unit_test:
-            log.debug('Clearing all entries from task.')
-            self.entries = []
-            self.rejected = []
-            self.failed = []"""
+            self.manager.task_lock.release()
+        return True
 
     def _process_start(self):
         """Execute process_start phase"""
@@ -611,18 +874,26 @@ class Task(object):
                 validate_errors.append('Unknown plugin \'%s\'' % keyword)
                 continue
             if hasattr(plugin.instance, 'validator'):
-                try:
-                    validator = plugin.instance.validator()
-                except TypeError, e:
-                    log.critical('Invalid validator method in plugin %s' % keyword)
-                    log.exception(e)
-                    continue
-                if not validator.name == 'root':
-                    # if validator is not root type, add root validator as it's parent
-                    validator = validator.add_root_parent()
-                if not validator.validate(config[keyword]):
-                    for msg in validator.errors.messages:
-                        validate_errors.append('%s %s' % (keyword, msg))
+                # Results are reused while the plugin config and plugins stay the same, repr is used because str
+                # fails on non-ascii unicode
+                key = (keyword, PluginInfo.revision, hashlib.md5(repr(config[keyword])).hexdigest())
+                messages = _validation_results.get(key)
+                if messages is None:
+                    with _validation_lock:
+                        validator = get_plugin_validator(plugin)
+                        if validator is None:
+                            continue
+                        # Start with empty errors, the validator may have been used before
+                        validator._errors = None
+                        messages = []
+                        if not validator.validate(config[keyword]):
+                            messages = list(validator.errors.messages)
+                        if not validator.errors.volatile:
+                            if len(_validation_results) >= MAX_VALIDATION_RESULTS:
+                                _validation_results.clear()
+                            _validation_results[key] = messages
+                for msg in messages:
+                    validate_errors.append('%s %s' % (keyword, msg))
             else:
                 log.warning('Used plugin %s does not support validating. Please notify author!' % keyword)
 
@@ -632,7 +903,7 @@ class Task(object):
 def root_config_validator():
     """Returns a validator for the 'tasks' key of config."""
     # TODO: better error messages
-    valid_plugins = [p for p in all_plugins if hasattr(all_plugins[p].instance, 'validator')]
+    valid_plugins = get_validated_plugin_keywords()
     root = validator.factory('dict')
     root.reject_keys(valid_plugins, message='plugins should go under a specific task. '
         '(and tasks are not allowed to be named the same as any plugins)')
@@ -1,13 +1,15 @@
 import copy
 import logging
 import hashlib
-from datetime import datetime, timedelta
+import itertools
+import threading
+from datetime import datetime, date, timedelta
 from sqlalchemy import Column, Integer, String, DateTime, PickleType, Unicode, ForeignKey
 from sqlalchemy.orm import relation
 from flexget import schema
 from flexget.utils.database import safe_pickle_synonym
 from flexget.utils.tools import parse_timedelta
-from flexget.entry import Entry
+from flexget.entry import Entry, LazyField
 from flexget.event import event
 from flexget.plugin import PluginError
 
@@ -58,6 +60,105 @@ def config_hash(config):
         return hashlib.md5(str(config)).hexdigest()
 
 
+# Maximum number of entries kept in the in-memory cache, least recently used caches are evicted first
+MAX_CACHED_ENTRIES = 20000
+
+# Values of these types are shared between cached entries instead of copied
+IMMUTABLE_TYPES = (basestring, int, long, float, bool, type(None), datetime, date, timedelta)
+
+
+def freeze_entry(entry):
+    """
+    Returns snapshot of entry fields, which is not affected by further changes to the entry.
+
+    Immutable values are shared with the entry, others are copied.
+    """
+    snapshot = {}
+    for field, value in entry.iteritems():
+        if isinstance(value, LazyField):
+            # entry is given to lazy functions when they are evaluated, store only the functions
+            funcs = value.funcs
+            value = LazyField(None, field, None)
+            value.funcs = list(funcs)
+        elif not isinstance(value, IMMUTABLE_TYPES):
+            value = copy.deepcopy(value)
+        snapshot[field] = value
+    return snapshot
+
+
+def thaw_entry(snapshot):
+    """Returns new :class:`Entry` from snapshot created by :func:`freeze_entry`. Only mutable values are copied."""
+    entry = Entry()
+    for field, value in snapshot.iteritems():
+        if isinstance(value, LazyField):
+            lazy = LazyField(entry, field, None)
+            lazy.funcs = list(value.funcs)
+            value = lazy
+        elif not isinstance(value, IMMUTABLE_TYPES):
+            value = copy.deepcopy(value)
+        # values have been validated when they were set to the original entry
+        dict.__setitem__(entry, field, value)
+    return entry
+
+
+class EntryCache(object):
+    """
+    Thread safe in-memory cache of entry snapshots, keyed by cache name.
+
+    Least recently used caches are evicted when more than `max_entries` entries are stored.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_ENTRIES):
+        self.max_entries = max_entries
+        self.caches = {}
+        self.last_used = {}
+        self.size = 0
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self.caches
+
+    def keys(self):
+        return self.caches.keys()
+
+    def get(self, name):
+        """Returns list of new entries restored from cache `name` or None if it is not cached."""
+        with self.lock:
+            snapshots = self.caches.get(name)
+            if snapshots is None:
+                return None
+            self.last_used[name] = self.counter.next()
+        return [thaw_entry(snapshot) for snapshot in snapshots]
+
+    def store(self, name, entries):
+        """Stores snapshot of `entries` under `name`."""
+        if len(entries) > self.max_entries:
+            log.debug('Not caching %s, %s entries exceeds maximum of %s' % (name, len(entries), self.max_entries))
+            return
+        snapshots = [freeze_entry(entry) for entry in entries]
+        with self.lock:
+            self._remove(name)
+            self.caches[name] = snapshots
+            self.last_used[name] = self.counter.next()
+            self.size += len(snapshots)
+            while self.size > self.max_entries:
+                oldest = min(self.last_used, key=self.last_used.get)
+                log.debug('Evicting %s from input cache' % oldest)
+                self._remove(oldest)
+
+    def _remove(self, name):
+        if name in self.caches:
+            self.size -= len(self.caches.pop(name))
+            del self.last_used[name]
+
+    def clear(self):
+        with self.lock:
+            self.caches = {}
+            self.last_used = {}
+            self.size = 0
+
+
 class cached(object):
     """
     Implements transparent caching decorator @cached for inputs.
@@ -71,7 +172,7 @@ class cached(object):
     .. note:: Configuration assumptions may make this unusable in some (future) inputs
     """
 
-    cache = {}
+    cache = EntryCache()
 
     def __init__(self, name, persist=None):
         # Cast name to unicode to prevent sqlalchemy warnings when filtering
@@ -104,13 +205,10 @@ class cached(object):
             cache_name = self.name + '_' + hash
             log.debug('cache name: %s (has: %s)' % (cache_name, ', '.join(self.cache.keys())))
 
-            if cache_name in self.cache:
+            entries = self.cache.get(cache_name)
+            if entries is not None:
                 # return from the cache
                 log.trace('cache hit')
-                entries = []
-                for entry in self.cache[cache_name]:
-                    fresh = copy.deepcopy(entry)
-                    entries.append(fresh)
                 if entries:
                     log.verbose('Restored %s entries from cache' % len(entries))
                 return entries
@@ -125,7 +223,7 @@ class cached(object):
                         entries = [Entry(e.entry) for e in db_cache.entries]
                         log.verbose('Restored %s entries from db cache' % len(entries))
                         # Store to in memory cache
-                        self.cache[cache_name] = copy.deepcopy(entries)
+                        self.cache.store(cache_name, entries)
                         return entries
 
                 # Nothing was restored from db or memory cache, run the function
@@ -144,7 +242,7 @@ class cached(object):
                             entries = [Entry(e.entry) for e in db_cache.entries]
                             log.verbose('Restored %s entries from db cache' % len(entries))
                             # Store to in memory cache
-                            self.cache[cache_name] = copy.deepcopy(entries)
+                            self.cache.store(cache_name, entries)
                             return entries
                     # If there was nothing in the db cache, re-raise the error.
                     raise
@@ -156,7 +254,7 @@ class cached(object):
                 # store results to cache
                 log.debug('storing to cache %s %s entries' % (cache_name, len(response)))
                 try:
-                    self.cache[cache_name] = copy.deepcopy(response)
+                    self.cache.store(cache_name, response)
                 except TypeError:
                     # might be caused because of backlog restoring some idiotic stuff, so not neccessarily a bug
                     log.critical('Unable to save task content into cache, if problem persists longer than a day please report this as a bug')
@@ -181,4 +279,4 @@ def clear_cache(manager):
     This is neccessary for webui or otherwise it will only use cache.
     """
     log.debug('clearing cache')
-    cached.cache = {}
+    cached.cache.clear()
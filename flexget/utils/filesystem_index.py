@@ -0,0 +1,113 @@
+"""
+Persistent index of directory listings, so that large libraries do not have to be listed on every run.
+
+Directories whose modification time has not changed since they were last listed are served from the database.
+Adding, removing or renaming an entry changes the modification time of its directory, which is all the exists
+plugins need to know.
+"""
+
+import os
+import time
+import logging
+from datetime import datetime
+from sqlalchemy import Column, Integer, Unicode, Float, DateTime, PickleType
+from flexget import schema
+
+log = logging.getLogger('filesystem_index')
+Base = schema.versioned_base('filesystem_index', 0)
+
+# Listings of directories modified within this many seconds are not trusted next time, mtime resolution may be coarse
+MTIME_GRACE = 2
+
+
+class IndexedDirectory(Base):
+
+    __tablename__ = 'filesystem_index'
+
+    id = Column(Integer, primary_key=True)
+    path = Column(Unicode, index=True)
+    mtime = Column(Float)
+    dirs = Column(PickleType)
+    files = Column(PickleType)
+    updated = Column(DateTime)
+
+    def __init__(self, path):
+        self.path = path
+
+    def __repr__(self):
+        return '<IndexedDirectory(path=%s,mtime=%s)>' % (self.path, self.mtime)
+
+
+def path_key(path):
+    """Return database key of byte string `path`."""
+    return path.decode('utf-8', 'replace')
+
+
+def list_directory(path):
+    """Return lists of subdirectory and file names in `path`, like :func:`os.walk` would."""
+    dirs, files = [], []
+    for name in os.listdir(path):
+        if os.path.isdir(os.path.join(path, name)):
+            dirs.append(name)
+        else:
+            files.append(name)
+    return dirs, files
+
+
+def walk(path, session):
+    """
+    Walks directory tree like :func:`os.walk`, top-down, using stored listings of unchanged directories.
+
+    Only byte string paths are supported, names are yielded as byte strings. Symlinked directories are listed but
+    not descended into. Listings of directories which no longer exist are removed from the index.
+
+    :param string path: Root of the tree
+    :param session: SQLAlchemy session
+    :return: Iterator of (root, dirs, files) tuples
+    """
+    path = os.path.normpath(path)
+    root_key = path_key(path)
+    prefix = path_key(os.path.join(path, ''))
+    pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    stored = dict((item.path, item) for item in session.query(IndexedDirectory).
+                  filter((IndexedDirectory.path == root_key) | IndexedDirectory.path.like(pattern, escape='\\')))
+
+    visited = set()
+    listed = 0
+    stack = [path]
+    while stack:
+        root = stack.pop()
+        key = path_key(root)
+        try:
+            mtime = os.stat(root).st_mtime
+        except OSError:
+            continue
+        item = stored.get(key)
+        if item is None or item.mtime != mtime:
+            try:
+                dirs, files = list_directory(root)
+            except OSError, e:
+                log.debug('Cannot list %s: %s' % (root, e))
+                continue
+            listed += 1
+            if item is None:
+                item = IndexedDirectory(key)
+                session.add(item)
+                stored[key] = item
+            item.mtime = mtime if time.time() - mtime > MTIME_GRACE else None
+            item.dirs = dirs
+            item.files = files
+            item.updated = datetime.now()
+        visited.add(key)
+        # Copies, so callers cannot modify the stored listing
+        dirs, files = list(item.dirs), list(item.files)
+        yield root, dirs, files
+        for name in reversed(dirs):
+            subdir = os.path.join(root, name)
+            if not os.path.islink(subdir):
+                stack.append(subdir)
+
+    for key, item in stored.iteritems():
+        if key not in visited:
+            session.delete(item)
+    log.debug('Walked %s directories in %s, %s of them had changed' % (len(visited), path, listed))
@@ -1,6 +1,7 @@
 import re
 import copy
 import logging
+from flexget.utils.tools import regexp_required_strings
 
 log = logging.getLogger('utils.qualities')
 
@@ -29,14 +30,25 @@ class QualityComponent(object):
         if regexp is None:
             regexp = re.escape(name)
         self.regexp = re.compile('(?<![^\W_])(' + regexp + ')(?![^\W_])', re.IGNORECASE)
+        # Any match contains one of these, which is much faster to check than running the regexp
+        self.required = tuple(str(s) for s in regexp_required_strings(regexp) or ())
 
-    def matches(self, text):
+    def matches(self, text, lower_text=None):
         """Test if quality matches to text.
 
         :param string text: data te be tested against
+        :param string lower_text: `text` in lowercase, if it is already known
         :returns: tuple (matches, remaining text without quality data)
         """
 
+        if self.required:
+            if lower_text is None:
+                lower_text = text.lower()
+            for required in self.required:
+                if required in lower_text:
+                    break
+            else:
+                return False, ""
         match = self.regexp.search(text)
         if not match:
             return False, ""
@@ -180,6 +192,10 @@ for type in (_resolutions, _sources, _codecs, _audios):
     for item in type:
         _registry[item.name] = item
 
+# Parse results by text, cleared when it grows over MAX_PARSE_CACHE
+_parse_cache = {}
+MAX_PARSE_CACHE = 50000
+
 
 def all_components():
     return _registry.itervalues()
@@ -208,6 +224,10 @@ class Quality(object):
         :param text: The string to parse
         """
         self.text = text
+        cached = _parse_cache.get(text)
+        if cached:
+            self.resolution, self.source, self.codec, self.audio, self.clean_text = cached
+            return
         self.clean_text = text
         self.resolution = self._find_best(_resolutions, _UNKNOWNS['resolution'])
         self.source = self._find_best(_sources, _UNKNOWNS['source'])
@@ -219,13 +239,17 @@ class Quality(object):
                 default = _registry[default]
                 if not getattr(self, default.type):
                     setattr(self, default.type, default)
+        if len(_parse_cache) >= MAX_PARSE_CACHE:
+            _parse_cache.clear()
+        _parse_cache[text] = (self.resolution, self.source, self.codec, self.audio, self.clean_text)
 
     def _find_best(self, qlist, default=None):
         """Finds the highest matching quality component from `qlist`"""
         text = self.clean_text
+        lower_text = text.lower()
         result = None
         for item in qlist:
-            match = item.matches(text)
+            match = item.matches(text, lower_text)
             if match[0]:
                 result = item
                 self.clean_text = match[1]
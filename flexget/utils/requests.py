@@ -2,6 +2,8 @@ from __future__ import absolute_import
 import urllib2
 import time
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import timedelta, datetime
 from urlparse import urlparse
 import requests
@@ -44,6 +46,108 @@ def set_unresponsive(url):
     unresponsive_hosts[host] = datetime.now()
 
 
+class TokenBucket(object):
+    """
+    Token bucket limiting the rate of requests to a single domain.
+
+    One token is added every `delay` seconds, up to `burst` tokens. Each request takes a token, when the bucket is
+    empty the request is given a reservation after the ones already waiting, so concurrent requests are queued in order
+    instead of all waking up at the same time.
+    """
+
+    def __init__(self, delay, burst=1, concurrency=None):
+        self.delay = delay
+        self.burst = burst
+        self.concurrency = concurrency
+        self.tokens = float(burst)
+        self.updated = time.time()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+
+    def reserve(self):
+        """
+        Takes a token from the bucket.
+
+        :return: Number of seconds caller must wait before using the token
+        """
+        with self.lock:
+            now = time.time()
+            if self.delay > 0:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.delay)
+            else:
+                self.tokens = float(self.burst)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            # Negative amount of tokens means there are requests waiting, take place at the end of the queue
+            return -self.tokens * self.delay
+
+
+class DomainLimiter(object):
+    """Process wide registry of request rate limits, keyed by host name. Limits also apply to subdomains."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def set_limit(self, domain, delay, burst=1, concurrency=None):
+        """
+        Registers a rate limit for requests to `domain`
+
+        :param domain: The domain to limit, eg. 'mysite.com'
+        :param delay: Minimum interval between requests, can be a timedelta or string like '3 seconds'
+        :param int burst: Amount of requests allowed without delay after the domain has been idle
+        :param int concurrency: Maximum amount of simultaneous requests to domain, unlimited if not given
+        """
+        delay = parse_timedelta(delay)
+        delay = delay.days * 86400 + delay.seconds + delay.microseconds / 1000000.0
+        domain = domain.lower()
+        with self.lock:
+            bucket = self.buckets.get(domain)
+            if bucket and (bucket.delay, bucket.burst, bucket.concurrency) == (delay, burst, concurrency):
+                # Keep the state of an unchanged limit, it is registered again each time a task runs
+                return
+            self.buckets[domain] = TokenBucket(delay, burst, concurrency)
+
+    def get_bucket(self, url):
+        """Returns :class:`TokenBucket` limiting requests to `url` or None if host of `url` is not limited."""
+        if not self.buckets:
+            return None
+        host = urlparse(url).hostname
+        if not host:
+            return None
+        # Look up the host and each of its parent domains
+        labels = host.split('.')
+        for i in xrange(len(labels)):
+            bucket = self.buckets.get('.'.join(labels[i:]))
+            if bucket:
+                return bucket
+
+    @contextmanager
+    def limit(self, url):
+        """Context manager which waits until a request to `url` is allowed, and holds a concurrency slot if needed."""
+        bucket = self.get_bucket(url)
+        if not bucket:
+            yield
+            return
+        wait = bucket.reserve()
+        if wait > 0:
+            log.debug('Waiting %.2f seconds until next request to %s' % (wait, urlparse(url).hostname))
+            # Only the thread doing this request waits, other tasks may continue
+            time.sleep(wait)
+        if bucket.slots:
+            bucket.slots.acquire()
+        try:
+            yield
+        finally:
+            if bucket.slots:
+                bucket.slots.release()
+
+# Rate limits shared by all sessions
+domain_limiter = DomainLimiter()
+
+
 class Session(requests.Session):
     """Subclass of requests Session class which defines some of our own defaults, records unresponsive sites,
     and raises errors by default."""
@@ -58,8 +162,6 @@ class Session(requests.Session):
         kwargs.setdefault('headers', {}).setdefault('Accept-Encoding', ', '.join(('identity', 'compress', 'gzip')))
         requests.Session.__init__(self, **kwargs)
         self.cookiejar = None
-        # Stores min intervals between requests for certain sites
-        self.domain_delay = {}
 
     def add_cookiejar(self, cookiejar):
         """
@@ -70,14 +172,16 @@ class Session(requests.Session):
         for cookie in cookiejar:
             self.cookies.set_cookie(cookie)
 
-    def set_domain_delay(self, domain, delay):
+    def set_domain_delay(self, domain, delay, burst=1, concurrency=None):
         """
-        Registers a minimum interval between requests to `domain`
+        Registers a minimum interval between requests to `domain`. Limits are shared with all other sessions.
 
         :param domain: The domain to set the interval on
         :param delay: The amount of time between requests, can be a timedelta or string like '3 seconds'
+        :param int burst: Amount of requests allowed without delay after the domain has been idle
+        :param int concurrency: Maximum amount of simultaneous requests to domain
         """
-        self.domain_delay[domain] = {'delay': parse_timedelta(delay)}
+        domain_limiter.set_limit(domain, delay, burst=burst, concurrency=concurrency)
 
     def request(self, method, url, *args, **kwargs):
         """
@@ -103,27 +207,15 @@ class Session(requests.Session):
         if is_unresponsive(url):
             raise requests.Timeout('Requests to this site are known to timeout.')
 
-        # Check if we need to add a delay before request to this site
-        for domain, domain_dict in self.domain_delay.iteritems():
-            if domain in url:
-                next_req = domain_dict.get('next_req')
-                if next_req and datetime.now() < next_req:
-                    wait_time = next_req - datetime.now()
-                    seconds = wait_time.seconds + (wait_time.microseconds / 1000000.0)
-                    log.debug('Waiting %.2f seconds until next request to %s' % (seconds, domain))
-                    # Sleep until it is time for the next request
-                    time.sleep(seconds)
-                # Record the next allowable request time for this domain
-                domain_dict['next_req'] = datetime.now() + domain_dict['delay']
-                break
-
         # Pop our custom keyword argument before calling super method
         config = kwargs.pop('config', {})
         config['danger_mode'] = kwargs.pop('raise_status', True)
         kwargs['config'] = config
 
         try:
-            result = requests.Session.request(self, method, url, *args, **kwargs)
+            # Wait if there is a rate limit for this site
+            with domain_limiter.limit(url):
+                result = requests.Session.request(self, method, url, *args, **kwargs)
         except requests.Timeout:
             # Mark this site in known unresponsive list
             set_unresponsive(url)
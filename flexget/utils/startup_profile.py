@@ -0,0 +1,136 @@
+"""Collects time and memory spent in the parts of FlexGet startup, enabled with --profile-startup."""
+
+import os
+import sys
+import time
+import logging
+from contextlib import contextmanager
+
+log = logging.getLogger('startup_profile')
+
+# Number of slowest sections listed in the summary
+SUMMARY_SIZE = 25
+
+
+def memory_usage():
+    """Return resident memory of the process in bytes, or None if it cannot be determined."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak usage is the best available, kilobytes on linux but bytes on mac
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+class StartupProfiler(object):
+    """
+    Records durations and memory growth of named, possibly nested, startup sections.
+
+    Does nothing unless enabled, so sections can be marked in code that also runs without profiling.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = None
+        self.sections = []
+        self._stack = []
+
+    def enable(self, started=None):
+        """
+        :param float started: Time when startup began, if before enabling (eg. time of first flexget import)
+        """
+        self.enabled = True
+        self.started = started or time.time()
+        self.sections = []
+        self._stack = []
+
+    def disable(self):
+        self.enabled = False
+
+    @contextmanager
+    def section(self, name):
+        """Context manager recording the time and memory spent in the block as section :name:"""
+        if not self.enabled:
+            yield
+            return
+        record = {'name': name, 'children': []}
+        (self._stack[-1]['children'] if self._stack else self.sections).append(record)
+        self._stack.append(record)
+        memory = memory_usage()
+        start = time.time()
+        try:
+            yield
+        finally:
+            record['took'] = time.time() - start
+            end_memory = memory_usage()
+            record['memory'] = end_memory - memory if None not in (memory, end_memory) else None
+            self._stack.pop()
+
+    def add(self, name, took, memory=None):
+        """Record an already measured section under the current one."""
+        if not self.enabled:
+            return
+        record = {'name': name, 'took': took, 'memory': memory, 'children': []}
+        (self._stack[-1]['children'] if self._stack else self.sections).append(record)
+
+    def report(self):
+        """Return machine-readable report of the recorded sections."""
+        return {'total': time.time() - self.started,
+                'memory': memory_usage(),
+                'python': sys.version.split()[0],
+                'sections': self.sections}
+
+    def summary(self, report=None):
+        """Return list of summary lines, sections sorted slowest first."""
+        report = report or self.report()
+        flat = []
+
+        def flatten(sections, prefix):
+            for section in sections:
+                path = prefix + section['name']
+                flat.append((section['took'], section['memory'], path))
+                flatten(section['children'], path + ' / ')
+
+        flatten(report['sections'], '')
+        flat.sort(reverse=True)
+        lines = ['Startup took %.2f seconds, resident memory %s' % (report['total'], _format_memory(report['memory']))]
+        for took, memory, path in flat[:SUMMARY_SIZE]:
+            lines.append('%7.3fs %10s  %s' % (took, _format_memory(memory, sign=True), path))
+        if len(flat) > SUMMARY_SIZE:
+            lines.append('... %s more sections in the full report' % (len(flat) - SUMMARY_SIZE))
+        return lines
+
+    def finish(self, path):
+        """Write JSON report into :path:, log the summary and stop profiling."""
+        if not self.enabled:
+            return
+        from flexget.utils import json
+        report = self.report()
+        self.disable()
+        try:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+        except IOError, e:
+            log.error('Failed to write startup profile %s: %s' % (path, e))
+        else:
+            log.info('Startup profile written to %s' % path)
+        for line in self.summary(report):
+            log.info(line)
+
+
+def _format_memory(memory, sign=False):
+    if memory is None:
+        return 'n/a'
+    text = '%.1f MB' % (memory / 1048576.0)
+    if sign and memory >= 0:
+        text = '+' + text
+    return text
+
+
+startup_profiler = StartupProfiler()
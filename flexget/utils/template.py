@@ -2,7 +2,8 @@ import logging
 import os
 import re
 import sys
-from copy import copy
+import threading
+from collections import OrderedDict
 from datetime import datetime, date, time
 import locale
 from email.utils import parsedate
@@ -18,12 +19,82 @@ log = logging.getLogger('utils.template')
 # The environment will be created after the manager has started
 environment = None
 
+# Maximum number of compiled template strings kept in memory
+MAX_CACHED_TEMPLATES = 500
+# Strings which do not contain any of these do not need to be rendered by jinja
+TEMPLATE_MARKUP = ('{{', '{%', '{#')
+
 
 class RenderError(Exception):
     """Error raised when there is a problem with jinja rendering."""
     pass
 
 
+class TemplateCache(object):
+    """Thread safe LRU cache of templates compiled from strings."""
+
+    def __init__(self, max_templates=MAX_CACHED_TEMPLATES):
+        self.max_templates = max_templates
+        self.templates = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, template_string):
+        """Returns compiled template for `template_string`, compiling it if it is not cached."""
+        with self.lock:
+            template = self.templates.pop(template_string, None)
+            if template is not None:
+                # move to the end as most recently used
+                self.templates[template_string] = template
+                return template
+        template = environment.from_string(template_string)
+        with self.lock:
+            self.templates[template_string] = template
+            while len(self.templates) > self.max_templates:
+                self.templates.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self.lock:
+            self.templates.clear()
+
+
+template_cache = TemplateCache()
+
+
+class RenderContext(object):
+    """
+    Read-only mapping of `extra` variables layered over an entry, used as render context instead of a copy of
+    the entry. Lazy fields of the entry are only evaluated when the template uses them.
+    """
+
+    def __init__(self, entry, **extra):
+        self.entry = entry
+        self.extra = extra
+
+    def __contains__(self, key):
+        return key in self.extra or key in self.entry
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        return self.entry[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(set(self.entry.keys()) | set(self.extra))
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+
 def filter_pathbase(val):
     """Base name of a path."""
     return os.path.basename(val or '')
@@ -119,6 +190,8 @@ def make_environment(manager):
     for name, filt in globals().items():
         if name.startswith('filter_'):
             environment.filters[name.split('_', 1)[1]] = filt
+    # Templates compiled by previous environment cannot be used anymore
+    template_cache.clear()
 
 
 # TODO: list_templates function
@@ -142,32 +215,48 @@ def get_template(templatename, pluginname=None):
         raise PluginError('Template not found: %s (%s)' % (templatename, pluginname))
 
 
+def render_plain(text):
+    """
+    Returns `text` as jinja would render it, without compiling a template.
+
+    :return: Rendered text, or None if `text` contains markup (or newlines jinja would normalize) and has to be
+        rendered by jinja.
+    """
+    if '\r' in text or any(markup in text for markup in TEMPLATE_MARKUP):
+        return None
+    # Jinja removes a single trailing newline
+    return text[:-1] if text.endswith('\n') else text
+
+
 def render_from_entry(template_string, entry):
     """Renders a Template or template string with an Entry as its context."""
 
-    # If a plain string was passed, turn it into a Template
+    result = None
     if isinstance(template_string, basestring):
+        result = render_plain(template_string)
+    if result is None:
+        # If a plain string was passed, turn it into a Template
+        if isinstance(template_string, basestring):
+            try:
+                template = template_cache.get(template_string)
+            except TemplateSyntaxError, e:
+                raise PluginError('Error in template syntax: ' + e.message)
+        else:
+            # We can also support an actual Template being passed in
+            template = template_string
+        # Add some more fields on top of the Entry without copying it
+        variables = RenderContext(entry, now=datetime.now())
+        # We use the lower level render function, so that our Entry is not cast into a dict (and lazy loading lost)
         try:
-            template = environment.from_string(template_string)
-        except TemplateSyntaxError, e:
-            raise PluginError('Error in template syntax: ' + e.message)
-    else:
-        # We can also support an actual Template being passed in
-        template = template_string
-    # Make a copy of the Entry so we can add some more fields
-    variables = copy(entry)
-    variables['now'] = datetime.now()
-    # We use the lower level render function, so that our Entry is not cast into a dict (and lazy loading lost)
-    try:
-        result = u''.join(template.root_render_func(template.new_context(variables, shared=True)))
-    except:
-        exc_info = sys.exc_info()
-        try:
-            return environment.handle_exception(exc_info, True)
-        except Exception, e:
-            error = RenderError('(%s) %s' % (type(e).__name__, e))
-            log.debug('Error during rendering: %s' % error)
-            raise error
+            result = u''.join(template.root_render_func(template.new_context(variables, shared=True)))
+        except:
+            exc_info = sys.exc_info()
+            try:
+                return environment.handle_exception(exc_info, True)
+            except Exception, e:
+                error = RenderError('(%s) %s' % (type(e).__name__, e))
+                log.debug('Error during rendering: %s' % error)
+                raise error
 
     # Only try string replacement if jinja didn't do anything
     if result == template_string:
@@ -192,7 +281,10 @@ def render_from_task(template, task):
     :return: The rendered template text.
     """
     if isinstance(template, basestring):
-        template = environment.from_string(template)
+        result = render_plain(template)
+        if result is not None:
+            return unicode(result)
+        template = template_cache.get(template)
     try:
         result = template.render({'task': task})
     except Exception, e:
@@ -1,4 +1,4 @@
 # make importing these a bit less hassle
-from flexget.utils.titles.series import SeriesParser, ID_TYPES
+from flexget.utils.titles.series import SeriesParser, SeriesIndex, ID_TYPES
 from flexget.utils.titles.movie import MovieParser
 from flexget.utils.titles.parser import TitleParser, ParseWarning
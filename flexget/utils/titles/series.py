@@ -573,3 +573,80 @@ class SeriesParser(TitleParser):
 
     def __eq__(self, other):
         return self is other
+
+
+class SeriesIndex(object):
+
+    """
+    Index of series names used to find the series a title could belong to without parsing it once per series.
+
+    Titles are scanned once and only the returned candidates need a full :class:`SeriesParser` parse.
+    The index never leaves out a series the parser would match, but it may return series that will not parse.
+    """
+
+    # These mirror the name regexp built by SeriesParser.name_to_re
+    blanks_re = re.compile(r'(?:[^\w&]|_)*', re.UNICODE)
+    word_re = re.compile(r'(?:[^\W_]|&)+', re.UNICODE)
+    prefix_res = [re.compile(prefix, re.IGNORECASE | re.UNICODE) for prefix in SeriesParser.ignore_prefixes]
+
+    def __init__(self):
+        # lowercase first word of name -> list of series names
+        self.words = {}
+        self.longest_word = 0
+        # series name -> ReList of custom name regexps
+        self.regexps = {}
+        # series which cannot be indexed, these are candidates for everything
+        self.unindexed = []
+
+    def add(self, name, name_regexps=None):
+        """
+        Add series to the index.
+
+        :param string name: Series name.
+        :param list name_regexps: Custom name regexps, if given these are used instead of the name.
+        """
+        if name_regexps:
+            self.regexps[name] = ReList(name_regexps)
+            return
+        word = self.first_word(name)
+        if not word:
+            self.unindexed.append(name)
+            return
+        self.words.setdefault(word, []).append(name)
+        self.longest_word = max(self.longest_word, len(word))
+
+    def first_word(self, name):
+        """Return lowercase first word the name regexp of series `name` must start with, or None."""
+        if name.endswith(')'):
+            p_start = name.rfind('(')
+            if p_start != -1:
+                name = name[:p_start - 1]
+        match = self.word_re.search(name)
+        if match:
+            return match.group(0).lower()
+
+    def find(self, data):
+        """Return set of series names which may match `data`."""
+        if isinstance(data, str):
+            data = unicode(data)
+        found = set(self.unindexed)
+        if self.words:
+            starts = [data]
+            for prefix_re in self.prefix_res:
+                match = prefix_re.match(data)
+                if match:
+                    starts.append(data[match.end():])
+            for start in starts:
+                start = start[self.blanks_re.match(start).end():]
+                match = self.word_re.match(start)
+                if not match:
+                    continue
+                word = match.group(0)[:self.longest_word].lower()
+                for end in xrange(1, len(word) + 1):
+                    found.update(self.words.get(word[:end], []))
+        for name, name_regexps in self.regexps.iteritems():
+            for name_re in name_regexps:
+                if name_re.search(data):
+                    found.add(name)
+                    break
+        return found
@@ -7,6 +7,8 @@ from urlparse import urlparse
 import time
 from htmlentitydefs import name2codepoint
 import re
+import sre_parse
+import sre_constants
 from datetime import timedelta
 
 
@@ -321,6 +323,113 @@ class ReList(list):
             yield self[i]
 
 
+def _fixed_string(seq):
+    """Returns the string parsed regexp `seq` matches, or None if it can match anything else."""
+    result = ''
+    for op, av in seq:
+        if op == sre_constants.LITERAL:
+            result += unichr(av)
+        elif op == sre_constants.SUBPATTERN and _fixed_string(av[1]) is not None:
+            result += _fixed_string(av[1])
+        else:
+            return None
+    return result
+
+
+def _required_strings(seq):
+    candidates = []
+    current = set([u''])
+    for op, av in seq:
+        if op == sre_constants.LITERAL:
+            current = set(s + unichr(av).lower() for s in current)
+            continue
+        fixed = None
+        if op == sre_constants.SUBPATTERN:
+            fixed = _fixed_string(av[1])
+        elif op == sre_constants.BRANCH:
+            fixed = [_fixed_string(alternative) for alternative in av[1]]
+            if None in fixed or len(fixed) * len(current) > 10:
+                fixed = None
+        if fixed is not None:
+            if isinstance(fixed, basestring):
+                fixed = [fixed]
+            current = set(s + f.lower() for s in current for f in fixed)
+            continue
+        # Run of fixed strings ends here, look for required strings inside the element
+        candidates.append(current)
+        current = set([u''])
+        if op == sre_constants.SUBPATTERN:
+            candidates.append(_required_strings(av[1]))
+        elif op == sre_constants.BRANCH:
+            alternatives = [_required_strings(alternative) for alternative in av[1]]
+            if None not in alternatives:
+                candidates.append(set.union(*alternatives))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] > 0:
+            candidates.append(_required_strings(av[2]))
+    candidates.append(current)
+    candidates = [c for c in candidates if c and u'' not in c]
+    if not candidates:
+        return None
+    # Longest strings give the best chance of ruling out a match
+    return max(candidates, key=lambda c: (min(len(s) for s in c), -len(c)))
+
+
+def regexp_required_strings(pattern):
+    """
+    Finds strings of which at least one is contained in every match of regexp `pattern`, when both are lowercased.
+
+    Checking these with `in` is much faster than running the regexp, and rules out most texts that cannot match.
+
+    :param pattern: Regexp string or compiled regexp
+    :return: Set of lowercase strings, or None if none could be determined
+    """
+    if not isinstance(pattern, basestring):
+        pattern = pattern.pattern
+    try:
+        return _required_strings(sre_parse.parse(pattern))
+    except (sre_constants.error, ValueError, OverflowError):
+        return None
+
+
+class RegexpIndex(object):
+    """
+    Finds which of many regexps may match a text without running all of them.
+
+    Regexps are indexed by the first three characters of their required strings, see
+    :func:`regexp_required_strings`. Regexps without long enough required strings are always candidates.
+    """
+
+    def __init__(self, regexps):
+        """
+        :param regexps: List of regexps, strings or compiled
+        """
+        self.index = {}
+        self.unindexed = []
+        for position, regexp in enumerate(regexps):
+            required = regexp_required_strings(regexp)
+            if not required or min(len(s) for s in required) < 3:
+                self.unindexed.append(position)
+                continue
+            for string in required:
+                self.index.setdefault(string[:3], []).append((position, string))
+
+    def candidates(self, text):
+        """Returns set of positions of regexps which may match `text`."""
+        result = set(self.unindexed)
+        text = text.lower()
+        for i in xrange(len(text) - 2):
+            for position, string in self.index.get(text[i:i + 3], ()):
+                if position not in result and string in text:
+                    result.add(position)
+        return result
+
+
+def chunked(seq, size=900):
+    """Divide sequence into chunks of `size`, default is small enough for sqlite to handle in a query. (<1000)"""
+    for i in xrange(0, len(seq), size):
+        yield seq[i:i + size]
+
+
 def console(text):
     """Print to console safely."""
     if isinstance(text, str):
@@ -11,6 +11,8 @@ class Errors(object):
         self.messages = []
         self.path = []
         self.path_level = None
+        # Set when result of validation depends on something else than the data, eg. existing files
+        self.volatile = False
 
     def count(self):
         """Return number of errors."""
@@ -442,6 +444,7 @@ class FileValidator(TextValidator):
     def validate(self, data):
         import os
 
+        self.errors.volatile = True
         if not os.path.isfile(os.path.expanduser(data)):
             self.errors.add('File %s does not exist' % data)
             return False
@@ -483,6 +486,8 @@ class PathValidator(TextValidator):
             if result:
                 path = os.path.dirname(data[0:result.start()])
 
+        if not self.allow_missing:
+            self.errors.volatile = True
         if not self.allow_missing and not os.path.isdir(os.path.expanduser(path)):
             self.errors.add('Path %s does not exist' % path)
             return False
@@ -0,0 +1,106 @@
+from tests import FlexGetBase
+from flexget.manager import Session
+
+
+class TestArchive(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'entry 1', url: 'http://localhost/1', description: 'first'}
+              - {title: 'entry 2', url: 'http://localhost/2'}
+              - {title: 'entry 2', url: 'http://localhost/2'}
+            accept_all: yes
+            archive: [tag1, tag2]
+          test2:
+            mock:
+              - {title: 'entry 1', url: 'http://localhost/1'}
+              - {title: 'entry 3', url: 'http://localhost/3'}
+            archive: [tag1]
+    """
+
+    def test_archive(self):
+        from flexget.plugins.generic.archive import ArchiveEntry
+        self.execute_task('test')
+        self.execute_task('test')
+        self.execute_task('test2')
+        session = Session()
+        try:
+            entries = dict((ae.title, ae) for ae in session.query(ArchiveEntry).all())
+            assert sorted(entries) == ['entry 1', 'entry 2', 'entry 3'], 'duplicates should not be archived'
+            assert entries['entry 1'].description == 'first'
+            assert sorted(s.name for s in entries['entry 1'].sources) == ['test', 'test2']
+            assert sorted(t.name for t in entries['entry 1'].tags) == ['tag1', 'tag2']
+            assert [s.name for s in entries['entry 2'].sources] == ['test']
+            assert [t.name for t in entries['entry 3'].tags] == ['tag1']
+        finally:
+            session.close()
+
+
+class TestArchiveSearch(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'Some.Show.S01E01.720p', url: 'http://localhost/1'}
+              - {title: 'Other.Show.S01E01', url: 'http://localhost/2', description: 'some extra'}
+              - {title: 'Unrelated', url: 'http://localhost/3'}
+            archive: [tag1]
+          test2:
+            mock:
+              - {title: 'Some.Show.S01E02', url: 'http://localhost/4'}
+            archive: yes
+    """
+
+    def search(self, text, **kwargs):
+        from flexget.plugins.generic.archive import search
+        session = Session()
+        try:
+            return [ae.title for ae in search(session, text, **kwargs)]
+        finally:
+            session.close()
+
+    def test_search(self):
+        from flexget.plugins.generic import archive
+        self.execute_task('test')
+        self.execute_task('test2')
+        assert archive.search_index, 'sqlite should support full-text search'
+        results = self.search('some show')
+        assert results[:2] == ['Some.Show.S01E01.720p', 'Some.Show.S01E02'], 'title matches should be first'
+        assert results[2:] == ['Other.Show.S01E01'], 'description match should be last'
+        assert self.search('some sho', tags=['tag1']) == ['Some.Show.S01E01.720p', 'Other.Show.S01E01']
+        assert self.search('show', sources=['test2']) == ['Some.Show.S01E02']
+        assert self.search('unrelated') == ['Unrelated']
+
+    def test_like_fallback(self):
+        from flexget.plugins.generic import archive
+        self.execute_task('test')
+        archive.search_index = False
+        try:
+            assert self.search('show.s01') == ['Some.Show.S01E01.720p', 'Other.Show.S01E01']
+        finally:
+            archive.search_index = True
+
+    def test_build_index(self):
+        from flexget.plugins.generic import archive
+        self.execute_task('test')
+        session = Session()
+        try:
+            session.execute('DROP TABLE archive_fts')
+            assert archive.init_search_index(session), 'index should have been created'
+            session.commit()
+        finally:
+            session.close()
+        assert self.search('unrelated') == ['Unrelated'], 'existing entries should have been indexed'
+
+    def test_reset(self):
+        from flexget.schema import reset_schema
+        from flexget.plugins.generic import archive
+        self.execute_task('test')
+        reset_schema('archive')
+        # index is checked on startup
+        archive.setup_search_index(self.manager)
+        self.execute_task('test2')
+        assert self.search('show') == ['Some.Show.S01E02'], 'entries from before the reset should not be found'
@@ -1,6 +1,6 @@
 import os
 from tests import FlexGetBase, with_filecopy
-from flexget.utils.cached_input import cached
+from flexget.utils.cached_input import cached, EntryCache
 from flexget.plugin import register_plugin
 from flexget.entry import Entry
 
@@ -56,3 +56,29 @@ class TestInputCache(FlexGetBase):
         assert self.task.entries, 'should have created entries at the start'
         self.execute_task('test_db')
         assert self.task.entries, 'should have created entries from the cache'
+
+
+class TestEntryCache(object):
+
+    def test_copy_on_write(self):
+        cache = EntryCache()
+        entry = Entry(title='Test', url='http://test.com', tags=['a'])
+        entry.register_lazy_fields(['lazy'], lambda entry, field: entry['title'] + ' lazy')
+        cache.store('test', [entry])
+        entry['title'] = 'Changed'
+        entry['tags'].append('b')
+        restored = cache.get('test')[0]
+        assert restored['title'] == 'Test', 'cached entry should not change with original'
+        assert restored['tags'] == ['a'], 'mutable values should be copied'
+        assert restored['lazy'] == 'Test lazy', 'lazy field should be bound to restored entry'
+        restored['tags'].append('c')
+        assert cache.get('test')[0]['tags'] == ['a'], 'restored entries should not share mutable values'
+
+    def test_lru_eviction(self):
+        cache = EntryCache(max_entries=2)
+        cache.store('first', [Entry(title='1', url='http://1')])
+        cache.store('second', [Entry(title='2', url='http://2')])
+        cache.get('first')
+        cache.store('third', [Entry(title='3', url='http://3')])
+        assert 'second' not in cache, 'least recently used cache should be evicted'
+        assert 'first' in cache and 'third' in cache
@@ -1,4 +1,6 @@
+from nose.tools import raises
 from tests import FlexGetBase
+from flexget.plugins.filter.if_condition import compile_statement
 
 
 class TestCondition(FlexGetBase):
@@ -39,6 +41,13 @@ class TestCondition(FlexGetBase):
                   set:
                     some_field: some value
                   accept_all: yes
+
+          test_many_conditions:
+            if:
+              - missing_field > 1: accept
+              - "year and year > 2005": reject
+              - "has_field('rating') and len(title) > 5 and rating > 9": accept
+              - "title == 'test' and now - timedelta(days=1) < now": accept
     """
 
     def test_reject(self):
@@ -67,6 +76,19 @@ class TestCondition(FlexGetBase):
         assert entry
         assert len(self.task.accepted) == 1
 
+    def test_many_conditions(self):
+        self.execute_task('test_many_conditions')
+        assert self.task.find_entry('accepted', title='brilliant')
+        assert self.task.find_entry('accepted', title='test')
+        assert self.task.find_entry('rejected', title='fresh')
+
+    def test_compile_statement(self):
+        assert compile_statement('year > 2000') is compile_statement('year > 2000'), 'should be cached'
+
+    @raises(ValueError)
+    def test_compile_unsafe_statement(self):
+        compile_statement('title.__class__')
+
 
 class TestQualityCondition(FlexGetBase):
 
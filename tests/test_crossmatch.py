@@ -0,0 +1,66 @@
+from tests import FlexGetBase
+from flexget.entry import Entry
+
+
+class TestCrossmatch(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test_reject:
+            mock:
+              - {title: 'entry 1', url: 'http://localhost/1'}
+              - {title: 'entry 2', url: 'http://localhost/2'}
+              - {title: 'entry 3', url: 'http://localhost/3'}
+            accept_all: yes
+            crossmatch:
+              from:
+                - mock:
+                    - {title: 'other', url: 'http://localhost/1'}
+                    - {title: 'entry 2', url: 'http://localhost/other'}
+              fields: [title, url]
+              action: reject
+          test_accept:
+            mock:
+              - {title: 'entry 1', imdb_id: 'tt0000001'}
+              - {title: 'entry 2', imdb_id: 'tt0000002'}
+              - {title: 'entry 3'}
+              - {title: 'entry 4', tags: [a, b]}
+            crossmatch:
+              from:
+                - mock:
+                    - {title: 'other 2', imdb_id: 'tt0000002'}
+                    - {title: 'other 3'}
+                    - {title: 'other 4', tags: [a, b]}
+              fields: [imdb_id, tags]
+              action: accept
+    """
+
+    def test_reject(self):
+        self.execute_task('test_reject')
+        assert self.task.find_entry('rejected', title='entry 1'), 'entry 1 intersects on url'
+        assert self.task.find_entry('rejected', title='entry 2'), 'entry 2 intersects on title'
+        assert self.task.find_entry('accepted', title='entry 3'), 'entry 3 should not be rejected'
+        entry = self.task.find_entry('rejected', title='entry 1')
+        assert entry['reason'] == 'intersects with other on field(s) url'
+
+    def test_accept(self):
+        self.execute_task('test_accept')
+        assert self.task.find_entry('accepted', title='entry 2'), 'entry 2 intersects on imdb_id'
+        assert self.task.find_entry('accepted', title='entry 4'), 'entry 4 intersects on unhashable tags'
+        assert not self.task.find_entry('accepted', title='entry 1')
+        assert not self.task.find_entry('accepted', title='entry 3'), 'missing fields should not intersect'
+
+    def test_lazy_fields(self):
+        from flexget.plugins.filter.crossmatch import CrossMatch
+        calls = []
+
+        def lazy_loader(entry, field):
+            calls.append(field)
+            return 'value'
+
+        entry = Entry('entry', 'http://localhost/')
+        entry.register_lazy_fields(['imdb_id'], lazy_loader)
+        crossmatch = CrossMatch()
+        index = crossmatch.build_index([Entry('other', 'http://localhost/other')], ['imdb_id', 'title'])
+        assert not crossmatch.find_intersecting(entry, index, ['imdb_id', 'title'])
+        assert not calls, 'field missing from all input entries should not have been evaluated'
@@ -0,0 +1,39 @@
+from tests import FlexGetBase
+from flexget.utils.requests import DomainLimiter, domain_limiter
+
+
+class TestDomainDelay(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'entry 1'}
+            domain_delay:
+              simple.test: 3 seconds
+              advanced.test:
+                delay: 1 seconds
+                burst: 2
+                concurrency: 1
+    """
+
+    def test_register(self):
+        self.execute_task('test')
+        bucket = domain_limiter.get_bucket('http://www.simple.test/feed')
+        assert bucket, 'subdomains should be limited'
+        assert bucket.delay == 3 and bucket.burst == 1
+        bucket = domain_limiter.get_bucket('http://advanced.test/feed')
+        assert bucket.burst == 2 and bucket.concurrency == 1
+        assert not domain_limiter.get_bucket('http://other.test/feed')
+
+
+class TestDomainLimiter(object):
+
+    def test_burst(self):
+        limiter = DomainLimiter()
+        limiter.set_limit('example.com', '10 seconds', burst=2)
+        bucket = limiter.get_bucket('http://example.com')
+        waits = [bucket.reserve() for i in range(4)]
+        assert waits[:2] == [0, 0], 'burst requests should not wait'
+        # Waiting requests are queued one interval apart
+        assert 9 < waits[2] <= 10 and 19 < waits[3] <= 20, waits
@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from tests import FlexGetBase
+
+
+class TestHostScheduler(object):
+
+    def test_per_host(self):
+        # Imported here, importing plugins before they are loaded would lose their parser options
+        from flexget.plugins.output.download import HostScheduler
+        scheduler = HostScheduler([('a', 1), ('a', 2), ('b', 3)], per_host=1)
+        assert scheduler.take() == ('a', 1)
+        assert scheduler.take() == ('b', 3), 'job of a busy host should be skipped'
+        taken = []
+        thread = threading.Thread(target=lambda: taken.append(scheduler.take()))
+        thread.start()
+        time.sleep(0.05)
+        assert not taken, 'should wait until host a is done'
+        scheduler.done('a')
+        thread.join(1)
+        assert taken == [('a', 2)]
+        assert scheduler.take() is None
+
+
+class TestDownload(FlexGetBase):
+
+    __tmp__ = True
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'file 1', url: 'file://__tmp__src/1.dat', filename: '1.dat'}
+              - {title: 'file 2', url: 'file://__tmp__src/2.dat', filename: '2.dat'}
+              - {title: 'file 3', url: 'file://__tmp__src/missing.dat'}
+              - title: 'file 4'
+                url: 'file://__tmp__src/missing.dat'
+                urls: ['file://__tmp__src/missing.dat', 'file://__tmp__src/4.dat']
+                filename: '4.dat'
+            accept_all: yes
+            disable_builtins: yes
+            download:
+              path: __tmp__dst
+              fail_html: no
+    """
+
+    def setup(self):
+        FlexGetBase.setup(self)
+        os.mkdir(os.path.join(self.__tmp__, 'src'))
+        os.mkdir(os.path.join(self.__tmp__, 'dst'))
+        for name in ['1.dat', '2.dat', '4.dat']:
+            with open(os.path.join(self.__tmp__, 'src', name), 'w') as f:
+                f.write('content of %s' % name)
+
+    def teardown(self):
+        FlexGetBase.teardown(self)
+        temp_dir = os.path.join(self.manager.config_base, 'temp')
+        if os.path.isdir(temp_dir) and not os.listdir(temp_dir):
+            os.rmdir(temp_dir)
+
+    def test_download(self):
+        self.execute_task('test')
+        assert self.task.find_entry('failed', title='file 3'), 'missing file should have failed'
+        for name in ['1', '2', '4']:
+            entry = self.task.find_entry('accepted', title='file %s' % name)
+            assert entry, 'file %s should have been downloaded' % name
+            with open(entry['output']) as f:
+                assert f.read() == 'content of %s.dat' % name
+        assert self.task.find_entry(title='file 4')['url'].endswith('4.dat'), 'fallback url should be used'
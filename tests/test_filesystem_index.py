@@ -0,0 +1,56 @@
+import os
+import shutil
+import time
+from tests import FlexGetBase
+from flexget.manager import Session
+from flexget.utils.filesystem_index import walk, IndexedDirectory
+
+
+class TestFilesystemIndex(FlexGetBase):
+
+    __tmp__ = True
+    __yaml__ = """
+        tasks: {}
+    """
+
+    def setup(self):
+        FlexGetBase.setup(self)
+        self.root = os.path.join(self.__tmp__, 'library')
+        os.makedirs(os.path.join(self.root, 'Show', 'Season 1'))
+        for name in ['Show.S01E01.avi', 'Show.S01E02.avi']:
+            open(os.path.join(self.root, 'Show', 'Season 1', name), 'w').close()
+        self.past = time.time() - 3600
+        for path in [self.root, os.path.join(self.root, 'Show'), os.path.join(self.root, 'Show', 'Season 1')]:
+            os.utime(path, (self.past, self.past))
+        self.session = Session()
+
+    def teardown(self):
+        self.session.close()
+        FlexGetBase.teardown(self)
+
+    def walk(self):
+        result = dict((os.path.relpath(root, self.root), (sorted(dirs), sorted(files)))
+                      for root, dirs, files in walk(self.root, self.session))
+        self.session.commit()
+        return result
+
+    def test_walk(self):
+        expected = dict((os.path.relpath(root, self.root), (sorted(dirs), sorted(files)))
+                        for root, dirs, files in os.walk(self.root))
+        assert self.walk() == expected
+        assert self.session.query(IndexedDirectory).count() == 3
+
+    def test_mtime(self):
+        season = os.path.join(self.root, 'Show', 'Season 1')
+        self.walk()
+        open(os.path.join(season, 'Show.S01E03.avi'), 'w').close()
+        os.utime(season, (self.past, self.past))
+        assert 'Show.S01E03.avi' not in self.walk()['Show/Season 1'][1], 'unchanged directory should not be listed'
+        os.utime(season, (self.past + 60, self.past + 60))
+        assert 'Show.S01E03.avi' in self.walk()['Show/Season 1'][1], 'changed directory should be listed again'
+
+    def test_removed(self):
+        self.walk()
+        shutil.rmtree(os.path.join(self.root, 'Show'))
+        assert self.walk() == {'.': ([], [])}
+        assert self.session.query(IndexedDirectory).count() == 1, 'removed directories should leave the index'
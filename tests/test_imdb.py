@@ -230,3 +230,53 @@ class TestImdbLookup(FlexGetBase):
         assert self.task.entries[0]['imdb_score'], 'didn\'t get score'
         assert self.task.entries[0]['imdb_year'], 'didn\'t get year'
         assert self.task.entries[0]['imdb_plot_outline'], 'didn\'t get plot'
+
+
+class TestImdbCached(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'Movie A', imdb_url: 'http://www.imdb.com/title/tt0000001/'}
+              - {title: 'Movie B', imdb_id: 'tt0000002'}
+              - {title: 'Movie C'}
+            imdb:
+              min_score: 6
+          lazy:
+            mock:
+              - {title: 'Movie A', imdb_url: 'http://www.imdb.com/title/tt0000001/'}
+              - {title: 'Movie C'}
+            imdb_lookup: yes
+            seen_movies: strict
+    """
+
+    def setup(self):
+        FlexGetBase.setup(self)
+        from datetime import datetime
+        from flexget.manager import Session
+        from flexget.plugins.metainfo.imdb_lookup import Movie, SearchResult
+        session = Session()
+        for imdb_id, title, score in [('tt0000001', u'Movie A', 7.0), ('tt0000002', u'Movie B', 5.0),
+                                      ('tt0000003', u'Movie C', 8.0)]:
+            movie = Movie()
+            movie.url = 'http://www.imdb.com/title/%s/' % imdb_id
+            movie.title = title
+            movie.score = score
+            movie.year = datetime.now().year
+            movie.updated = datetime.now()
+            session.add(movie)
+        session.add(SearchResult(u'Movie C', 'http://www.imdb.com/title/tt0000003/'))
+        session.commit()
+
+    def test_cached_lookup(self):
+        """Cached movies should be looked up for all entries without going online"""
+        self.execute_task('test')
+        assert self.task.find_entry('accepted', title='Movie A', imdb_score=7.0)
+        assert self.task.find_entry('accepted', title='Movie C', imdb_id='tt0000003')
+        assert not self.task.find_entry('accepted', title='Movie B')
+
+    def test_lazy_batch(self):
+        self.execute_task('lazy')
+        assert not self.task.rejected, 'movie ids should have been found from cache'
+        assert self.task.find_entry('entries', title='Movie C', imdb_name='Movie C')
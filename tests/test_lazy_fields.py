@@ -1,4 +1,4 @@
-from flexget.entry import Entry
+from flexget.entry import Entry, resolve_lazy_fields
 
 
 class TestLazyFields(object):
@@ -38,3 +38,27 @@ class TestLazyFields(object):
         assert entry['a_fail'] == 'b', 'Lookup should have fallen back to b'
         assert 'a_field' not in entry, 'a_field should no longer be in entry after failed lookup'
         assert entry['ab_field'] == 'b', 'ab_field should be `b`'
+
+    def test_batch_resolve(self):
+        """Tests that batch function gets all entries at once and single lookups still work"""
+        calls = []
+
+        def lazy_single(entry, field):
+            calls.append(('single', entry['title']))
+            entry['a_field'] = 'single'
+            return entry[field]
+
+        def lazy_batch(entries, field):
+            calls.append(('batch', [entry['title'] for entry in entries]))
+            for entry in entries[:2]:
+                entry['a_field'] = 'batch'
+
+        entries = [Entry(title='entry %s' % i, url='') for i in range(3)]
+        for entry in entries:
+            entry.register_lazy_fields(['a_field'], lazy_single, lazy_batch)
+        entries.append(Entry(title='populated', url='', a_field='value'))
+
+        resolve_lazy_fields(entries, ['a_field'])
+        assert calls == [('batch', ['entry 0', 'entry 1', 'entry 2'])], 'batch should get only pending entries'
+        assert [entry['a_field'] for entry in entries] == ['batch', 'batch', 'single', 'value']
+        assert calls[1:] == [('single', 'entry 2')], 'unresolved field should fall back to single lookup'
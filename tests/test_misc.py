@@ -1,9 +1,35 @@
 import os
 import stat
+import threading
 from tests import FlexGetBase
 from nose.plugins.attrib import attr
 from nose.tools import raises
 from flexget.entry import EntryUnicodeError, Entry
+from flexget.plugin import register_plugin, priority
+
+
+class ConcurrencyProbe(object):
+    """Waits in input until the configured task has started, so that phases of two tasks interleave."""
+
+    started = {}
+    metainfo_order = {}
+
+    def validator(self):
+        from flexget import validator
+        return validator.factory('text')
+
+    @priority(-255)
+    def on_task_start(self, task, config):
+        self.started[task.name].set()
+
+    def on_task_input(self, task, config):
+        self.started[config].wait(10)
+        return []
+
+    def on_task_metainfo(self, task, config):
+        self.metainfo_order[task.name] = [p.name for p in task.plugins('metainfo')]
+
+register_plugin(ConcurrencyProbe, 'concurrency_probe', api_ver=2)
 
 
 class TestDisableBuiltins(FlexGetBase):
@@ -159,6 +185,42 @@ class TestEntryUnicodeError(object):
         e = Entry('title', 'url')
         e['invalid'] = '\x8e'
 
+    @raises(EntryUnicodeError)
+    def test_encoding_dict(self):
+        Entry({'title': 'title', 'url': 'url', 'invalid': '\x8e'})
+
+
+class TestEntry(object):
+
+    def test_from_dict(self):
+        entry = Entry({'title': 'title', 'url': 'http://localhost/',
+                       'imdb_url': 'http://imdb.com/title/tt0409459/', 'other': 'value'})
+        assert entry == Entry('title', 'http://localhost/')
+        assert entry['original_url'] == 'http://localhost/'
+        assert entry['imdb_url'] == 'http://www.imdb.com/title/tt0409459/'
+        assert type(entry['other']) == unicode
+
+    def test_update_keeps_lazy_fields(self):
+        calls = []
+
+        def lazy_loader(entry, field):
+            calls.append(field)
+            return 'value'
+
+        entry = Entry('title', 'http://localhost/')
+        entry.register_lazy_fields(['lazy'], lazy_loader)
+        copied = Entry(entry)
+        assert not calls, 'lazy field should not have been evaluated'
+        assert copied['lazy'] == 'value'
+
+    def test_trace_and_snapshots(self):
+        entry = Entry('title', 'http://localhost/')
+        assert entry._trace is None and entry._snapshots is None
+        entry.trace.append((None, 'message'))
+        entry.take_snapshot('test')
+        assert entry.trace == [(None, 'message')]
+        assert entry.snapshots['test']['title'] == 'title'
+
 
 class TestFilterRequireField(FlexGetBase):
 
@@ -257,3 +319,194 @@ class TestSetPlugin(FlexGetBase):
         assert 'field' not in entry,\
                 '`field` should not have been created when jinja rendering fails'
         assert entry['otherfield'] == 'no series'
+
+
+class ConcurrentTestBase(FlexGetBase):
+    """Uses a database file, which allows tasks to execute concurrently."""
+
+    def setup(self):
+        import tempfile
+        # each worker thread gets its own connection, so in-memory database cannot be used
+        self.db_dir = tempfile.mkdtemp()
+        self.database_uri = 'sqlite:///%s' % os.path.join(self.db_dir, 'test.sqlite')
+        super(ConcurrentTestBase, self).setup()
+
+    def teardown(self):
+        import shutil
+        try:
+            super(ConcurrentTestBase, self).teardown()
+        finally:
+            self.manager.options.max_workers = 1
+            self.manager.options.prefetch_inputs = 0
+            shutil.rmtree(self.db_dir)
+
+
+class TestConcurrentExecution(ConcurrentTestBase):
+
+    __yaml__ = """
+        presets:
+          global:
+            accept_all: yes
+        tasks:
+          test1:
+            mock:
+              - {title: 'entry 1'}
+          test2:
+            mock:
+              - {title: 'entry 2'}
+          test3:
+            priority: 1
+            mock:
+              - {title: 'entry 3'}
+          test_headers:
+            mock:
+              - {title: 'entry 4'}
+            headers:
+              user-agent: test
+    """
+
+    def record_pools(self):
+        """Returns list which collects task names of each group executed in a worker pool."""
+        pools = []
+        run_in_pool = self.manager._run_in_pool
+
+        def record(groups, max_workers, func):
+            pools.extend(sorted(task.name for task in group) for group in groups)
+            return run_in_pool(groups, max_workers, func)
+
+        self.manager._run_in_pool = record
+        return pools
+
+    def test_max_workers(self):
+        self.manager.options.max_workers = 3
+        self.manager.create_tasks()
+        self.manager.execute()
+        for name in ['test1', 'test2', 'test3']:
+            task = self.manager.tasks[name]
+            assert not task.aborted, 'task %s aborted' % name
+            assert len(task.accepted) == 1, 'task %s did not accept its entry' % name
+
+    def test_exclusive(self):
+        self.manager.options.max_workers = 3
+        self.manager.create_tasks()
+        pools = self.record_pools()
+        self.manager.execute()
+        assert pools == [['test3'], ['test1', 'test2'], ['test_headers']], \
+            'task using headers should have been executed alone'
+        assert len(self.manager.tasks['test_headers'].accepted) == 1
+
+    def test_prefetch_inputs(self):
+        self.manager.options.prefetch_inputs = 3
+        self.manager.create_tasks()
+        self.manager.execute()
+        for name in ['test1', 'test2', 'test3']:
+            task = self.manager.tasks[name]
+            assert not task.aborted, 'task %s aborted' % name
+            assert len(task.accepted) == 1, 'task %s did not accept its entry' % name
+            assert not task._prefetched, 'task %s was left prefetched' % name
+
+    def test_prefetch_exclusive(self):
+        self.manager.options.prefetch_inputs = 3
+        self.manager.create_tasks()
+        pools = self.record_pools()
+        self.manager.execute()
+        assert pools == [['test1', 'test2', 'test3']], 'task using headers should not have been prefetched'
+        assert len(self.manager.tasks['test_headers'].accepted) == 1
+
+
+class TestEntryContainer(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'entry 1'}
+              - {title: 'entry 2'}
+              - {title: 'entry 3'}
+              - {title: 'entry 4'}
+            disable_builtins: true
+    """
+
+    def test_state_views(self):
+        self.execute_task('test')
+        task = self.task
+        entries = list(task.all_entries)
+        assert len(task.entries) == 4 and len(task.all_entries.undecided) == 4
+        entries[2].accept()
+        entries[0].accept()
+        entries[1].reject()
+        assert [e['title'] for e in task.accepted] == ['entry 1', 'entry 3'], 'accepted should keep entry order'
+        assert [e['title'] for e in task.entries] == ['entry 1', 'entry 3', 'entry 4']
+        assert len(task.rejected) == 1 and task.rejected[0] is entries[1]
+        assert not task.failed
+        assert [e['title'] for e in task.undecided] == ['entry 4']
+        entries[2].reject()
+        assert task.accepted[:] == [entries[0]]
+        assert [e['title'] for e in task.rejected] == ['entry 2', 'entry 3']
+
+    def test_modify_list(self):
+        self.execute_task('test')
+        task = self.task
+        task.all_entries[0].accept()
+        task.all_entries.sort(key=lambda e: e['title'], reverse=True)
+        assert [e['title'] for e in task.undecided] == ['entry 4', 'entry 3', 'entry 2']
+        del task.all_entries[0]
+        task.all_entries.append(Entry(title='entry 5', url='http://localhost/5'))
+        assert [e['title'] for e in task.entries] == ['entry 3', 'entry 2', 'entry 1', 'entry 5']
+        task.all_entries[:] = []
+        assert len(task.entries) == 0
+
+
+class TestConcurrentPluginState(ConcurrentTestBase):
+
+    __yaml__ = """
+        tasks:
+          task_a:
+            mock:
+              - {title: 'entry a'}
+            concurrency_probe: task_b
+            manipulate:
+              - a_field:
+                  from: title
+            plugin_priority:
+              manipulate: 10
+          task_b:
+            mock:
+              - {title: 'entry b'}
+            concurrency_probe: task_a
+            manipulate:
+              - b_field:
+                  from: title
+            plugin_priority:
+              manipulate: 200
+    """
+
+    def setup(self):
+        super(TestConcurrentPluginState, self).setup()
+        ConcurrencyProbe.started = {'task_a': threading.Event(), 'task_b': threading.Event()}
+        ConcurrencyProbe.metainfo_order = {}
+
+    def check_tasks(self):
+        from flexget.plugin import get_plugin_by_name
+        entry = self.manager.tasks['task_a'].find_entry(title='entry a')
+        assert entry.get('a_field') == 'entry a' and 'b_field' not in entry, 'task_a used manipulate jobs of task_b'
+        entry = self.manager.tasks['task_b'].find_entry(title='entry b')
+        assert entry.get('b_field') == 'entry b' and 'a_field' not in entry, 'task_b used manipulate jobs of task_a'
+        order = ConcurrencyProbe.metainfo_order['task_a']
+        assert order.index('manipulate') > order.index('concurrency_probe'), 'task_a used priorities of task_b'
+        order = ConcurrencyProbe.metainfo_order['task_b']
+        assert order.index('manipulate') < order.index('concurrency_probe'), 'task_b used priorities of task_a'
+        assert get_plugin_by_name('manipulate').phase_handlers['metainfo'].priority == 255, \
+            'global plugin priority was changed'
+
+    def test_max_workers(self):
+        self.manager.options.max_workers = 2
+        self.manager.create_tasks()
+        self.manager.execute()
+        self.check_tasks()
+
+    def test_prefetch_inputs(self):
+        self.manager.options.prefetch_inputs = 2
+        self.manager.create_tasks()
+        self.manager.execute()
+        self.check_tasks()
@@ -1,5 +1,8 @@
 import os
+import sys
 import glob
+import shutil
+import tempfile
 from tests import FlexGetBase
 from flexget import plugin, plugins
 from nose.tools import raises
@@ -50,3 +53,80 @@ class TestPluginApi(object):
         assert 'test_plugin' in plugin.plugins
         assert 'oneword' in plugin.plugins
         assert 'test_html' in plugin.plugins
+
+
+class TestPluginManifest(object):
+
+    def setup(self):
+        from flexget.options import CoreArgumentParser
+        plugin.load_plugins(CoreArgumentParser())
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_manifest(self):
+        path = os.path.join(self.tmpdir, 'manifest.json')
+        modules = [name for name in plugin._loaded_plugins if name in plugin._module_info]
+        plugin.write_plugin_manifest(path, modules)
+        manifest = plugin.read_plugin_manifest(path, modules)
+        assert manifest is not None, 'manifest should be up to date'
+        info = manifest['flexget.plugins.filter.accept_all']
+        assert not info['eager']
+        assert 'filter' in info['plugins']['accept_all']['phases']
+        assert manifest['flexget.plugins.plugin_preset']['eager'], 'module registering config key should be eager'
+        assert plugin.read_plugin_manifest(path, modules[1:]) is None, \
+            'manifest should be outdated when plugin modules change'
+
+    def test_lazy_import(self):
+        modulename = 'flexget.plugins.lazy_test_module'
+        with open(os.path.join(self.tmpdir, 'lazy_test_module.py'), 'w') as f:
+            f.write('from flexget.plugin import register_plugin\n'
+                    'class LazyTest(object):\n'
+                    '    def on_task_filter(self, task, config):\n'
+                    '        pass\n'
+                    'register_plugin(LazyTest, \'lazy_test\', groups=[\'lazy\'], api_ver=2)\n')
+        plugins.__path__.append(self.tmpdir)
+        plugin._pending_modules[modulename] = {'eager': False, 'options': [], 'plugins': {
+            'lazy_test': {'phases': {'filter': 128}, 'groups': ['lazy'], 'api_ver': 2, 'builtin': False,
+                          'validator': False}}}
+        plugin._pending_plugins['lazy_test'] = modulename
+        try:
+            assert 'lazy_test' in plugin.get_plugin_keywords()
+            assert 'lazy_test' not in list(plugin.get_loaded_plugins())
+            assert [p.name for p in plugin.get_plugins_by_group('lazy')] == ['lazy_test']
+            assert modulename not in plugin._pending_modules, 'module should have been imported'
+            assert plugin.get_plugin_by_name('lazy_test').phase_handlers.keys() == ['filter']
+        finally:
+            plugins.__path__.remove(self.tmpdir)
+            plugin._pending_modules.pop(modulename, None)
+            plugin._pending_plugins.pop('lazy_test', None)
+            dict.pop(plugin.plugins, 'lazy_test', None)
+            sys.modules.pop(modulename, None)
+
+
+class TestPhasePlan(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'entry 1'}
+            accept_all: yes
+    """
+
+    def test_plan(self):
+        task = self.manager.tasks['test']
+        plan = task._phase_plan()
+        assert 'mock' in [p.name for p in task.plugins('input')]
+        assert task._phase_plan() is plan, 'plan should be reused while nothing changes'
+        task.config['disable_builtins'] = True
+        assert task._phase_plan() is not plan, 'plan should be rebuilt when config changes'
+        plan = task._phase_plan()
+        builtin = (p for p in plugin.plugins.itervalues() if p.builtin).next()
+        builtin.builtin = False
+        try:
+            assert task._phase_plan() is not plan, 'plan should be rebuilt when builtin status changes'
+            assert builtin not in list(task.plugins()), 'disabled builtin should not be listed'
+        finally:
+            builtin.builtin = True
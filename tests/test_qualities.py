@@ -14,6 +14,21 @@ class TestQualityModule(object):
             assert got_val == '720p', got_val
 
 
+    def test_parse_cache(self):
+        first = Quality('Test.File.720p.HDTV.x264-GRP')
+        second = Quality('Test.File.720p.HDTV.x264-GRP')
+        assert first.components == second.components
+        assert first.clean_text == second.clean_text, 'clean text should be restored from cache'
+        second.resolution = Quality('1080p').resolution
+        assert Quality('Test.File.720p.HDTV.x264-GRP').name == '720p hdtv h264', 'cache should not be modified'
+
+    def test_required_strings(self):
+        from flexget.utils.qualities import all_components
+        for component in all_components():
+            assert component.matches('test %s test' % component.name)[0], \
+                'required strings of %s prevent matching its name' % component.name
+
+
 class TestQualityParser(object):
 
     def test_qualities(self):
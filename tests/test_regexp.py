@@ -1,4 +1,5 @@
 from tests import FlexGetBase
+from flexget.utils.tools import RegexpIndex, regexp_required_strings
 
 
 class TestRegexp(FlexGetBase):
@@ -90,6 +91,16 @@ class TestRegexp(FlexGetBase):
                 - genre1
                 - genre2:
                     not: genre3
+
+          test_many:
+            regexp:
+              accept:
+                - nothing here
+                - (?i)REGEXP[2-4]
+                - exp.*9$:
+                    path: '~'
+                - '[rx]egular'
+                - express(ion|o)
     """
 
     def test_accept(self):
@@ -138,3 +149,27 @@ class TestRegexp(FlexGetBase):
         self.execute_task('test_match_in_list')
         assert self.task.find_entry('accepted', title='expression'), '\'expression\' should have been accepted'
         assert self.task.find_entry('entries', title='regular') not in self.task.accepted, '\'regular\' should not have been accepted'
+
+    def test_many(self):
+        self.execute_task('test_many')
+        for title in ['regexp2', 'regexp3', 'regexp4', 'regexp9', 'regular', 'expression']:
+            assert self.task.find_entry('accepted', title=title), '%s should have been accepted' % title
+        assert self.task.find_entry('accepted', title='regexp9', path='~'), 'regexp9 should have custom path'
+        assert len(self.task.accepted) == 6, 'only 6 entries should have been accepted'
+
+
+class TestRegexpIndex(object):
+
+    def test_required_strings(self):
+        assert regexp_required_strings('Foo.*bar') == set(['foo'])
+        assert regexp_required_strings('x(ab|cd)y') == set(['ab', 'cd'])
+        assert regexp_required_strings('[ab]+') is None
+        assert regexp_required_strings('(') is None
+
+    def test_candidates(self):
+        index = RegexpIndex(['foo.*bar', 'ba[rz]', 'Some.Show'])
+        assert index.candidates('FOO and BAR') == set([0, 1])
+        assert index.candidates('some show') == set([1, 2])
+        assert index.candidates('foo') == set([0, 1])
+        assert index.candidates('nothing') == set([1])
+        assert index.candidates('Some.Show.S01E01') == set([1, 2])
@@ -39,7 +39,7 @@ class TestInputRSS(FlexGetBase):
         FlexGetBase.setup(self)
         # reset input cache so that the cache is not used for second execution
         from flexget.utils.cached_input import cached
-        cached.cache = {}
+        cached.cache.clear()
 
     def test_rss(self):
         self.execute_task('test')
@@ -124,8 +124,49 @@ class TestInputRSS(FlexGetBase):
     def test_all_entries_yes(self):
         self.execute_task('test_all_entries_yes')
         assert self.task.entries, 'Entries should have been produced on first run.'
+        first = [(e['title'], e['url']) for e in self.task.entries]
         self.execute_task('test_all_entries_yes')
         assert self.task.entries, 'Entries should have been produced on second run.'
+        assert [(e['title'], e['url']) for e in self.task.entries] == first, \
+            'Unchanged feed should produce same entries from last run'
+
+
+class TestRssStream(object):
+
+    def feed(self, hours):
+        items = ''.join('<item><title>Item %d</title><guid>%d</guid><link>http://localhost/%d</link>'
+                        '<pubDate>Sun, 01 Jan 2012 %02d:00:00 +0000</pubDate></item>' % (h, h, h, h) for h in hours)
+        content = '<?xml version="1.0"?><rss version="2.0"><channel><title>Test</title>%s</channel></rss>' % items
+        return iter([content[i:i + 100] for i in range(0, len(content), 100)])
+
+    def titles(self, content):
+        import feedparser
+        return [entry.title for entry in feedparser.parse(content).entries]
+
+    def test_cutoff(self):
+        from flexget.plugins.input.rss import InputRSS
+        # Location in feed is stored as title followed by guid
+        content = InputRSS().stream_feed(self.feed(range(10, 0, -1)), 'Item 77')
+        assert self.titles(content) == ['Item 10', 'Item 9', 'Item 8'], 'should contain only items newer than mark'
+        content = InputRSS().stream_feed(self.feed(range(10, 0, -1)), 'Item 1010')
+        assert not self.titles(content), 'should not contain any items'
+
+    def test_namespaces(self):
+        import feedparser
+        from flexget.plugins.input.rss import InputRSS
+        items = ''.join('<item><title>Item %d</title><torrent:infoHash>%d</torrent:infoHash></item>' % (h, h)
+                        for h in (3, 2, 1))
+        feed = ('<?xml version="1.0"?><rss version="2.0" xmlns:torrent="http://xmlns.ezrss.it/0.1/"><channel>'
+                '<title>Test</title>%s</channel></rss>' % items)
+        content = InputRSS().stream_feed(iter([feed[:60], feed[60:]]), 'Item 2')
+        entries = feedparser.parse(content).entries
+        assert [entry.title for entry in entries] == ['Item 3']
+        assert entries[0].get('torrent_infohash') == '3', 'namespace prefix should have been kept'
+
+    def test_ascending(self):
+        from flexget.plugins.input.rss import InputRSS
+        content = InputRSS().stream_feed(self.feed(range(1, 11)), 'Item 11')
+        assert len(self.titles(content)) == 10, 'all items should be read when feed is oldest first'
 
 
 class TestRssOnline(FlexGetBase):
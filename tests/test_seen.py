@@ -47,6 +47,23 @@ class TestFilterSeen(FlexGetBase):
             'Item should not have been rejected because of number field'
 
 
+class TestSeenPrefilter(TestFilterSeen):
+
+    def setup(self):
+        super(TestSeenPrefilter, self).setup()
+        self.manager.options.seen_prefilter = True
+
+    def teardown(self):
+        self.manager.options.seen_prefilter = False
+        super(TestSeenPrefilter, self).teardown()
+
+    def test_prefilter(self):
+        from flexget.plugins.filter.seen import prefilter
+        self.execute_task('test')
+        assert u'Seen title 1' in prefilter, 'learned title missing from prefilter'
+        assert u'Seen title 3' not in prefilter, 'prefilter should not contain unseen title'
+
+
 class TestSeenLocal(FlexGetBase):
 
     __yaml__ = """
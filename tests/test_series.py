@@ -200,6 +200,34 @@ class TestDatabase(FlexGetBase):
         self.execute_task('progress_2')
         assert not self.task.accepted, 'doppelgangers accepted'
 
+    def test_store_all(self):
+        """Series plugin: bulk storing releases"""
+        from flexget.manager import Session
+        from flexget.plugins.filter.series import SeriesDatabase, Series
+        from flexget.utils.titles import SeriesParser
+
+        def parse(title):
+            parser = SeriesParser('Progress')
+            parser.parse(title)
+            return parser
+
+        self.execute_task('progress_1')
+        session = Session()
+        try:
+            parsers = [parse('Progress.S01E20.720p-FlexGet'), parse('Progress.S01E21.720p-FlexGet'),
+                       parse('Progress.S01E21.HDTV-FlexGet')]
+            stored = SeriesDatabase().store_all(session, parsers)
+            assert stored[parsers[0]][0].id, 'existing release should have been returned'
+            assert any(release.downloaded for release in stored[parsers[0]][0].episode.releases), \
+                'should have loaded downloaded release'
+            assert stored[parsers[1]][0].episode is stored[parsers[2]][0].episode, 'should create episode once'
+            assert stored[parsers[1]][0] is not stored[parsers[2]][0], 'should create both releases'
+            session.flush()
+            assert session.query(Series).count() == 1
+            assert SeriesDatabase().store(session, parse('Progress.S01E21.HDTV-FlexGet'))[0] is stored[parsers[2]][0]
+        finally:
+            session.close()
+
 
 class TestFilterSeries(FlexGetBase):
 
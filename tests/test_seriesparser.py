@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from nose.tools import assert_raises, raises
-from flexget.utils.titles import SeriesParser, ParseWarning
+from flexget.utils.titles import SeriesParser, SeriesIndex, ParseWarning
 
 #
 # NOTE:
@@ -580,3 +580,35 @@ class TestSeriesParser(object):
         assert s.valid
         assert s.id == 'cat'
         assert_raises(ParseWarning, s.parse, 'The Show e')
+
+
+class TestSeriesIndex(object):
+
+    def test_candidates(self):
+        """SeriesIndex: finds every series the parser would match"""
+        series = ['The Show (US)', 'The Show', 'Foo Bar', 'Foo & Bar', 'Something Else', '24', 'Ben 10']
+        titles = ['The.Show.US.S01E01', 'The Show (UK) S01E01', '[group] Foo.Bar.S02E03', 'FooBar.S02E03',
+                  'foo and bar s01e01', 'HD 720p: Something Else 1x02', '24.S05E05.720p', 'Ben.10.S01E01',
+                  'Show.S01E01', 'Else.S01E01', 'Bar.Foo.S01E01']
+        index = SeriesIndex()
+        for name in series:
+            index.add(name)
+        for title in titles:
+            found = index.find(title)
+            for name in series:
+                s = SeriesParser(name)
+                try:
+                    s.parse(title)
+                except ParseWarning:
+                    pass
+                if s.valid:
+                    assert name in found, 'index did not find %s from %s' % (name, title)
+        assert not index.find('Show.S01E01')
+        assert not index.find('Else.S01E01')
+
+    def test_name_regexps(self):
+        """SeriesIndex: uses custom name regexps"""
+        index = SeriesIndex()
+        index.add('The Show', name_regexps=['^the.other.show'])
+        assert index.find('The.Other.Show.S01E01') == set(['The Show'])
+        assert not index.find('The.Show.S01E01')
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+from flexget.utils import json
+from flexget.utils.startup_profile import StartupProfiler
+
+
+class TestStartupProfiler(object):
+
+    def test_disabled(self):
+        profiler = StartupProfiler()
+        with profiler.section('load_plugins'):
+            pass
+        assert profiler.sections == [], 'disabled profiler should not record sections'
+
+    def test_sections(self):
+        profiler = StartupProfiler()
+        profiler.enable()
+        with profiler.section('load_plugins'):
+            with profiler.section('flexget.plugins.input.rss'):
+                pass
+        profiler.add('core imports', 1.5)
+        report = profiler.report()
+        assert [s['name'] for s in report['sections']] == ['load_plugins', 'core imports']
+        assert report['sections'][0]['children'][0]['name'] == 'flexget.plugins.input.rss'
+        summary = profiler.summary(report)
+        assert 'core imports' in summary[1], 'slowest section should be listed first'
+        assert 'load_plugins / flexget.plugins.input.rss' in '\n'.join(summary)
+
+    def test_finish(self):
+        profiler = StartupProfiler()
+        profiler.enable()
+        with profiler.section('init_sqlalchemy'):
+            pass
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'startup-profile.json')
+            profiler.finish(path)
+            with open(path) as f:
+                report = json.load(f)
+            assert report['sections'][0]['name'] == 'init_sqlalchemy'
+            assert not profiler.enabled
+        finally:
+            shutil.rmtree(tmpdir)
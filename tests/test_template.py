@@ -0,0 +1,49 @@
+from tests import FlexGetBase
+from flexget.entry import Entry
+from flexget.utils.template import render_from_entry, render_plain, template_cache
+
+
+class TestTemplate(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'test'}
+    """
+
+    def test_render_plain(self):
+        assert render_plain('/some/path') == '/some/path'
+        assert render_plain('text\n') == 'text'
+        assert render_plain('{{ title }}') is None
+        assert render_plain('{% if title %}x{% endif %}') is None
+
+    def test_render_from_entry(self):
+        entry = Entry(title='Some.Title', url='http://localhost/')
+        assert render_from_entry('/some/path', entry) == '/some/path'
+        assert render_from_entry('/path/{{ title }}', entry) == '/path/Some.Title'
+        assert render_from_entry('/path/%(title)s', entry) == '/path/Some.Title'
+        assert render_from_entry('{{ now.year > 2000 }}', entry) == 'True'
+        assert 'now' not in entry, 'render should not add fields to the entry'
+
+    def test_template_cache(self):
+        entry = Entry(title='Some.Title', url='http://localhost/')
+        render_from_entry('{{ title|lower }}', entry)
+        template = template_cache.get('{{ title|lower }}')
+        assert render_from_entry('{{ title|lower }}', entry) == 'some.title'
+        assert template_cache.get('{{ title|lower }}') is template, 'template should have been cached'
+
+    def test_lazy_field(self):
+        entry = Entry(title='Some.Title', url='http://localhost/')
+        calls = []
+
+        def lazy_loader(entry, field):
+            calls.append(field)
+            entry['lazy'] = 'value'
+            return entry[field]
+
+        entry.register_lazy_fields(['lazy'], lazy_loader)
+        assert render_from_entry('{{ title }}', entry) == 'Some.Title'
+        assert not calls, 'unused lazy field should not have been evaluated'
+        assert render_from_entry('{{ lazy }}', entry) == 'value'
+        assert calls == ['lazy']
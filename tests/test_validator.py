@@ -1,4 +1,5 @@
 from flexget import validator
+from tests import FlexGetBase
 from tests.util import maketemp
 import yaml
 
@@ -107,3 +108,48 @@ class TestValidator(object):
         print path.errors.messages
         assert path.errors.messages, 'missing_directory should be invalid'
         path_allow_missing.errors.messages = []
+
+
+class TestValidationCache(FlexGetBase):
+
+    __yaml__ = """
+        tasks:
+          test:
+            mock:
+              - {title: 'entry'}
+    """
+
+    def setup(self):
+        FlexGetBase.setup(self)
+        from flexget import task
+        task._validation_results.clear()
+
+    def test_cached_results(self):
+        from flexget import task
+        config = {'mock': [{'title': 'entry'}], 'accept_all': 'invalid'}
+        errors = task.Task.validate_config(config)
+        assert errors and all(error.startswith('accept_all') for error in errors), 'accept_all should have failed'
+        assert len(task._validation_results) == 2
+        assert task.Task.validate_config(config) == errors, 'cached result should be the same'
+        config['accept_all'] = True
+        assert not task.Task.validate_config(config), 'changed config should have been validated again'
+
+    def test_unicode_config(self):
+        from flexget import task
+        config = {'mock': [{'title': u'entry \xc4'}], 'accept_all': u'\xc4'}
+        errors = task.Task.validate_config(config)
+        assert errors and all(error.startswith('accept_all') for error in errors), 'accept_all should have failed'
+        assert task.Task.validate_config(config) == errors, 'cached result should be the same'
+
+    def test_path_not_cached(self):
+        from flexget import task
+        assert task.Task.validate_config({'download': '/nonexistent/path'})
+        assert not task._validation_results, 'result depending on file system should not be cached'
+
+    def test_copy_config(self):
+        from flexget.task import copy_config
+        config = {'regexp': {'accept': ['a', {'b': {'path': '/tmp'}}]}, 'seen': True}
+        copied = copy_config(config)
+        assert copied == config
+        copied['regexp']['accept'][1]['b']['path'] = '/other'
+        assert config['regexp']['accept'][1]['b']['path'] == '/tmp', 'original config should not change'